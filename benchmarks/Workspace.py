@@ -0,0 +1,37 @@
+import shutil
+
+
+class Workspace:
+    """Directories and inputs shared by the benchmarks of a run.
+
+    Files of ``served_path`` are served over HTTP at ``base_url``. Benchmarks
+    write their outputs under ``scratch_path``, emptied before each of their
+    runs.
+    """
+
+    def __init__(self, root_path, base_url, parameters):
+        self.root_path = root_path
+        self.served_path = root_path.joinpath("served")
+        self.scratch_path = root_path.joinpath("scratch")
+        self.base_url = base_url
+        self.parameters = parameters
+        self.sizes = {}
+
+    def url(self, name):
+        return "{}/{}".format(self.base_url, name)
+
+    def served(self, name):
+        return self.served_path.joinpath(name)
+
+    def scratch(self, name):
+        path = self.scratch_path.joinpath(name)
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path)
+        elif path.exists() or path.is_symlink():
+            path.unlink()
+
+        return path
+
+    def clear_scratch(self):
+        shutil.rmtree(self.scratch_path, ignore_errors=True)
+        self.scratch_path.mkdir(parents=True)
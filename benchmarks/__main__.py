@@ -0,0 +1,255 @@
+"""Run the benchmarks of the utils primitives against local stand-ins.
+
+Usage: ``python -m benchmarks`` from the repository root.
+"""
+
+import json
+import os
+import pathlib
+import shutil
+import statistics
+import tempfile
+import time
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from .fixtures import make_git_repository, make_tarball
+from .server import serve_directory
+from .Workspace import Workspace
+
+baseline_path = pathlib.Path(__file__).parent.joinpath("baseline.json")
+"""Path: the stored results against which regressions are detected."""
+
+benchmarks_console = Console()
+
+
+@click.command()
+@click.option(
+    "--size",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+    help="Size of the synthetic trees and tarballs, in MiB",
+)
+@click.option(
+    "--files",
+    type=click.IntRange(min=1),
+    default=5000,
+    show_default=True,
+    help="Number of files of the synthetic trees and tarballs",
+)
+@click.option(
+    "--commits",
+    type=click.IntRange(min=1),
+    default=2000,
+    show_default=True,
+    help="Number of commits of the synthetic git repository",
+)
+@click.option(
+    "--sources",
+    type=click.IntRange(min=1),
+    default=50,
+    show_default=True,
+    help="Number of C files of the dummy autotools project",
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Number of runs of each benchmark, the median is reported",
+)
+@click.option(
+    "--tolerance",
+    type=click.FloatRange(min=0),
+    default=0.25,
+    show_default=True,
+    help="Slowdown relative to the baseline above which a benchmark fails",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    default=baseline_path,
+    show_default=True,
+    help="Baseline results to compare with",
+)
+@click.option("--save-baseline", is_flag=True, help="Store the results as baseline")
+@click.option(
+    "--only",
+    multiple=True,
+    help="Run the benchmarks whose name starts with this prefix only",
+)
+def main(
+    size, files, commits, sources, repeat, tolerance, baseline, save_baseline, only
+):
+    """benchmark the files, git and make primitives."""
+    parameters = {
+        "size": size * 1024 * 1024,
+        "files": files,
+        "commits": commits,
+        "sources": sources,
+    }
+
+    with tempfile.TemporaryDirectory(prefix="config_files_benchmarks.") as root:
+        root_path = pathlib.Path(root)
+
+        # commands resolves its paths from the home directory when imported
+        home_path = root_path.joinpath("home")
+        home_path.mkdir()
+        os.environ["HOME"] = str(home_path)
+
+        from commands.utils.files import create_resources_dirs
+        from commands.utils.resources import console
+
+        from .primitives import benchmarks
+
+        console.quiet = True
+        create_resources_dirs()
+
+        names = [
+            name
+            for name in benchmarks
+            if not only or any(name.startswith(prefix) for prefix in only)
+        ]
+        if shutil.which("zstd") is None and "files.extract_tarfile.zst" in names:
+            benchmarks_console.print("[yellow]zstd not found, skipping zst tarballs[/]")
+            names.remove("files.extract_tarfile.zst")
+
+        with serve_directory(root_path.joinpath("served")) as base_url:
+            workspace = Workspace(root_path, base_url, parameters)
+            with benchmarks_console.status("Generating inputs..."):
+                _prepare(workspace, names)
+
+            results = {}
+            for name in names:
+                with benchmarks_console.status("Running {}...".format(name)):
+                    results[name] = _run(benchmarks[name], workspace, repeat)
+
+    baseline_results = _load_baseline(baseline, parameters)
+    regressions = _report(results, baseline_results, tolerance)
+
+    if save_baseline:
+        baseline.write_text(
+            json.dumps({"parameters": parameters, "results": results}, indent=4) + "\n"
+        )
+        benchmarks_console.print("Baseline saved to {}".format(baseline))
+    elif regressions:
+        benchmarks_console.print(
+            "[bold red]Regressions above {:.0%}: {}[/]".format(
+                tolerance, ", ".join(regressions)
+            )
+        )
+        exit(1)
+
+
+def _prepare(workspace, names):
+    workspace.served_path.mkdir()
+    workspace.clear_scratch()
+    parameters = workspace.parameters
+
+    served = {"blob.bin"}
+    served.update(
+        "tree.tar.{}".format(name.rpartition(".")[2])
+        for name in names
+        if name.startswith("files.extract_tarfile.")
+    )
+    if "files.download_and_extract" in names:
+        served.add("tree.tar.gz")
+
+    for name in sorted(served):
+        path = workspace.served(name)
+        if name == "blob.bin":
+            with open(path, "wb") as blob:
+                blob.write(os.urandom(parameters["size"]))
+        else:
+            compression = name.rpartition(".")[2]
+            make_tarball(path, parameters["size"], parameters["files"], compression)
+        workspace.sizes[name] = path.stat().st_size
+
+    if any(name.startswith("git.") for name in names):
+        make_git_repository(workspace.served("repo.git"), parameters["commits"])
+
+
+def _run(setup, workspace, repeat):
+    durations = []
+    for _ in range(repeat):
+        workspace.clear_scratch()
+        run, processed_bytes, processed_files = setup(workspace)
+
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+
+    seconds = statistics.median(durations)
+    return {
+        "seconds": round(seconds, 4),
+        "mb_per_second": (
+            round(processed_bytes / seconds / 1024**2, 2) if processed_bytes else None
+        ),
+        "files_per_second": (
+            round(processed_files / seconds, 1) if processed_files else None
+        ),
+    }
+
+
+def _load_baseline(baseline, parameters):
+    if not baseline.exists():
+        benchmarks_console.print(
+            "[yellow]No baseline at {}, run with --save-baseline to store one[/]".format(
+                baseline
+            )
+        )
+        return {}
+
+    content = json.loads(baseline.read_text())
+    if content["parameters"] != parameters:
+        benchmarks_console.print(
+            "[yellow]Baseline measured with other parameters {}, not compared[/]".format(
+                content["parameters"]
+            )
+        )
+        return {}
+
+    return content["results"]
+
+
+def _report(results, baseline_results, tolerance):
+    table = Table("Benchmark", "Latency", "MB/s", "files/s", "Baseline", "Change")
+    regressions = []
+
+    for name, result in results.items():
+        row = [
+            name,
+            "{:.3f}s".format(result["seconds"]),
+            _format_rate(result["mb_per_second"]),
+            _format_rate(result["files_per_second"]),
+        ]
+
+        if name in baseline_results:
+            reference = baseline_results[name]["seconds"]
+            change = result["seconds"] / reference - 1
+            color = "green"
+            if change > tolerance:
+                color = "bold red"
+                regressions.append(name)
+            row += [
+                "{:.3f}s".format(reference),
+                "[{}]{:+.0%}[/]".format(color, change),
+            ]
+        else:
+            row += ["", ""]
+
+        table.add_row(*row)
+
+    benchmarks_console.print(table)
+    return regressions
+
+
+def _format_rate(rate):
+    return "" if rate is None else "{:,}".format(rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Synthetic inputs of the benchmarks."""
+
+import base64
+import io
+import random
+import shutil
+import stat
+import subprocess
+import tarfile
+import time
+
+fixtures_seed = 0
+"""int: the seed of the generated contents, so that every run uses the same inputs."""
+
+tarball_top_dir = "project"
+"""str: the directory at the root of the generated tarballs."""
+
+dummy_project_probes = 40
+"""int: the number of compiler probes made by the dummy configure script."""
+
+dummy_configure_script = """#!/bin/sh
+# dummy configure script probing the compiler like autoconf ones do
+cache_file=/dev/null
+for arg in "$@"; do
+    case "$arg" in
+        --cache-file=*) cache_file="${arg#--cache-file=}" ;;
+    esac
+done
+
+if [ "$cache_file" != /dev/null ] && [ -f "$cache_file" ]; then
+    . "./$cache_file"
+fi
+
+: "${CC:=cc}"
+probe=0
+while [ "$probe" -lt %(probes)d ]; do
+    variable="ac_cv_header_probe_$probe"
+    eval "value=\\${$variable}"
+    if [ -z "$value" ]; then
+        echo "#include <stdio.h>" > conftest.c
+        echo "int probe_$probe(void) { return $probe; }" >> conftest.c
+        if $CC -c conftest.c -o conftest.o; then
+            value=yes
+        else
+            value=no
+        fi
+        eval "$variable=$value"
+    fi
+    echo "checking for probe $probe... $value"
+    probe=$((probe + 1))
+done
+rm -f conftest.c conftest.o
+
+if [ "$cache_file" != /dev/null ]; then
+    set | grep "^ac_cv_" > "$cache_file"
+fi
+
+echo "CC = $CC" > Makefile
+cat Makefile.in >> Makefile
+"""
+"""str: the configure script of the dummy project, see ``make_dummy_project``."""
+
+
+def make_tree(dir_path, size, files_count):
+    """Fill a directory with text files.
+
+    Args:
+        dir_path (Path): the directory to fill. It is created if needed.
+        size (int): the total size of the files, in bytes.
+        files_count (int): the number of files, spread over sub directories of a
+            hundred files each.
+    """
+    generator = random.Random(fixtures_seed)
+    file_size = max(1, size // files_count)
+
+    for index in range(files_count):
+        file_path = dir_path.joinpath(
+            "dir{:04d}".format(index // 100), "file{:06d}.txt".format(index)
+        )
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        content = base64.b64encode(generator.randbytes(file_size * 3 // 4 + 1))
+        file_path.write_bytes(content[:file_size])
+
+
+def make_tarball(tarball_path, size, files_count, compression="gz"):
+    """Write a tarball of generated text files.
+
+    Args:
+        tarball_path (Path): where to write the tarball.
+        size (int): the total size of the archived files, in bytes.
+        files_count (int): the number of archived files.
+        compression (str): the compression of the tarball, ``"gz"``, ``"xz"``,
+            ``"bz2"`` or ``"zst"``. Default to ``"gz"``.
+    """
+    tree_path = tarball_path.parent.joinpath(tarball_path.name + ".tree")
+    make_tree(tree_path.joinpath(tarball_top_dir), size, files_count)
+
+    try:
+        if compression == "zst":
+            tar_path = tarball_path.with_suffix("")
+            with tarfile.open(tar_path, "w") as tar:
+                tar.add(tree_path.joinpath(tarball_top_dir), tarball_top_dir)
+            subprocess.run(
+                ["zstd", "-q", "-f", "--rm", str(tar_path), "-o", str(tarball_path)],
+                check=True,
+            )
+        else:
+            with tarfile.open(tarball_path, "w:{}".format(compression)) as tar:
+                tar.add(tree_path.joinpath(tarball_top_dir), tarball_top_dir)
+    finally:
+        shutil.rmtree(tree_path)
+
+
+def make_git_repository(repo_path, commits_count, files_count=100):
+    """Create a bare repository with a deep history.
+
+    The history is written with ``git fast-import``, each commit changing one
+    of the repository files.
+
+    Args:
+        repo_path (Path): where to create the bare repository.
+        commits_count (int): the number of commits of the history.
+        files_count (int): the number of files of the repository. Default to 100.
+    """
+    subprocess.run(
+        ["git", "init", "--quiet", "--bare", "--initial-branch=main", str(repo_path)],
+        check=True,
+    )
+
+    generator = random.Random(fixtures_seed)
+    stream = io.BytesIO()
+    timestamp = int(time.time()) - commits_count
+
+    for index in range(commits_count):
+        message = "commit {}".format(index).encode()
+        stream.write(b"commit refs/heads/main\n")
+        stream.write(
+            "committer Benchmark <benchmark@localhost> {} +0000\n".format(
+                timestamp + index
+            ).encode()
+        )
+        stream.write(b"data %d\n%s\n" % (len(message), message))
+
+        changed_files = range(files_count) if index == 0 else [index % files_count]
+        for file_index in changed_files:
+            content = base64.b64encode(generator.randbytes(768))
+            stream.write(b"M 644 inline src/file%03d.txt\n" % file_index)
+            stream.write(b"data %d\n%s\n" % (len(content), content))
+
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        cwd=repo_path,
+        input=stream.getvalue(),
+        check=True,
+    )
+
+
+def add_git_commits(repo_path, work_path, commits_count):
+    """Push new commits to a bare repository.
+
+    Args:
+        repo_path (Path): the bare repository.
+        work_path (Path): a clone of the bare repository used to commit.
+        commits_count (int): the number of commits to push.
+    """
+    for index in range(commits_count):
+        file_path = work_path.joinpath("src", "new{:03d}.txt".format(index))
+        file_path.write_text("new commit {}\n".format(index))
+        subprocess.run(["git", "add", "."], cwd=work_path, check=True)
+        subprocess.run(
+            [
+                "git",
+                "-c",
+                "user.name=Benchmark",
+                "-c",
+                "user.email=benchmark@localhost",
+                "commit",
+                "--quiet",
+                "-m",
+                "new commit {}".format(index),
+            ],
+            cwd=work_path,
+            check=True,
+        )
+
+    subprocess.run(
+        ["git", "push", "--quiet", str(repo_path), "HEAD:main"],
+        cwd=work_path,
+        check=True,
+    )
+
+
+def make_dummy_project(project_path, sources_count):
+    """Create a project built like autotools ones, with configure then make.
+
+    Its configure script makes ``dummy_project_probes`` compiler probes and
+    honors ``--cache-file``. Its makefile compiles ``sources_count`` C files.
+
+    Args:
+        project_path (Path): where to create the project.
+        sources_count (int): the number of C files to compile.
+    """
+    project_path.mkdir(parents=True)
+
+    configure_path = project_path.joinpath("configure")
+    configure_path.write_text(dummy_configure_script % {"probes": dummy_project_probes})
+    configure_path.chmod(configure_path.stat().st_mode | stat.S_IXUSR)
+
+    objects = []
+    for index in range(sources_count):
+        project_path.joinpath("source{}.c".format(index)).write_text(
+            "int function_{0}(int value) {{ return value * {0}; }}\n".format(index)
+        )
+        objects.append("source{}.o".format(index))
+
+    project_path.joinpath("Makefile.in").write_text(
+        "OBJECTS = {}\n\n"
+        "all: $(OBJECTS)\n\n"
+        "%.o: %.c\n"
+        "\t$(CC) -c $< -o $@\n\n"
+        "clean:\n"
+        "\trm -f $(OBJECTS)\n".format(" ".join(objects))
+    )
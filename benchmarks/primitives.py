@@ -0,0 +1,213 @@
+"""Benchmarks of the utils primitives.
+
+This module imports ``commands``, whose paths depend on the home directory. It
+must be imported once ``HOME`` points to the benchmark workspace.
+"""
+
+import shutil
+
+from commands.utils.files import (
+    download_and_extract,
+    download_archive,
+    extract_tarfile,
+    move,
+    remove,
+)
+from commands.utils.git import clone_repository, update_repository
+from commands.utils.make import configure, make
+from commands.utils.resources import cache_path, staging_path
+
+from .fixtures import add_git_commits, make_dummy_project, make_tree
+
+benchmarks = {}
+"""dict: maps each benchmark name to its setup function. A setup function takes
+the workspace, prepares a run and returns the function to time along with the
+bytes and files it processes."""
+
+
+def benchmark(name):
+    """Register a benchmark setup function under the given name.
+
+    Args:
+        name (str): the name of the benchmark, ``<module>.<primitive>``.
+
+    Returns:
+        callable: the decorator registering the setup function.
+    """
+
+    def register(setup):
+        benchmarks[name] = setup
+        return setup
+
+    return register
+
+
+def clear_caches():
+    """Empty the caches of ``commands`` so that every run starts cold."""
+    for path in cache_path.iterdir():
+        shutil.rmtree(path)
+        path.mkdir()
+
+
+@benchmark("files.download_archive")
+def download_archive_benchmark(workspace):
+    clear_caches()
+    archive_path = workspace.scratch("blob.bin")
+
+    def run():
+        download_archive(workspace.url("blob.bin"), archive_path, "blob")
+
+    return run, workspace.sizes["blob.bin"], 0
+
+
+@benchmark("files.download_and_extract")
+def download_and_extract_benchmark(workspace):
+    clear_caches()
+    target_path = workspace.scratch("download_and_extract")
+
+    def run():
+        download_and_extract(workspace.url("tree.tar.gz"), target_path, "tree")
+
+    return run, workspace.sizes["tree.tar.gz"], workspace.parameters["files"]
+
+
+def extract_tarfile_benchmark(compression):
+    name = "tree.tar.{}".format(compression)
+
+    def setup(workspace):
+        target_path = workspace.scratch("extract_tarfile")
+
+        def run():
+            extract_tarfile(workspace.served(name), target_path, "tree")
+
+        return run, workspace.sizes[name], workspace.parameters["files"]
+
+    return setup
+
+
+for compression in ["gz", "xz", "bz2", "zst"]:
+    benchmark("files.extract_tarfile.{}".format(compression))(
+        extract_tarfile_benchmark(compression)
+    )
+
+
+@benchmark("files.move")
+def move_benchmark(workspace):
+    source_path = staging_path.joinpath("tree")
+    shutil.rmtree(source_path, ignore_errors=True)
+    size = workspace.parameters["size"]
+    files = workspace.parameters["files"]
+    make_tree(source_path, size, files)
+
+    # half of the tree already exists in the target, so that it is merged
+    target_path = workspace.scratch("move")
+    make_tree(target_path, size // 2, files // 2)
+
+    def run():
+        move(source_path, target_path, "tree", force=True)
+
+    return run, size, files
+
+
+@benchmark("files.remove")
+def remove_benchmark(workspace):
+    tree_path = workspace.scratch("remove")
+    make_tree(tree_path, workspace.parameters["size"], workspace.parameters["files"])
+
+    def run():
+        remove(tree_path, "tree")
+
+    return run, workspace.parameters["size"], workspace.parameters["files"]
+
+
+@benchmark("git.clone_repository")
+def clone_repository_benchmark(workspace):
+    repo_path = workspace.scratch("clone")
+
+    def run():
+        clone_repository(workspace.served("repo.git").as_uri(), repo_path, "repo")
+
+    return run, 0, workspace.parameters["commits"]
+
+
+@benchmark("git.clone_repository.shallow")
+def shallow_clone_repository_benchmark(workspace):
+    repo_path = workspace.scratch("shallow_clone")
+
+    def run():
+        clone_repository(
+            workspace.served("repo.git").as_uri(),
+            repo_path,
+            "repo",
+            depth=1,
+            single_branch=True,
+        )
+
+    return run, 0, 1
+
+
+@benchmark("git.update_repository")
+def update_repository_benchmark(workspace):
+    origin_path = workspace.scratch("update_origin.git")
+    shutil.copytree(workspace.served("repo.git"), origin_path)
+
+    repo_path = workspace.scratch("update")
+    clone_repository(origin_path.as_uri(), repo_path, "repo")
+
+    # new commits are pushed from another clone, that the update pulls
+    work_path = workspace.scratch("update_work")
+    clone_repository(origin_path.as_uri(), work_path, "work")
+    commits = workspace.parameters["commits"] // 100 + 1
+    add_git_commits(origin_path, work_path, commits)
+
+    def run():
+        update_repository(repo_path, "repo")
+
+    return run, 0, commits
+
+
+@benchmark("make.configure")
+def configure_benchmark(workspace):
+    project_path = workspace.scratch("configure")
+    make_dummy_project(project_path, workspace.parameters["sources"])
+
+    def run():
+        _check(configure(project_path, [], "dummy"))
+
+    return run, 0, 0
+
+
+@benchmark("make.configure.cached")
+def cached_configure_benchmark(workspace):
+    clear_caches()
+
+    # a first project fills the shared configure cache used by the second
+    warm_path = workspace.scratch("configure_warm")
+    make_dummy_project(warm_path, 1)
+    _check(configure(warm_path, [], "warm", cache=True))
+
+    project_path = workspace.scratch("configure_cached")
+    make_dummy_project(project_path, workspace.parameters["sources"])
+
+    def run():
+        _check(configure(project_path, [], "dummy", cache=True))
+
+    return run, 0, 0
+
+
+@benchmark("make.make")
+def make_benchmark(workspace):
+    project_path = workspace.scratch("make")
+    make_dummy_project(project_path, workspace.parameters["sources"])
+    _check(configure(project_path, [], "dummy"))
+
+    def run():
+        _check(make(project_path, [], "dummy"))
+
+    return run, 0, workspace.parameters["sources"]
+
+
+def _check(result):
+    returncode, stdout, stderr = result
+    if returncode != 0:
+        raise RuntimeError("{}\n{}".format(stdout, stderr))
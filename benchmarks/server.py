@@ -0,0 +1,82 @@
+"""Local HTTP server standing in for download mirrors."""
+
+import contextlib
+import functools
+import http.server
+import os
+import re
+import threading
+
+copy_chunk_size = 64 * 1024
+"""int: the size of the blocks written to clients."""
+
+
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serve files with support for single ``Range`` requests and validators."""
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        size = os.path.getsize(path)
+        file = open(path, "rb")
+
+        match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+        if match is not None:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else size - 1
+            end = min(end, size - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes {}-{}/{}".format(start, end, size))
+        else:
+            start, end = 0, size - 1
+            self.send_response(200)
+
+        file.seek(start)
+        self.remaining = end - start + 1
+
+        self.send_header("Content-Length", str(self.remaining))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"{}"'.format(os.stat(path).st_mtime_ns))
+        self.end_headers()
+
+        return file
+
+    def copyfile(self, source, outputfile):
+        while self.remaining > 0:
+            data = source.read(min(copy_chunk_size, self.remaining))
+            if not data:
+                break
+            outputfile.write(data)
+            self.remaining -= len(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_directory(dir_path, handler_class=RangeRequestHandler):
+    """Serve a directory over HTTP on a free local port.
+
+    Args:
+        dir_path (Path): the directory to serve.
+        handler_class (type): the request handler. Default to
+            ``RangeRequestHandler``.
+
+    Yields:
+        str: the base URL of the served directory, without trailing slash.
+    """
+    handler = functools.partial(handler_class, directory=str(dir_path))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield "http://127.0.0.1:{}".format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -1,12 +1,47 @@
-from .autoconf import autoconf
-from .automake import automake
-from .bash import bash
-from .cmake import cmake
-from .libtool import libtool
-from .llvm import llvm
-from .ncurses import ncurses
-from .neovim import neovim
-from .nodejs import node
-from .openssl import openssl
-from .vifm import vifm
-from .ninja import ninja
+import importlib
+
+commands_groups = {
+    "autoconf": ("commands.autoconf", "autoconf commands group."),
+    "automake": ("commands.automake", "automake commands group."),
+    "bash": ("commands.bash", "bash commands group."),
+    "cmake": ("commands.cmake", "cmake commands group."),
+    "libtool": ("commands.libtool", "libtool commands group."),
+    "llvm": ("commands.llvm", "llvm commands group."),
+    "ncurses": ("commands.ncurses", "ncurses commands group."),
+    "neovim": ("commands.neovim", "neovim commmands group."),
+    "ninja": ("commands.ninja", "ninja commands group."),
+    "node": ("commands.nodejs", "node commands group."),
+    "openssl": ("commands.openssl", "openssl commmands group."),
+    "vifm": ("commands.vifm", "vifm commmands group."),
+    "install": (
+        "commands.packages",
+        'install packages and their dependencies, or all of them with "all".',
+    ),
+    "sync": (
+        "commands.packages",
+        "clone or update the repositories of packages, or of all of them.",
+    ),
+    "status": (
+        "commands.packages",
+        "print the installed packages, from their manifests.",
+    ),
+    "uninstall": (
+        "commands.packages",
+        "uninstall packages, removing the files they installed.",
+    ),
+}
+"""dict: maps the name of each command to the module defining it and its help.
+Modules are imported the first time their command is used."""
+
+
+def __getattr__(name):
+    if name not in commands_groups:
+        raise AttributeError("module {} has no attribute {}".format(__name__, name))
+
+    module = importlib.import_module(commands_groups[name][0])
+    command = getattr(module, name)
+
+    # importing a sub module binds its name, rebind it to the command
+    globals()[name] = command
+
+    return command
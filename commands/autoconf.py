@@ -1,18 +1,48 @@
 import click
 
-from .utils.files import download_archive, extract_tarfile, move, remove
-from .utils.make import configure, make, make_install
+from .utils.artifacts import (
+    artifact_key,
+    destdir_path,
+    restore_artifact,
+    store_artifact,
+)
+from .utils.files import (
+    NotEnoughSpace,
+    build_directory,
+    download_and_extract,
+    move,
+    prefetch_archive,
+    remove,
+    staging_directory,
+)
+from .utils.make import (
+    compiler_cache_stats,
+    configure,
+    make,
+    make_install,
+    print_compiler_cache_stats,
+)
 from .utils.print import print_msg_titled, print_stdoutputs
-from .utils.resources import console, local_path, packages_path, temp_path
+from .utils.resources import console, local_path, packages_path
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 
 autoconf_name = "autoconf"
 autoconf_version = "2.70"
 autoconf_homepage = "https://www.gnu.org/software/autoconf/"
 autoconf_archive_link = "https://ftp.gnu.org/gnu/autoconf/autoconf-2.70.tar.gz"
+autoconf_archive_sha256 = (
+    "f05f410fda74323ada4bdc4610db37f8dbd556602ba65bc843edb4d4d4a1b2b7"
+)
 autoconf_archive_top_directory_name = "autoconf-2.70"
-autoconf_archive_path = temp_path.joinpath("autoconf.tar.gz")
 autoconf_package_path = packages_path.joinpath("autoconf")
+autoconf_build_size = 50 * 1024 * 1024
 autoconf_install_path = local_path
+autoconf_configure_args = ["--prefix={}".format(autoconf_install_path)]
+
+
+def prefetch():
+    """download the autoconf archive ahead of its install."""
+    prefetch_archive(autoconf_archive_link, autoconf_name, autoconf_archive_sha256)
 
 
 @click.group()
@@ -31,30 +61,73 @@ def info():
 
 
 @autoconf.command()
-def install():
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
+def install(force):
     """install autoconf locally."""
-    # clone archive
-    download_archive(autoconf_archive_link, autoconf_archive_path, autoconf_name)
+    # skip unchanged build
+    autoconf_stamp = build_stamp(
+        autoconf_archive_sha256,
+        autoconf_install_path,
+        configure=autoconf_configure_args,
+    )
+    if not force and is_up_to_date(autoconf_name, autoconf_stamp):
+        console.print("[bold green]{} is up to date[/]".format(autoconf_name))
+        return
+
+    remove_stamp(autoconf_name)
+
+    # install prebuilt artifact
+    autoconf_artifact_key = artifact_key(autoconf_stamp)
+    if not force and restore_artifact(
+        autoconf_name, autoconf_artifact_key, autoconf_install_path
+    ):
+        write_stamp(autoconf_name, autoconf_stamp)
+        console.print("[bold green]autoconf has been installed with success[/]")
+        return
+
+    autoconf_compiler_cache_stats = compiler_cache_stats()
+
+    # build on the fastest location with enough space
+    try:
+        autoconf_work_path = build_directory(
+            autoconf_name, autoconf_package_path, autoconf_build_size
+        )
+    except NotEnoughSpace as exception:
+        print_msg_titled(
+            "[bold red]Error while placing autoconf build[/]", str(exception)
+        )
+        exit(1)
 
-    # extract archive
-    autoconf_tmp_path = temp_path.joinpath(autoconf_archive_top_directory_name)
+    # download and extract archive
+    autoconf_staging_path = staging_directory(autoconf_work_path)
+    autoconf_tmp_path = autoconf_staging_path.joinpath(
+        autoconf_archive_top_directory_name
+    )
 
     if autoconf_tmp_path.exists():
         remove(autoconf_tmp_path, "{}".format(autoconf_tmp_path))
 
-    extract_tarfile(autoconf_archive_path, temp_path, autoconf_name)
+    download_and_extract(
+        autoconf_archive_link,
+        autoconf_staging_path,
+        autoconf_name,
+        autoconf_archive_sha256,
+    )
 
     # move temp directory to repo
-    if autoconf_package_path.exists():
-        remove(autoconf_package_path, "{}".format(autoconf_package_path))
+    if autoconf_work_path.exists():
+        remove(autoconf_work_path, "{}".format(autoconf_work_path))
 
-    move(autoconf_tmp_path, autoconf_package_path)
+    move(autoconf_tmp_path, autoconf_work_path)
 
     # configure
     returncode, stdout, stderr = configure(
-        autoconf_package_path,
-        ["--prefix={}".format(autoconf_install_path)],
-        autoconf_name,
+        autoconf_work_path, autoconf_configure_args, autoconf_name, cache=True
     )
     if returncode != 0:
         print_stdoutputs(
@@ -65,14 +138,20 @@ def install():
         exit(1)
 
     # make
-    returncode, stdout, stderr = make(autoconf_package_path, [], autoconf_name)
+    returncode, stdout, stderr = make(autoconf_work_path, [], autoconf_name)
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while making {}[/]".format(autoconf_name), stdout, stderr
         )
         exit(1)
 
-    returncode, stdout, stderr = make_install(autoconf_package_path, [], autoconf_name)
+    # make install, staged to be packed as artifact
+    autoconf_destdir_path = destdir_path(autoconf_name, autoconf_install_path)
+    returncode, stdout, stderr = make_install(
+        autoconf_work_path,
+        ["DESTDIR={}".format(autoconf_destdir_path)],
+        autoconf_name,
+    )
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while installing {}[/]".format(autoconf_name),
@@ -81,4 +160,14 @@ def install():
         )
         exit(1)
 
+    store_artifact(
+        autoconf_name,
+        autoconf_artifact_key,
+        autoconf_destdir_path,
+        autoconf_install_path,
+    )
+
+    print_compiler_cache_stats(autoconf_compiler_cache_stats, autoconf_name)
+    write_stamp(autoconf_name, autoconf_stamp)
+
     console.print("[bold green]autoconf has been installed with success[/]")
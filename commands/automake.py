@@ -1,9 +1,30 @@
 import click
 
-from .utils.files import download_archive, extract_tarfile, move, remove
-from .utils.make import configure, make, make_install
+from .utils.artifacts import (
+    artifact_key,
+    destdir_path,
+    restore_artifact,
+    store_artifact,
+)
+from .utils.files import (
+    NotEnoughSpace,
+    build_directory,
+    download_and_extract,
+    move,
+    prefetch_archive,
+    remove,
+    staging_directory,
+)
+from .utils.make import (
+    compiler_cache_stats,
+    configure,
+    make,
+    make_install,
+    print_compiler_cache_stats,
+)
 from .utils.print import print_msg_titled, print_stdoutputs
-from .utils.resources import console, local_path, packages_path, temp_path
+from .utils.resources import console, local_path, packages_path
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 
 from .autoconf import install as autoconf_install
 
@@ -11,10 +32,19 @@ automake_name = "automake"
 automake_version = "1.16.3"
 automake_homepage = "https://www.gnu.org/software/automake/"
 automake_archive_link = "https://ftp.gnu.org/gnu/automake/automake-1.16.3.tar.gz"
+automake_archive_sha256 = (
+    "ce010788b51f64511a1e9bb2a1ec626037c6d0e7ede32c1c103611b9d3cba65f"
+)
 automake_archive_top_directory_name = "automake-1.16.3"
-automake_archive_path = temp_path.joinpath("automake.tar.gz")
 automake_package_path = packages_path.joinpath("automake")
+automake_build_size = 50 * 1024 * 1024
 automake_install_path = local_path
+automake_configure_args = ["--prefix={}".format(automake_install_path)]
+
+
+def prefetch():
+    """download the automake archive ahead of its install."""
+    prefetch_archive(automake_archive_link, automake_name, automake_archive_sha256)
 
 
 @click.group()
@@ -34,35 +64,78 @@ def info():
 
 @automake.command()
 @click.option("--with-dependencies", is_flag=True, help="Install with dependencies")
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
 @click.pass_context
-def install(ctx, with_dependencies):
+def install(ctx, with_dependencies, force):
     """install automake locally."""
     # handle dependencies
     if with_dependencies:
         ctx.invoke(autoconf_install)
 
-    # clone archive
-    download_archive(automake_archive_link, automake_archive_path, automake_name)
+    # skip unchanged build
+    automake_stamp = build_stamp(
+        automake_archive_sha256,
+        automake_install_path,
+        configure=automake_configure_args,
+    )
+    if not force and is_up_to_date(automake_name, automake_stamp):
+        console.print("[bold green]{} is up to date[/]".format(automake_name))
+        return
+
+    remove_stamp(automake_name)
+
+    # install prebuilt artifact
+    automake_artifact_key = artifact_key(automake_stamp)
+    if not force and restore_artifact(
+        automake_name, automake_artifact_key, automake_install_path
+    ):
+        write_stamp(automake_name, automake_stamp)
+        console.print("[bold green]automake has been installed with success[/]")
+        return
+
+    automake_compiler_cache_stats = compiler_cache_stats()
+
+    # build on the fastest location with enough space
+    try:
+        automake_work_path = build_directory(
+            automake_name, automake_package_path, automake_build_size
+        )
+    except NotEnoughSpace as exception:
+        print_msg_titled(
+            "[bold red]Error while placing automake build[/]", str(exception)
+        )
+        exit(1)
 
-    # extract archive
-    automake_tmp_path = temp_path.joinpath(automake_archive_top_directory_name)
+    # download and extract archive
+    automake_staging_path = staging_directory(automake_work_path)
+    automake_tmp_path = automake_staging_path.joinpath(
+        automake_archive_top_directory_name
+    )
 
     if automake_tmp_path.exists():
         remove(automake_tmp_path, "{}".format(automake_tmp_path))
 
-    extract_tarfile(automake_archive_path, temp_path, automake_name)
+    download_and_extract(
+        automake_archive_link,
+        automake_staging_path,
+        automake_name,
+        automake_archive_sha256,
+    )
 
     # move temp directory to repo
-    if automake_package_path.exists():
-        remove(automake_package_path, "{}".format(automake_package_path))
+    if automake_work_path.exists():
+        remove(automake_work_path, "{}".format(automake_work_path))
 
-    move(automake_tmp_path, automake_package_path)
+    move(automake_tmp_path, automake_work_path)
 
     # configure
     returncode, stdout, stderr = configure(
-        automake_package_path,
-        ["--prefix={}".format(automake_install_path)],
-        automake_name,
+        automake_work_path, automake_configure_args, automake_name, cache=True
     )
     if returncode != 0:
         print_stdoutputs(
@@ -73,14 +146,20 @@ def install(ctx, with_dependencies):
         exit(1)
 
     # make
-    returncode, stdout, stderr = make(automake_package_path, [], automake_name)
+    returncode, stdout, stderr = make(automake_work_path, [], automake_name)
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while making {}[/]".format(automake_name), stdout, stderr
         )
         exit(1)
 
-    returncode, stdout, stderr = make_install(automake_package_path, [], automake_name)
+    # make install, staged to be packed as artifact
+    automake_destdir_path = destdir_path(automake_name, automake_install_path)
+    returncode, stdout, stderr = make_install(
+        automake_work_path,
+        ["DESTDIR={}".format(automake_destdir_path)],
+        automake_name,
+    )
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while installing {}[/]".format(automake_name),
@@ -89,4 +168,14 @@ def install(ctx, with_dependencies):
         )
         exit(1)
 
+    store_artifact(
+        automake_name,
+        automake_artifact_key,
+        automake_destdir_path,
+        automake_install_path,
+    )
+
+    print_compiler_cache_stats(automake_compiler_cache_stats, automake_name)
+    write_stamp(automake_name, automake_stamp)
+
     console.print("[bold green]automake has been installed with success[/]")
@@ -1,9 +1,30 @@
 import click
 
-from .utils.files import download_archive, extract_tarfile, move, remove
-from .utils.make import bootstrap, make, make_install
+from .utils.artifacts import (
+    artifact_key,
+    destdir_path,
+    restore_artifact,
+    store_artifact,
+)
+from .utils.files import (
+    NotEnoughSpace,
+    build_directory,
+    download_and_extract,
+    move,
+    prefetch_archive,
+    remove,
+    staging_directory,
+)
+from .utils.make import (
+    bootstrap,
+    compiler_cache_stats,
+    make,
+    make_install,
+    print_compiler_cache_stats,
+)
 from .utils.print import print_msg_titled, print_stdoutputs
-from .utils.resources import console, local_path, packages_path, temp_path
+from .utils.resources import console, local_path, packages_path
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 
 from .openssl import install as openssl_install
 
@@ -13,10 +34,23 @@ cmake_homepage = "https://cmake.org/"
 cmake_archive_link = (
     "https://github.com/Kitware/CMake/releases/download/v3.19.2/cmake-3.19.2.tar.gz"
 )
+cmake_archive_sha256 = (
+    "e3e0fd3b23b7fb13e1a856581078e0776ffa2df4e9d3164039c36d3315e0c7f0"
+)
 cmake_archive_top_directory_name = "cmake-3.19.2"
-cmake_archive_path = temp_path.joinpath("cmake.tar.gz")
 cmake_package_path = packages_path.joinpath("cmake")
+cmake_build_size = 1024 * 1024 * 1024
 cmake_install_path = local_path
+cmake_bootstrap_args = [
+    "--prefix={}".format(cmake_install_path),
+    "--",
+    "-DCMAKE_BUILD_TYPE:STRING=Release",
+]
+
+
+def prefetch():
+    """download the cmake archive ahead of its install."""
+    prefetch_archive(cmake_archive_link, cmake_name, cmake_archive_sha256)
 
 
 @click.group()
@@ -36,39 +70,69 @@ def info():
 
 @cmake.command()
 @click.option("--with-dependencies", is_flag=True, help="Install with dependencies")
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
 @click.pass_context
-def install(ctx, with_dependencies):
+def install(ctx, with_dependencies, force):
     """install cmake locally."""
     # handle dependencies
     if with_dependencies:
         ctx.invoke(openssl_install)
 
-    # clone archive
-    download_archive(cmake_archive_link, cmake_archive_path, cmake_name)
+    # skip unchanged build
+    cmake_stamp = build_stamp(
+        cmake_archive_sha256, cmake_install_path, bootstrap=cmake_bootstrap_args
+    )
+    if not force and is_up_to_date(cmake_name, cmake_stamp):
+        console.print("[bold green]{} is up to date[/]".format(cmake_name))
+        return
+
+    remove_stamp(cmake_name)
+
+    # install prebuilt artifact
+    cmake_artifact_key = artifact_key(cmake_stamp)
+    if not force and restore_artifact(
+        cmake_name, cmake_artifact_key, cmake_install_path
+    ):
+        write_stamp(cmake_name, cmake_stamp)
+        console.print("[bold green]cmake has been installed with success[/]")
+        return
+
+    cmake_compiler_cache_stats = compiler_cache_stats()
+
+    # build on the fastest location with enough space
+    try:
+        cmake_work_path = build_directory(
+            cmake_name, cmake_package_path, cmake_build_size
+        )
+    except NotEnoughSpace as exception:
+        print_msg_titled("[bold red]Error while placing cmake build[/]", str(exception))
+        exit(1)
 
-    # extract archive
-    cmake_tmp_path = temp_path.joinpath(cmake_archive_top_directory_name)
+    # download and extract archive
+    cmake_staging_path = staging_directory(cmake_work_path)
+    cmake_tmp_path = cmake_staging_path.joinpath(cmake_archive_top_directory_name)
 
     if cmake_tmp_path.exists():
         remove(cmake_tmp_path, "{}".format(cmake_tmp_path))
 
-    extract_tarfile(cmake_archive_path, temp_path, cmake_name)
+    download_and_extract(
+        cmake_archive_link, cmake_staging_path, cmake_name, cmake_archive_sha256
+    )
 
     # move temp directory to packages
-    if cmake_package_path.exists():
-        remove(cmake_package_path, "{}".format(cmake_package_path))
+    if cmake_work_path.exists():
+        remove(cmake_work_path, "{}".format(cmake_work_path))
 
-    move(cmake_tmp_path, cmake_package_path, cmake_name)
+    move(cmake_tmp_path, cmake_work_path, cmake_name)
 
     # bootstrap
     returncode, stdout, stderr = bootstrap(
-        cmake_package_path,
-        [
-            "--prefix={}".format(cmake_install_path),
-            "--",
-            "-DCMAKE_BUILD_TYPE:STRING=Release",
-        ],
-        cmake_name,
+        cmake_work_path, cmake_bootstrap_args, cmake_name
     )
     if returncode != 0:
         print_stdoutputs(
@@ -77,19 +141,29 @@ def install(ctx, with_dependencies):
         exit(1)
 
     # make
-    returncode, stdout, stderr = make(cmake_package_path, [], cmake_name)
+    returncode, stdout, stderr = make(cmake_work_path, [], cmake_name)
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while making {}[/]".format(cmake_name), stdout, stderr
         )
         exit(1)
 
-    # make install
-    returncode, stdout, stderr = make_install(cmake_package_path, [], cmake_name)
+    # make install, staged to be packed as artifact
+    cmake_destdir_path = destdir_path(cmake_name, cmake_install_path)
+    returncode, stdout, stderr = make_install(
+        cmake_work_path, ["DESTDIR={}".format(cmake_destdir_path)], cmake_name
+    )
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while installing {}[/]".format(cmake_name), stdout, stderr
         )
         exit(1)
 
+    store_artifact(
+        cmake_name, cmake_artifact_key, cmake_destdir_path, cmake_install_path
+    )
+
+    print_compiler_cache_stats(cmake_compiler_cache_stats, cmake_name)
+    write_stamp(cmake_name, cmake_stamp)
+
     console.print("[bold green]cmake has been installed with success[/]")
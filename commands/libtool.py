@@ -1,18 +1,48 @@
 import click
 
-from .utils.files import download_archive, extract_tarfile, move, remove
-from .utils.make import configure, make, make_install
+from .utils.artifacts import (
+    artifact_key,
+    destdir_path,
+    restore_artifact,
+    store_artifact,
+)
+from .utils.files import (
+    NotEnoughSpace,
+    build_directory,
+    download_and_extract,
+    move,
+    prefetch_archive,
+    remove,
+    staging_directory,
+)
+from .utils.make import (
+    compiler_cache_stats,
+    configure,
+    make,
+    make_install,
+    print_compiler_cache_stats,
+)
 from .utils.print import print_msg_titled, print_stdoutputs
-from .utils.resources import console, local_path, packages_path, temp_path
+from .utils.resources import console, local_path, packages_path
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 
 libtool_name = "libtool"
 libtool_version = "2.4.6"
 libtool_homepage = "https://www.gnu.org/software/libtool/"
 libtool_archive_link = "https://ftpmirror.gnu.org/libtool/libtool-2.4.6.tar.gz"
+libtool_archive_sha256 = (
+    "e3bd4d5d3d025a36c21dd6af7ea818a2afcd4dfc1ea5a17b39d7854bcd0c06e3"
+)
 libtool_archive_top_directory_name = "libtool-2.4.6"
-libtool_archive_path = temp_path.joinpath("libtool.tar.gz")
 libtool_package_path = packages_path.joinpath("libtool")
+libtool_build_size = 50 * 1024 * 1024
 libtool_install_path = local_path
+libtool_configure_args = ["--prefix={}".format(libtool_install_path)]
+
+
+def prefetch():
+    """download the libtool archive ahead of its install."""
+    prefetch_archive(libtool_archive_link, libtool_name, libtool_archive_sha256)
 
 
 @click.group()
@@ -31,28 +61,66 @@ def info():
 
 
 @libtool.command()
-def install():
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
+def install(force):
     """install libtool locally."""
-    # clone archive
-    download_archive(libtool_archive_link, libtool_archive_path, libtool_name)
+    # skip unchanged build
+    libtool_stamp = build_stamp(
+        libtool_archive_sha256, libtool_install_path, configure=libtool_configure_args
+    )
+    if not force and is_up_to_date(libtool_name, libtool_stamp):
+        console.print("[bold green]{} is up to date[/]".format(libtool_name))
+        return
+
+    remove_stamp(libtool_name)
+
+    # install prebuilt artifact
+    libtool_artifact_key = artifact_key(libtool_stamp)
+    if not force and restore_artifact(
+        libtool_name, libtool_artifact_key, libtool_install_path
+    ):
+        write_stamp(libtool_name, libtool_stamp)
+        console.print("[bold green]libtool has been installed with success[/]")
+        return
+
+    libtool_compiler_cache_stats = compiler_cache_stats()
+
+    # build on the fastest location with enough space
+    try:
+        libtool_work_path = build_directory(
+            libtool_name, libtool_package_path, libtool_build_size
+        )
+    except NotEnoughSpace as exception:
+        print_msg_titled(
+            "[bold red]Error while placing libtool build[/]", str(exception)
+        )
+        exit(1)
 
-    # extract archive
-    libtool_tmp_path = temp_path.joinpath(libtool_archive_top_directory_name)
+    # download and extract archive
+    libtool_staging_path = staging_directory(libtool_work_path)
+    libtool_tmp_path = libtool_staging_path.joinpath(libtool_archive_top_directory_name)
 
     if libtool_tmp_path.exists():
         remove(libtool_tmp_path, "{}".format(libtool_tmp_path))
 
-    extract_tarfile(libtool_archive_path, temp_path, libtool_name)
+    download_and_extract(
+        libtool_archive_link, libtool_staging_path, libtool_name, libtool_archive_sha256
+    )
 
     # move temp directory to repo
-    if libtool_package_path.exists():
-        remove(libtool_package_path, "{}".format(libtool_package_path))
+    if libtool_work_path.exists():
+        remove(libtool_work_path, "{}".format(libtool_work_path))
 
-    move(libtool_tmp_path, libtool_package_path, libtool_name)
+    move(libtool_tmp_path, libtool_work_path, libtool_name)
 
     # configure
     returncode, stdout, stderr = configure(
-        libtool_package_path, ["--prefix={}".format(libtool_install_path)], libtool_name
+        libtool_work_path, libtool_configure_args, libtool_name, cache=True
     )
     if returncode != 0:
         print_stdoutputs(
@@ -63,14 +131,18 @@ def install():
         exit(1)
 
     # make
-    returncode, stdout, stderr = make(libtool_package_path, [], libtool_name)
+    returncode, stdout, stderr = make(libtool_work_path, [], libtool_name)
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while making {}[/]".format(libtool_name), stdout, stderr
         )
         exit(1)
 
-    returncode, stdout, stderr = make_install(libtool_package_path, [], libtool_name)
+    # make install, staged to be packed as artifact
+    libtool_destdir_path = destdir_path(libtool_name, libtool_install_path)
+    returncode, stdout, stderr = make_install(
+        libtool_work_path, ["DESTDIR={}".format(libtool_destdir_path)], libtool_name
+    )
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while installing {}[/]".format(libtool_name),
@@ -79,4 +151,11 @@ def install():
         )
         exit(1)
 
+    store_artifact(
+        libtool_name, libtool_artifact_key, libtool_destdir_path, libtool_install_path
+    )
+
+    print_compiler_cache_stats(libtool_compiler_cache_stats, libtool_name)
+    write_stamp(libtool_name, libtool_stamp)
+
     console.print("[bold green]libtool has been installed with success[/]")
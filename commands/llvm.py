@@ -1,19 +1,34 @@
 import click
 
-from .utils.files import download_archive, extract_tarfile, move, remove
+from .utils.files import (
+    NotEnoughSpace,
+    check_free_space,
+    download_and_extract,
+    prefetch_archive,
+    remove,
+    staging_directory,
+)
 from .utils.make import configure, make, make_install
+from .utils.manifests import install_tree
 from .utils.print import print_msg_titled, print_stdoutputs
-from .utils.resources import console, local_path, packages_path, temp_path
+from .utils.resources import console, local_path, packages_path
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 
 llvm_name = "llvm"
 llvm_version = "11.0.0"
 llvm_homepage = "https://llvm.org/"
 llvm_archive_link = "https://github.com/llvm/llvm-project/releases/download/llvmorg-11.0.0/clang+llvm-11.0.0-x86_64-linux-gnu-ubuntu-20.04.tar.xz"
+llvm_archive_sha256 = "829f5fb0ebda1d8716464394f97d5475d465ddc7bea2879c0601316b611ff6db"
 llvm_archive_top_directory_name = "clang+llvm-11.0.0-x86_64-linux-gnu-ubuntu-20.04"
-llvm_archive_path = temp_path.joinpath("llvm.tar.xz")
+llvm_extract_size = 5 * 1024 * 1024 * 1024
 llvm_install_path = local_path
 
 
+def prefetch():
+    """download the llvm archive ahead of its install."""
+    prefetch_archive(llvm_archive_link, llvm_name, llvm_archive_sha256)
+
+
 @click.group()
 def llvm():
     """llvm commands group."""
@@ -30,22 +45,42 @@ def info():
 
 
 @llvm.command()
-def install():
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
+def install(force):
     """install llvm locally."""
-    # download archive
-    download_archive(llvm_archive_link, llvm_archive_path, llvm_name)
+    # skip unchanged build
+    llvm_stamp = build_stamp(llvm_archive_sha256, llvm_install_path)
+    if not force and is_up_to_date(llvm_name, llvm_stamp):
+        console.print("[bold green]{} is up to date[/]".format(llvm_name))
+        return
+
+    remove_stamp(llvm_name)
 
-    # extract archive
-    llvm_tmp_path = temp_path.joinpath(llvm_archive_top_directory_name)
+    # download and extract archive
+    llvm_staging_path = staging_directory(llvm_install_path)
+    llvm_tmp_path = llvm_staging_path.joinpath(llvm_archive_top_directory_name)
 
     if llvm_tmp_path.exists():
         remove(llvm_tmp_path, "{}".format(llvm_tmp_path))
 
-    extract_tarfile(llvm_archive_path, temp_path, llvm_name)
+    try:
+        check_free_space(llvm_staging_path, llvm_extract_size, llvm_name)
+    except NotEnoughSpace as exception:
+        print_msg_titled("[bold red]Error while extracting llvm[/]", str(exception))
+        exit(1)
+
+    download_and_extract(
+        llvm_archive_link, llvm_staging_path, llvm_name, llvm_archive_sha256
+    )
 
     # move temp directory to install path
-    target = llvm_install_path
-    source = llvm_tmp_path
-    move(source, target, llvm_name, True)
+    install_tree(llvm_name, llvm_tmp_path, llvm_install_path)
+
+    write_stamp(llvm_name, llvm_stamp)
 
     console.print("[bold green]{} has been installed with success[/]".format(llvm_name))
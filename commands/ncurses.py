@@ -1,18 +1,56 @@
+import concurrent.futures
+
 import click
 
-from .utils.files import download_archive, extract_tarfile, move, remove
-from .utils.make import configure, make, make_install
+from .utils.artifacts import (
+    artifact_key,
+    destdir_path,
+    restore_artifact,
+    store_artifact,
+)
+from .utils.files import (
+    NotEnoughSpace,
+    build_directory,
+    download_and_extract,
+    move,
+    prefetch_archive,
+    remove,
+    staging_directory,
+)
+from .utils.make import (
+    compiler_cache_stats,
+    configure,
+    make,
+    make_install,
+    print_compiler_cache_stats,
+)
 from .utils.print import print_msg_titled, print_stdoutputs
-from .utils.resources import console, local_path, packages_path, temp_path
+from .utils.resources import console, local_path, packages_path
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 
 ncurses_name = "ncurses"
 ncurses_version = "6.2"
 ncurses_homepage = "https://invisible-island.net/ncurses/"
-ncurses_archive_link = "https://invisible-island.net/datafiles/release/ncurses.tar.gz"
+ncurses_archive_link = "https://ftp.gnu.org/gnu/ncurses/ncurses-6.2.tar.gz"
+ncurses_archive_sha256 = (
+    "30306e0c76e0f9f1f0de987cf1c82a5c21e1ce6568b9227f7da5b71cbea86c9d"
+)
 ncurses_archive_top_directory_name = "ncurses-6.2"
-ncurses_archive_path = temp_path.joinpath("ncurses.tar.gz")
 ncurses_package_path = packages_path.joinpath("ncurses")
+ncurses_build_size = 200 * 1024 * 1024
 ncurses_install_path = local_path
+ncursesw_name = "{}w".format(ncurses_name)
+ncurses_configure_args = ["--prefix={}".format(ncurses_install_path), "--with-shared"]
+ncursesw_configure_args = [
+    "--prefix={}".format(ncurses_install_path),
+    "--enable-widec",
+    "--with-shared",
+]
+
+
+def prefetch():
+    """download the ncurses archive ahead of its install."""
+    prefetch_archive(ncurses_archive_link, ncurses_name, ncurses_archive_sha256)
 
 
 @click.group()
@@ -31,87 +69,118 @@ def info():
 
 
 @ncurses.command()
-def install():
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
+def install(force):
     """install ncurses locally."""
-    # clone archive
-    download_archive(ncurses_archive_link, ncurses_archive_path, ncurses_name)
+    # skip unchanged build
+    ncurses_stamp = build_stamp(
+        ncurses_archive_sha256,
+        ncurses_install_path,
+        configure=ncurses_configure_args,
+        configure_widec=ncursesw_configure_args,
+    )
+    if not force and is_up_to_date(ncurses_name, ncurses_stamp):
+        console.print("[bold green]{} is up to date[/]".format(ncurses_name))
+        return
+
+    remove_stamp(ncurses_name)
+
+    # install prebuilt artifact
+    ncurses_artifact_key = artifact_key(ncurses_stamp)
+    if not force and restore_artifact(
+        ncurses_name, ncurses_artifact_key, ncurses_install_path
+    ):
+        write_stamp(ncurses_name, ncurses_stamp)
+        console.print("[bold green]ncurses has been installed with success[/]")
+        return
+
+    ncurses_compiler_cache_stats = compiler_cache_stats()
+
+    # build on the fastest location with enough space
+    try:
+        ncurses_work_path = build_directory(
+            ncurses_name, ncurses_package_path, ncurses_build_size
+        )
+    except NotEnoughSpace as exception:
+        print_msg_titled(
+            "[bold red]Error while placing ncurses build[/]", str(exception)
+        )
+        exit(1)
+    ncurses_build_path = ncurses_work_path.joinpath("build-ncurses")
+    ncursesw_build_path = ncurses_work_path.joinpath("build-ncursesw")
 
-    # extract archive
-    ncurses_tmp_path = temp_path.joinpath(ncurses_archive_top_directory_name)
+    # download and extract archive
+    ncurses_staging_path = staging_directory(ncurses_work_path)
+    ncurses_tmp_path = ncurses_staging_path.joinpath(ncurses_archive_top_directory_name)
 
     if ncurses_tmp_path.exists():
         remove(ncurses_tmp_path, "{}".format(ncurses_tmp_path))
 
-    extract_tarfile(ncurses_archive_path, temp_path, ncurses_name)
+    download_and_extract(
+        ncurses_archive_link, ncurses_staging_path, ncurses_name, ncurses_archive_sha256
+    )
 
     # move temp directory to repo
-    if ncurses_package_path.exists():
-        remove(ncurses_package_path, "{}".format(ncurses_package_path))
+    if ncurses_work_path.exists():
+        remove(ncurses_work_path, "{}".format(ncurses_work_path))
 
-    move(ncurses_tmp_path, ncurses_package_path, ncurses_name)
+    move(ncurses_tmp_path, ncurses_work_path, ncurses_name)
 
-    # configure
-    returncode, stdout, stderr = configure(
-        ncurses_package_path,
-        ["--prefix={}".format(ncurses_install_path), "--with-shared"],
-        ncurses_name,
-    )
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while configuring {}[/]".format(ncurses_name),
-            stdout,
-            stderr,
-        )
-        exit(1)
+    # configure and make both variants concurrently, out of tree
+    def build(build_path, configure_args, name):
+        build_path.mkdir()
 
-    # make
-    returncode, stdout, stderr = make(ncurses_package_path, [], ncurses_name)
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while making {}[/]".format(ncurses_name), stdout, stderr
+        returncode, stdout, stderr = configure(
+            build_path,
+            configure_args,
+            name,
+            cache=True,
+            source_path=ncurses_work_path,
         )
-        exit(1)
-
-    returncode, stdout, stderr = make_install(ncurses_package_path, [], ncurses_name)
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while installing {}[/]".format(ncurses_name),
-            stdout,
-            stderr,
+        if returncode != 0:
+            return "configuring", returncode, stdout, stderr
+
+        returncode, stdout, stderr = make(build_path, [], name)
+        return "making", returncode, stdout, stderr
+
+    variants = [
+        (ncurses_build_path, ncurses_configure_args, ncurses_name),
+        (ncursesw_build_path, ncursesw_configure_args, ncursesw_name),
+    ]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(variants)) as executor:
+        results = list(executor.map(lambda variant: build(*variant), variants))
+
+    for (_, _, name), (step, returncode, stdout, stderr) in zip(variants, results):
+        if returncode != 0:
+            print_stdoutputs(
+                "[bold red]Error while {} {}[/]".format(step, name), stdout, stderr
+            )
+            exit(1)
+
+    # make install, one variant after the other as they share files, staged to be
+    # packed as artifact
+    ncurses_destdir_path = destdir_path(ncurses_name, ncurses_install_path)
+    for build_path, _, name in variants:
+        returncode, stdout, stderr = make_install(
+            build_path, ["DESTDIR={}".format(ncurses_destdir_path)], name
         )
-        exit(1)
-
-    ncursesw_name = "{}w".format(ncurses_name)
-
-    # configure
-    returncode, stdout, stderr = configure(
-        ncurses_package_path,
-        ["--prefix={}".format(ncurses_install_path), "--enable-widec", "--with-shared"],
-        ncursesw_name,
+        if returncode != 0:
+            print_stdoutputs(
+                "[bold red]Error while installing {}[/]".format(name), stdout, stderr
+            )
+            exit(1)
+
+    store_artifact(
+        ncurses_name, ncurses_artifact_key, ncurses_destdir_path, ncurses_install_path
     )
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while configuring {}[/]".format(ncursesw_name),
-            stdout,
-            stderr,
-        )
-        exit(1)
 
-    # make
-    returncode, stdout, stderr = make(ncurses_package_path, [], ncursesw_name)
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while making {}[/]".format(ncursesw_name), stdout, stderr
-        )
-        exit(1)
-
-    returncode, stdout, stderr = make_install(ncurses_package_path, [], ncursesw_name)
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while installing {}[/]".format(ncursesw_name),
-            stdout,
-            stderr,
-        )
-        exit(1)
+    print_compiler_cache_stats(ncurses_compiler_cache_stats, ncurses_name)
+    write_stamp(ncurses_name, ncurses_stamp)
 
     console.print("[bold green]ncurses has been installed with success[/]")
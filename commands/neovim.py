@@ -1,9 +1,39 @@
+import shlex
+
 import click
 
+from .utils.artifacts import (
+    artifact_key,
+    destdir_path,
+    restore_artifact,
+    store_artifact,
+)
 from .utils.commands import call_command, is_callable
-from .utils.files import LocationExists, copy, create_directory, download_file
-from .utils.git import NotAGitRepo, clone_repository, update_repository
-from .utils.make import make, make_install
+from .utils.files import (
+    LocationExists,
+    NotEnoughSpace,
+    build_directory,
+    copy,
+    create_directory,
+    download_file,
+    remove,
+)
+from .utils.git import (
+    NotAGitRepo,
+    SyncedRepository,
+    clone_repository,
+    get_revision,
+    prefetch_repository,
+    update_repository,
+)
+from .utils.make import (
+    build_environment,
+    compiler_cache_stats,
+    make,
+    make_install,
+    print_compiler_cache_stats,
+    profile_cmake_args,
+)
 from .utils.print import print_msg_titled, print_stdoutputs
 from .utils.resources import (
     config_path,
@@ -12,6 +42,7 @@ from .utils.resources import (
     local_path,
     repositories_path,
 )
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 
 from .automake import install as automake_install
 from .libtool import install as libtool_install
@@ -20,13 +51,28 @@ nvim_name = "neovim"
 nvim_homepage = "https://neovim.io/"
 nvim_repo_link = "https://github.com/neovim/neovim.git"
 nvim_repo_path = repositories_path.joinpath("neovim")
+nvim_clone_options = {"blob_filter": "blob:none"}
 nvim_install_path = local_path
+nvim_make_args = ["CMAKE_INSTALL_PREFIX={}".format(nvim_install_path)]
 nvim_build_path = nvim_repo_path.joinpath("build")
+nvim_build_size = 1024 * 1024 * 1024
 nvim_init_path = configs_path.joinpath("neovim/init.vim")
 nvim_config_path = config_path.joinpath("nvim")
 vimplug_link = "https://raw.githubusercontent.com/junegunn/vim-plug/master/plug.vim"
 
 
+def prefetch():
+    """clone or fetch the neovim repository ahead of its install."""
+    prefetch_repository(nvim_repo_link, nvim_repo_path, nvim_name, **nvim_clone_options)
+
+
+def repository():
+    """get the neovim repository, kept up to date by the sync command."""
+    return SyncedRepository(
+        nvim_repo_link, nvim_repo_path, nvim_name, **nvim_clone_options
+    )
+
+
 @click.group()
 def neovim():
     """neovim commmands group."""
@@ -44,8 +90,14 @@ def info():
 
 @neovim.command()
 @click.option("--with-dependencies", is_flag=True, help="Install with dependencies")
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
 @click.pass_context
-def install(ctx, with_dependencies):
+def install(ctx, with_dependencies, force):
     """install neovim locally."""
     # handle dependencies
     if with_dependencies:
@@ -54,7 +106,9 @@ def install(ctx, with_dependencies):
 
     # clone repository
     try:
-        clone_repository(nvim_repo_link, nvim_repo_path, nvim_name)
+        clone_repository(
+            nvim_repo_link, nvim_repo_path, nvim_name, **nvim_clone_options
+        )
     except LocationExists as exception:
         pass
 
@@ -67,23 +121,90 @@ def install(ctx, with_dependencies):
             str(exception),
         )
 
-    # make
-    returncode, stdout, stderr = make(
-        nvim_repo_path, ["CMAKE_INSTALL_PREFIX={}".format(nvim_install_path)], nvim_name
+    # build unless unchanged
+    nvim_profile_make_args = nvim_make_args + [
+        "CMAKE_EXTRA_FLAGS={}".format(
+            shlex.join(profile_cmake_args(build_environment("cmake")))
+        )
+    ]
+    nvim_stamp = build_stamp(
+        get_revision(nvim_repo_path), nvim_install_path, make=nvim_profile_make_args
     )
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while compiling {}[/]".format(nvim_name), stdout, stderr
+    nvim_artifact_key = artifact_key(nvim_stamp)
+    if not force and is_up_to_date(nvim_name, nvim_stamp):
+        console.print("[bold green]{} is up to date[/]".format(nvim_name))
+    elif not force and restore_artifact(
+        nvim_name, nvim_artifact_key, nvim_install_path
+    ):
+        # installed from prebuilt artifact
+        write_stamp(nvim_name, nvim_stamp)
+    else:
+        remove_stamp(nvim_name)
+
+        nvim_compiler_cache_stats = compiler_cache_stats()
+
+        # build on the fastest location with enough space
+        try:
+            nvim_work_path = build_directory(nvim_name, nvim_repo_path, nvim_build_size)
+        except NotEnoughSpace as exception:
+            print_msg_titled(
+                "[bold red]Error while placing {} build[/]".format(nvim_name),
+                str(exception),
+            )
+            exit(1)
+
+        # the Makefile builds in the build directory of the repository, linked
+        # to the one of the build root, and builds the dependencies where told
+        nvim_work_build_path = nvim_work_path.joinpath("build")
+        if nvim_build_path.is_symlink():
+            nvim_build_path.unlink()
+        elif nvim_work_build_path != nvim_build_path and nvim_build_path.exists():
+            remove(nvim_build_path, "{} in-tree build".format(nvim_name))
+
+        if nvim_work_build_path != nvim_build_path:
+            nvim_work_build_path.mkdir(parents=True, exist_ok=True)
+            nvim_build_path.symlink_to(nvim_work_build_path)
+
+        nvim_work_make_args = nvim_profile_make_args + [
+            "DEPS_BUILD_DIR={}".format(nvim_work_path.joinpath(".deps"))
+        ]
+
+        # configure again, for the cmake arguments to apply
+        nvim_build_path.joinpath(".ran-cmake").unlink(missing_ok=True)
+
+        # make
+        returncode, stdout, stderr = make(
+            nvim_repo_path, nvim_work_make_args, nvim_name
         )
-        exit(1)
-
-    # make install
-    returncode, stdout, stderr = make_install(nvim_repo_path, [], nvim_name)
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while compiling {}[/]".format(nvim_name), stdout, stderr
+        if returncode != 0:
+            print_stdoutputs(
+                "[bold red]Error while compiling {}[/]".format(nvim_name),
+                stdout,
+                stderr,
+            )
+            exit(1)
+
+        # make install, staged to be packed as artifact
+        nvim_destdir_path = destdir_path(nvim_name, nvim_install_path)
+        returncode, stdout, stderr = make_install(
+            nvim_repo_path,
+            nvim_work_make_args + ["DESTDIR={}".format(nvim_destdir_path)],
+            nvim_name,
         )
-        exit(1)
+        if returncode != 0:
+            print_stdoutputs(
+                "[bold red]Error while compiling {}[/]".format(nvim_name),
+                stdout,
+                stderr,
+            )
+            exit(1)
+
+        store_artifact(
+            nvim_name, nvim_artifact_key, nvim_destdir_path, nvim_install_path
+        )
+
+        print_compiler_cache_stats(nvim_compiler_cache_stats, nvim_name)
+        write_stamp(nvim_name, nvim_stamp)
 
     # installing vimplug
     share_path = local_path.joinpath("share")
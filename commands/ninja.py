@@ -1,10 +1,18 @@
 import click
 
 from .utils.print import print_msg_titled, print_stdoutputs
-from .utils.git import clone_repository, update_repository, NotAGitRepo
+from .utils.git import (
+    NotAGitRepo,
+    SyncedRepository,
+    clone_repository,
+    get_revision,
+    prefetch_repository,
+    update_repository,
+)
 from .utils.resources import repositories_path, console
-from .utils.make import cmake
-from .utils.files import LocationExists
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
+from .utils.make import cmake, compiler_cache_stats, print_compiler_cache_stats
+from .utils.files import LocationExists, NotEnoughSpace, build_directory, copy
 
 from .cmake import install as cmake_install
 
@@ -12,6 +20,24 @@ ninja_name = "ninja"
 ninja_homepage = "https://ninja-build.org/"
 ninja_repo_link = "git://github.com/ninja-build/ninja.git"
 ninja_repo_path = repositories_path.joinpath("ninja")
+ninja_clone_options = {"depth": 1, "single_branch": True}
+ninja_build_path = ninja_repo_path.joinpath("build-cmake")
+ninja_build_size = 100 * 1024 * 1024
+ninja_cmake_args = ["-H."]
+
+
+def prefetch():
+    """clone or fetch the ninja repository ahead of its install."""
+    prefetch_repository(
+        ninja_repo_link, ninja_repo_path, ninja_name, **ninja_clone_options
+    )
+
+
+def repository():
+    """get the ninja repository, kept up to date by the sync command."""
+    return SyncedRepository(
+        ninja_repo_link, ninja_repo_path, ninja_name, **ninja_clone_options
+    )
 
 
 @click.group()
@@ -28,8 +54,14 @@ def info():
 
 @ninja.command()
 @click.option("--with-dependencies", is_flag=True, help="Install with dependencies")
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
 @click.pass_context
-def install(ctx, with_dependencies):
+def install(ctx, with_dependencies, force):
     """install ninja locally."""
     # handle dependencies
     if with_dependencies:
@@ -37,7 +69,9 @@ def install(ctx, with_dependencies):
 
     # clone repository
     try:
-        clone_repository(ninja_repo_link, ninja_repo_path, ninja_name)
+        clone_repository(
+            ninja_repo_link, ninja_repo_path, ninja_name, **ninja_clone_options
+        )
     except LocationExists as exception:
         pass
 
@@ -50,9 +84,37 @@ def install(ctx, with_dependencies):
             str(exception),
         )
 
+    # skip unchanged build
+    ninja_stamp = build_stamp(
+        get_revision(ninja_repo_path),
+        ninja_repo_path,
+        cmake=ninja_cmake_args,
+    )
+    if not force and is_up_to_date(ninja_name, ninja_stamp):
+        console.print("[bold green]{} is up to date[/]".format(ninja_name))
+        return
+
+    remove_stamp(ninja_name)
+
+    ninja_compiler_cache_stats = compiler_cache_stats()
+
+    # build on the fastest location with enough space
+    try:
+        ninja_work_path = build_directory(
+            ninja_name, ninja_build_path, ninja_build_size
+        )
+    except NotEnoughSpace as exception:
+        print_msg_titled(
+            "[bold red]Error while placing {} build[/]".format(ninja_name),
+            str(exception),
+        )
+        exit(1)
+
     # build ninja using cmake
     returncode, stdout, stderr = cmake(
-        ninja_repo_path, ["-Bbuild-cmake", "-H."], ninja_name
+        ninja_repo_path,
+        ["-B{}".format(ninja_work_path)] + ninja_cmake_args,
+        ninja_name,
     )
     if returncode != 0:
         print_stdoutputs(
@@ -61,7 +123,7 @@ def install(ctx, with_dependencies):
         exit(1)
 
     returncode, stdout, stderr = cmake(
-        ninja_repo_path, ["--build", "build-cmake"], ninja_name
+        ninja_repo_path, ["--build", str(ninja_work_path)], ninja_name
     )
     if returncode != 0:
         print_stdoutputs(
@@ -69,6 +131,14 @@ def install(ctx, with_dependencies):
         )
         exit(1)
 
+    # ninja is run from its build directory in the repository
+    if ninja_work_path != ninja_build_path:
+        ninja_build_path.mkdir(exist_ok=True)
+        copy(ninja_work_path.joinpath("ninja"), ninja_build_path, ninja_name)
+
+    print_compiler_cache_stats(ninja_compiler_cache_stats, ninja_name)
+    write_stamp(ninja_name, ninja_stamp)
+
     console.print(
         "[bold green]{} has been installed with success[/]".format(ninja_name)
     )
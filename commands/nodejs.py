@@ -1,19 +1,34 @@
 import click
 
-from .utils.files import download_archive, extract_tarfile, move, remove
+from .utils.files import (
+    NotEnoughSpace,
+    check_free_space,
+    download_and_extract,
+    prefetch_archive,
+    remove,
+    staging_directory,
+)
 from .utils.make import configure, make, make_install
+from .utils.manifests import install_tree
 from .utils.print import print_msg_titled, print_stdoutputs
-from .utils.resources import console, local_path, packages_path, temp_path
+from .utils.resources import console, local_path, packages_path
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 
 node_name = "node"
-node_version = "14.15.3"
+node_version = "14.21.3"
 node_homepage = "https://nodejs.org/en/"
-node_archive_link = "https://nodejs.org/dist/v14.15.3/node-v14.15.3-linux-x64.tar.xz"
-node_archive_top_directory_name = "node-v14.15.3-linux-x64"
-node_archive_path = temp_path.joinpath("node.tar.xz")
+node_archive_link = "https://nodejs.org/dist/v14.21.3/node-v14.21.3-linux-x64.tar.xz"
+node_archive_sha256 = "05c08a107c50572ab39ce9e8663a2a2d696b5d262d5bd6f98d84b997ce932d9a"
+node_archive_top_directory_name = "node-v14.21.3-linux-x64"
+node_extract_size = 200 * 1024 * 1024
 node_install_path = local_path
 
 
+def prefetch():
+    """download the node archive ahead of its install."""
+    prefetch_archive(node_archive_link, node_name, node_archive_sha256)
+
+
 @click.group()
 def node():
     """node commands group."""
@@ -30,20 +45,42 @@ def info():
 
 
 @node.command()
-def install():
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
+def install(force):
     """install node locally."""
-    # clone archive
-    download_archive(node_archive_link, node_archive_path, node_name)
+    # skip unchanged build
+    node_stamp = build_stamp(node_archive_sha256, node_install_path)
+    if not force and is_up_to_date(node_name, node_stamp):
+        console.print("[bold green]{} is up to date[/]".format(node_name))
+        return
+
+    remove_stamp(node_name)
 
-    # extract archive
-    node_tmp_path = temp_path.joinpath(node_archive_top_directory_name)
+    # download and extract archive
+    node_staging_path = staging_directory(node_install_path)
+    node_tmp_path = node_staging_path.joinpath(node_archive_top_directory_name)
 
     if node_tmp_path.exists():
         remove(node_tmp_path, "{}".format(node_tmp_path))
 
-    extract_tarfile(node_archive_path, temp_path, node_name)
+    try:
+        check_free_space(node_staging_path, node_extract_size, node_name)
+    except NotEnoughSpace as exception:
+        print_msg_titled("[bold red]Error while extracting node[/]", str(exception))
+        exit(1)
+
+    download_and_extract(
+        node_archive_link, node_staging_path, node_name, node_archive_sha256
+    )
 
     # move temp directory to install path
-    move(node_tmp_path, node_install_path, node_name, True)
+    install_tree(node_name, node_tmp_path, node_install_path)
+
+    write_stamp(node_name, node_stamp)
 
     console.print("[bold green]{} has been installed with success[/]".format(node_name))
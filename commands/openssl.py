@@ -1,13 +1,35 @@
 import click
 
-from .utils.files import LocationExists, copy, create_directory
+from .utils.artifacts import (
+    artifact_key,
+    destdir_path,
+    restore_artifact,
+    store_artifact,
+)
+from .utils.files import (
+    LocationExists,
+    NotEnoughSpace,
+    build_directory,
+    copy,
+    create_directory,
+)
 from .utils.git import (
     NotAGitRepo,
+    SyncedRepository,
     clone_repository,
+    get_revision,
+    is_repository_up_to_date,
+    prefetch_repository,
     remove_local_changes,
     update_repository,
 )
-from .utils.make import Configure, make, make_install
+from .utils.make import (
+    Configure,
+    compiler_cache_stats,
+    make,
+    make_install,
+    print_compiler_cache_stats,
+)
 from .utils.print import print_msg_titled, print_stdoutputs
 from .utils.resources import (
     config_path,
@@ -17,15 +39,40 @@ from .utils.resources import (
     local_path,
     repositories_path,
 )
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 
 openssl_name = "openssl"
 openssl_homepage = "https://www.openssl.org/"
 openssl_repo_link = "https://github.com/openssl/openssl.git"
 openssl_repo_path = repositories_path.joinpath("openssl")
+openssl_clone_options = {"blob_filter": "blob:none", "single_branch": True}
 openssl_install_path = local_path
 openssl_directory = home_path.joinpath(".ssl")
 openssl_vimfrc_path = configs_path.joinpath("openssl/opensslrc")
 openssl_config_path = config_path.joinpath("openssl")
+openssl_configure_args = [
+    "--prefix={}".format(openssl_install_path),
+    "--openssldir={}".format(openssl_directory),
+]
+openssl_build_size = 500 * 1024 * 1024
+
+
+def prefetch():
+    """clone or fetch the openssl repository ahead of its install."""
+    prefetch_repository(
+        openssl_repo_link, openssl_repo_path, openssl_name, **openssl_clone_options
+    )
+
+
+def repository():
+    """get the openssl repository, kept up to date by the sync command."""
+    return SyncedRepository(
+        openssl_repo_link,
+        openssl_repo_path,
+        openssl_name,
+        discard_changes=True,
+        **openssl_clone_options
+    )
 
 
 @click.group()
@@ -44,38 +91,91 @@ def info():
 
 
 @openssl.command()
-def install():
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
+def install(force):
     """install openssl locally."""
     # clone repository
     try:
-        clone_repository(openssl_repo_link, openssl_repo_path, openssl_name)
+        clone_repository(
+            openssl_repo_link, openssl_repo_path, openssl_name, **openssl_clone_options
+        )
     except LocationExists as exception:
         pass
 
-    # remove local changes
+    # remove local changes and update local repository, unless the remote branch
+    # is checked out already
     try:
-        remove_local_changes(openssl_repo_path, openssl_name)
+        if force or not is_repository_up_to_date(openssl_repo_path, openssl_name):
+            remove_local_changes(openssl_repo_path, openssl_name)
+            update_repository(openssl_repo_path, openssl_name, check_remote=force)
     except NotAGitRepo as exception:
         print_msg_titled(
             "Error while updating {} repository".format(openssl_name), str(exception)
         )
 
-    # update local repository
+    # skip unchanged build
+    openssl_stamp = build_stamp(
+        get_revision(openssl_repo_path),
+        openssl_install_path,
+        configure=openssl_configure_args,
+    )
+    if not force and is_up_to_date(openssl_name, openssl_stamp):
+        console.print("[bold green]{} is up to date[/]".format(openssl_name))
+        return
+
+    remove_stamp(openssl_name)
+
+    # install prebuilt artifact
+    openssl_artifact_key = artifact_key(openssl_stamp)
+    if not force and restore_artifact(
+        openssl_name, openssl_artifact_key, openssl_install_path
+    ):
+        write_stamp(openssl_name, openssl_stamp)
+        console.print(
+            "[bold green]{} has been installed with success[/]".format(openssl_name)
+        )
+        return
+
+    openssl_compiler_cache_stats = compiler_cache_stats()
+
+    # build on the fastest location with enough space
     try:
-        update_repository(openssl_repo_path, openssl_name)
-    except NotAGitRepo as exception:
+        openssl_work_path = build_directory(
+            openssl_name, openssl_repo_path, openssl_build_size
+        )
+    except NotEnoughSpace as exception:
         print_msg_titled(
-            "Error while updating {} repository".format(openssl_name), str(exception)
+            "[bold red]Error while placing {} build[/]".format(openssl_name),
+            str(exception),
         )
+        exit(1)
+
+    openssl_source_path = None
+    if openssl_work_path != openssl_repo_path:
+        openssl_source_path = openssl_repo_path
+        openssl_work_path.mkdir(parents=True, exist_ok=True)
+
+        # a source tree configured by an in-tree build cannot be built out of tree
+        if openssl_repo_path.joinpath("configdata.pm").exists():
+            returncode, stdout, stderr = make(
+                openssl_repo_path, ["distclean"], openssl_name
+            )
+            if returncode != 0:
+                print_stdoutputs(
+                    "[bold red]Error while cleaning {}[/]".format(openssl_name),
+                    stdout,
+                    stderr,
+                )
+                exit(1)
 
     # Configure
     returncode, stdout, stderr = Configure(
-        openssl_repo_path,
-        [
-            "--prefix={}".format(openssl_install_path),
-            "--openssldir={}".format(openssl_directory),
-        ],
-        openssl_name,
+        openssl_work_path, openssl_configure_args, openssl_name, openssl_source_path
     )
     if returncode != 0:
         print_stdoutputs(
@@ -83,22 +183,35 @@ def install():
             stdout,
             stderr,
         )
+        exit(1)
 
     # make
-    returncode, stdout, stderr = make(openssl_repo_path, [], openssl_name)
+    returncode, stdout, stderr = make(openssl_work_path, [], openssl_name)
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while compiling {}[/]".format(openssl_name), stdout, stderr
         )
+        exit(1)
 
-    # make install
-    returncode, stdout, stderr = make_install(openssl_repo_path, [], openssl_name)
+    # make install, staged to be packed as artifact
+    openssl_destdir_path = destdir_path(openssl_name, openssl_install_path)
+    returncode, stdout, stderr = make_install(
+        openssl_work_path, ["DESTDIR={}".format(openssl_destdir_path)], openssl_name
+    )
     if returncode != 0:
         print_stdoutputs(
             "[bold red]Error while installing {}[/]".format(openssl_name),
             stdout,
             stderr,
         )
+        exit(1)
+
+    store_artifact(
+        openssl_name, openssl_artifact_key, openssl_destdir_path, openssl_install_path
+    )
+
+    print_compiler_cache_stats(openssl_compiler_cache_stats, openssl_name)
+    write_stamp(openssl_name, openssl_stamp)
 
     console.print(
         "[bold green]{} has been installed with success[/]".format(openssl_name)
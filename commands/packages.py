@@ -0,0 +1,322 @@
+import concurrent.futures
+import importlib
+import os
+import sys
+
+import click
+from rich import filesize
+from rich.table import Table
+
+from . import commands_groups
+from .utils.commands import run_command
+from .utils.files import get_build_roots
+from .utils.git import sync_concurrency, sync_repositories
+from .utils.graph import (
+    CyclicDependency,
+    UnknownNode,
+    dependency_closure,
+    run_graph,
+    topological_sort,
+)
+from .utils.make import get_jobs, get_load_average, get_profile
+from .utils.manifests import (
+    check_installed_files,
+    read_index,
+    read_manifest,
+    remove_installed_files,
+)
+from .utils.print import print_msg_titled, print_stdoutputs
+from .utils.resources import (
+    config_files_repo_path,
+    console,
+    default_transient_progress,
+)
+from .utils.stamps import remove_stamp
+from .utils.trace import get_trace_path, merge_trace, traced
+
+packages_dependencies = {
+    "autoconf": [],
+    "automake": ["autoconf"],
+    "bash": [],
+    "cmake": ["openssl"],
+    "libtool": [],
+    "llvm": [],
+    "ncurses": [],
+    "neovim": ["automake", "libtool"],
+    "ninja": ["cmake"],
+    "node": [],
+    "openssl": [],
+    "vifm": ["ncurses"],
+}
+"""dict: maps each command group to the groups it depends on."""
+
+install_script_path = config_files_repo_path.joinpath("install.py")
+
+
+def prefetch_package(package_name):
+    """Download the sources of a package ahead of its install.
+
+    Packages whose module defines no ``prefetch`` function are skipped.
+
+    Args:
+        package_name (str): the command group of the package.
+    """
+    module = importlib.import_module(commands_groups[package_name][0])
+    prefetch = getattr(module, "prefetch", None)
+    if prefetch is not None:
+        prefetch()
+
+
+def global_options():
+    """Get the global ``install.py`` options forwarded to package installs.
+
+    Returns:
+        list: the global options as command line arguments.
+    """
+    options = [
+        "--jobs",
+        str(get_jobs()),
+        "--load-average",
+        str(get_load_average()),
+        "--profile",
+        get_profile(),
+    ]
+    for build_root in get_build_roots():
+        options += ["--build-root", str(build_root)]
+
+    return options
+
+
+@click.command()
+@click.argument("package_names", nargs=-1, required=True)
+@click.option(
+    "--max-parallel",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Maximum number of packages installed at once, each one building "
+    "with the global --jobs",
+)
+@click.option(
+    "--max-prefetch",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of sources downloaded at once",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Rebuild every package even if nothing changed",
+)
+def install(package_names, max_parallel, max_prefetch, force):
+    """install packages and their dependencies, or all of them with "all"."""
+    if "all" in package_names:
+        package_names = list(packages_dependencies)
+
+    try:
+        order = topological_sort(
+            packages_dependencies,
+            dependency_closure(packages_dependencies, package_names),
+        )
+    except (UnknownNode, CyclicDependency) as exception:
+        print_msg_titled("[bold red]Error while resolving packages[/]", str(exception))
+        exit(1)
+
+    console.print("Installing {}".format(", ".join(order)))
+
+    with default_transient_progress() as progress, concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_prefetch
+    ) as prefetch_executor:
+        # sources are downloaded while the packages they depend on are built
+        prefetches = {
+            package_name: prefetch_executor.submit(prefetch_package, package_name)
+            for package_name in order
+        }
+
+        @traced
+        def install_package(package_name):
+            # a failed prefetch is retried by the install itself
+            try:
+                prefetches[package_name].result()
+            except Exception as exception:
+                console.print(
+                    "[bold yellow]Prefetching {} failed: {}[/]".format(
+                        package_name, exception
+                    )
+                )
+
+            task_id = progress.add_task(
+                "Installing {}...".format(package_name), start=False
+            )
+
+            args = [sys.executable, str(install_script_path)] + global_options()
+
+            # each package process writes its own trace, merged once it exits
+            trace_path = get_trace_path()
+            if trace_path is not None:
+                package_trace_path = trace_path.with_name(
+                    "{}.{}.json".format(trace_path.stem, package_name)
+                )
+                args += ["--trace", str(package_trace_path)]
+
+            args += [package_name, "install"]
+            env = dict(os.environ)
+            if force:
+                env["CONFIG_FILES_FORCE"] = "1"
+
+            returncode, stdout, stderr = run_command(
+                args, env=env, log_name="install {}".format(package_name)
+            )
+
+            progress.remove_task(task_id)
+
+            if trace_path is not None:
+                merge_trace(package_trace_path)
+                package_trace_path.unlink(missing_ok=True)
+
+            if returncode != 0:
+                print_stdoutputs(
+                    "[bold red]Error while installing {}[/]".format(package_name),
+                    stdout,
+                    stderr,
+                )
+                return False
+
+            console.print("Installing {}...[bold green]Done![/]".format(package_name))
+            return True
+
+        results = run_graph(packages_dependencies, order, install_package, max_parallel)
+
+    skipped = [name for name in order if results[name] is None]
+    if skipped:
+        console.print(
+            "[bold red]Skipped because of failed dependencies: {}[/]".format(
+                ", ".join(skipped)
+            )
+        )
+
+    if not all(results.values()):
+        exit(1)
+
+    console.print("[bold green]{} installed with success[/]".format(", ".join(order)))
+
+
+@click.command()
+@click.argument("package_names", nargs=-1)
+@click.option(
+    "--max-concurrency",
+    type=click.IntRange(min=1),
+    default=sync_concurrency,
+    show_default=True,
+    help="Maximum number of repositories synced at once",
+)
+def sync(package_names, max_concurrency):
+    """clone or update the repositories of packages, or of all of them."""
+    if not package_names:
+        package_names = list(packages_dependencies)
+
+    repositories = []
+    for package_name in package_names:
+        if package_name not in packages_dependencies:
+            print_msg_titled(
+                "[bold red]Error while resolving packages[/]",
+                "unknown package {}".format(package_name),
+            )
+            exit(1)
+
+        module = importlib.import_module(commands_groups[package_name][0])
+        repository = getattr(module, "repository", None)
+        if repository is not None:
+            repositories.append(repository())
+
+    results = sync_repositories(repositories, max_concurrency)
+
+    failed = False
+    for repo_name, exception in results.items():
+        if exception is not None:
+            failed = True
+            print_msg_titled(
+                "[bold red]Error while syncing {} repository[/]".format(repo_name),
+                str(exception),
+            )
+
+    if failed:
+        exit(1)
+
+
+@click.command()
+@click.argument("package_names", nargs=-1)
+@click.option(
+    "--check",
+    is_flag=True,
+    help="Compare the installed files sizes and modes with the manifests",
+)
+def status(package_names, check):
+    """print the installed packages, from their manifests."""
+    if not package_names:
+        package_names = sorted(set(read_index().values()))
+
+    table = Table("Package", "Files", "Size", "Prefix", box=None)
+    if check:
+        table.add_column("Missing")
+        table.add_column("Modified")
+
+    for package_name in package_names:
+        manifest = read_manifest(package_name)
+        if manifest is None:
+            table.add_row(package_name, "[bold red]not installed[/]")
+            continue
+
+        files = manifest["files"]
+        row = [
+            package_name,
+            str(len(files)),
+            filesize.decimal(sum(entry["size"] for entry in files.values())),
+            manifest["prefix"],
+        ]
+        if check:
+            missing, modified = check_installed_files(manifest)
+            row += [
+                "[{}]{}[/]".format("bold red" if missing else "green", len(missing)),
+                "[{}]{}[/]".format("bold red" if modified else "green", len(modified)),
+            ]
+        table.add_row(*row)
+
+    console.print(table)
+
+
+@click.command()
+@click.argument("package_names", nargs=-1, required=True)
+def uninstall(package_names):
+    """uninstall packages, removing the files they installed."""
+    installed = set(read_index().values())
+
+    for package_name in package_names:
+        if read_manifest(package_name) is None:
+            console.print("[bold red]{} is not installed[/]".format(package_name))
+            continue
+
+        dependents = [
+            name
+            for name, dependencies in packages_dependencies.items()
+            if package_name in dependencies and name in installed
+        ]
+        if dependents:
+            console.print(
+                "[bold yellow]{} is needed by {}[/]".format(
+                    package_name, ", ".join(dependents)
+                )
+            )
+
+        with default_transient_progress() as progress:
+            progress.add_task("Uninstalling {}...".format(package_name), start=False)
+            removed_count = remove_installed_files(package_name)
+            remove_stamp(package_name)
+
+        installed.discard(package_name)
+        console.print(
+            "Uninstalling {} ({} files)...[bold green]Done![/]".format(
+                package_name, removed_count
+            )
+        )
@@ -0,0 +1,7 @@
+from .artifacts import (
+    artifact_key,
+    artifacts_kept_per_package,
+    destdir_path,
+    restore_artifact,
+    store_artifact,
+)
@@ -0,0 +1,175 @@
+"""Prebuilt artifacts functions."""
+
+import hashlib
+import json
+import os
+import pathlib
+import platform
+import shutil
+import tarfile
+
+from ..files import extract_tarfile, staging_directory
+from ..make import compiler_identity
+from ..manifests import install_tree
+from ..resources import artifacts_path, console, default_transient_progress
+from ..trace import traced
+
+artifacts_kept_per_package = 3
+"""int: the number of artifacts kept for each package, the least recently used
+ones being removed first."""
+
+artifacts_layout = 2
+"""int: the version of the layout of the artifacts, part of their key so that
+artifacts of a previous layout are not restored."""
+
+
+def artifact_key(stamp):
+    """Get the key of the artifact of a build.
+
+    Args:
+        stamp (dict): the build stamp of the package, see ``build_stamp``.
+
+    Returns:
+        str: a digest of the build stamp, compilers and platform, which changes
+            whenever the package would be built differently.
+    """
+    identity = {
+        "stamp": stamp,
+        "compiler": compiler_identity(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "layout": artifacts_layout,
+    }
+
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()
+
+
+def _artifact_path(package_name, key):
+    return artifacts_path.joinpath("{}-{}.tar.gz".format(package_name, key))
+
+
+def _staged_prefix_path(destdir, prefix):
+    return destdir.joinpath(prefix.relative_to(prefix.anchor))
+
+
+def _staged_trees(destdir, prefix):
+    # installs may stage trees beside the prefix, like the configuration
+    # directory of openssl, which are installed at the same location
+    trees = []
+    staged_path = destdir
+    for part in prefix.relative_to(prefix.anchor).parts:
+        for entry_path in sorted(staged_path.iterdir()):
+            if entry_path.name != part:
+                trees.append(
+                    (
+                        entry_path,
+                        pathlib.Path(prefix.anchor, entry_path.relative_to(destdir)),
+                    )
+                )
+        staged_path = staged_path.joinpath(part)
+
+    return trees
+
+
+def destdir_path(package_name, prefix):
+    """Get an empty directory in which to stage the install of a package.
+
+    The directory is meant to be given as ``DESTDIR`` to the install step of the
+    package, then to ``store_artifact``.
+
+    Args:
+        package_name (str): the name of the package.
+        prefix (Path): where the package is installed.
+
+    Returns:
+        Path: the staging directory, on the same filesystem as ``prefix``.
+    """
+    path = staging_directory(prefix).joinpath("{}.destdir".format(package_name))
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir()
+
+    return path
+
+
+@traced
+def store_artifact(package_name, key, destdir, prefix):
+    """Pack a staged install as an artifact, then install it in its prefix.
+
+    Every tree staged in ``destdir`` is packed and installed, including the ones
+    outside of the prefix.
+
+    Args:
+        package_name (str): the name of the package.
+        key (str): the key of the artifact, see ``artifact_key``.
+        destdir (Path): the directory in which the package was installed, see
+            ``destdir_path``.
+        prefix (Path): where the package is installed.
+    """
+    staged_prefix_path = _staged_prefix_path(destdir, prefix)
+    staged_prefix_path.mkdir(parents=True, exist_ok=True)
+
+    artifact_path = _artifact_path(package_name, key)
+    temp_artifact_path = artifact_path.with_name(
+        "{}.{}".format(artifact_path.name, os.getpid())
+    )
+
+    with default_transient_progress() as progress:
+        progress.add_task("Packing {} artifact...".format(package_name), start=False)
+
+        with tarfile.open(temp_artifact_path, "w:gz") as tar:
+            for entry_path in sorted(destdir.iterdir()):
+                tar.add(entry_path, entry_path.name)
+
+        os.replace(temp_artifact_path, artifact_path)
+
+    console.print("Packing {} artifact...[bold green]Done![/]".format(package_name))
+
+    _evict_artifacts(package_name)
+
+    install_tree(
+        package_name, staged_prefix_path, prefix, _staged_trees(destdir, prefix)
+    )
+    shutil.rmtree(destdir)
+
+
+@traced
+def restore_artifact(package_name, key, prefix):
+    """Install a package from its artifact, if there is one.
+
+    Args:
+        package_name (str): the name of the package.
+        key (str): the key of the artifact, see ``artifact_key``.
+        prefix (Path): where the package is installed.
+
+    Returns:
+        bool: True if the package was installed from its artifact, False if there
+            is no artifact with this key.
+    """
+    artifact_path = _artifact_path(package_name, key)
+    if not artifact_path.exists():
+        return False
+
+    destdir = destdir_path(package_name, prefix)
+    extract_tarfile(artifact_path, destdir, "{} artifact".format(package_name))
+    os.utime(artifact_path)
+
+    staged_prefix_path = _staged_prefix_path(destdir, prefix)
+    staged_prefix_path.mkdir(parents=True, exist_ok=True)
+
+    install_tree(
+        package_name, staged_prefix_path, prefix, _staged_trees(destdir, prefix)
+    )
+    shutil.rmtree(destdir)
+
+    return True
+
+
+def _evict_artifacts(package_name):
+    package_artifact_paths = sorted(
+        artifacts_path.glob("{}-*.tar.gz".format(package_name)),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for artifact_path in package_artifact_paths[artifacts_kept_per_package:]:
+        artifact_path.unlink(missing_ok=True)
@@ -0,0 +1,43 @@
+import importlib
+
+import click
+
+
+class LazyGroup(click.Group):
+    """``click`` group importing the modules of its commands when they are used.
+
+    Commands are given by name with the module defining them, under the same
+    name, and their help text. Listing the commands, in ``--help`` for instance,
+    uses these help texts and imports nothing.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, _ = self.lazy_commands[cmd_name]
+            module = importlib.import_module(module_name)
+            self.add_command(getattr(module, cmd_name), cmd_name)
+
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        rows = []
+        for cmd_name in self.list_commands(ctx):
+            if cmd_name in self.commands:
+                command = self.commands[cmd_name]
+                if command.hidden:
+                    continue
+                help_text = command.get_short_help_str(formatter.width)
+            else:
+                help_text = self.lazy_commands[cmd_name][1]
+            rows.append((cmd_name, help_text))
+
+        if rows:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
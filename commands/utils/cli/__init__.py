@@ -0,0 +1 @@
+from .LazyGroup import LazyGroup
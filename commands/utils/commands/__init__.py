@@ -1 +1,7 @@
-from .commands import call_command, is_callable
+from .commands import (
+    call_command,
+    is_callable,
+    log_path,
+    output_tail_lines,
+    run_command,
+)
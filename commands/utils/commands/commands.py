@@ -1,7 +1,13 @@
+import collections
 import shutil
 import subprocess
+import threading
 
-from ..resources import console, default_transient_progress
+from ..resources import console, default_transient_progress, logs_path
+from ..trace import traced
+
+output_tail_lines = 200
+"""int: the number of last output lines kept in memory by ``run_command``."""
 
 
 def is_callable(command):
@@ -16,6 +22,7 @@ def is_callable(command):
     return shutil.which(command) is not None
 
 
+@traced
 def call_command(args, command_name=""):
     """Invoke a command in the given directory.
 
@@ -34,9 +41,83 @@ def call_command(args, command_name=""):
     with default_transient_progress() as progress:
         progress.add_task("Calling {}command...".format(command_name), start=False)
 
-        result = subprocess.run(args, capture_output=True, text=True)
+        returncode, stdout, stderr = run_command(args, log_name=command_name)
 
-    if result.returncode == 0:
+    if returncode == 0:
         console.print("Calling {} command...[bold green]Done![/]".format(command_name))
 
-    return result.returncode, result.stdout, result.stderr
+    return returncode, stdout, stderr
+
+
+def log_path(log_name):
+    """Get the path of a log file written by ``run_command``.
+
+    Args:
+        log_name (str): the name of the log file, without extension.
+
+    Returns:
+        Path: the path to the log file.
+    """
+    log_name = "-".join(log_name.split()).replace("/", "-")
+    return logs_path.joinpath("{}.log".format(log_name))
+
+
+def run_command(args, cwd=None, env=None, log_name="", on_line=None):
+    """Run a command, streaming its outputs to a log file.
+
+    Both outputs are written to the log file as they come, in the order they
+    come. Only their last ``output_tail_lines`` lines are kept in memory, and
+    decoded once the command is over.
+
+    Args:
+        args (list): the arguments used to run the command, the first being the
+            name of the command itself.
+        cwd (Path): the directory in which the command is run. Default to None,
+            in which case the current directory is used.
+        env (dict): the environment of the command. Default to None, in which
+            case the current environment is used.
+        log_name (str): the name of the log file, without extension. Default to
+            the name of the command.
+        on_line (callable): called with every line of the standard output, as
+            bytes, while the command runs. Default to None.
+
+    Returns:
+        int: the return code of the command. If it is different than zero then
+            something went wrong.
+        str: the last lines of the standard output of the command.
+        str: the last lines of the standard error output of the command.
+    """
+    command_log_path = log_path(log_name or args[0])
+    log_lock = threading.Lock()
+
+    with open(command_log_path, "wb") as log:
+        process = subprocess.Popen(
+            args, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+        def read(pipe, tail, on_line=None):
+            for line in pipe:
+                tail.append(line)
+                with log_lock:
+                    log.write(line)
+                if on_line is not None:
+                    on_line(line)
+
+        stdout_tail = collections.deque(maxlen=output_tail_lines)
+        stderr_tail = collections.deque(maxlen=output_tail_lines)
+        readers = [
+            threading.Thread(target=read, args=(process.stdout, stdout_tail, on_line)),
+            threading.Thread(target=read, args=(process.stderr, stderr_tail)),
+        ]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+
+        returncode = process.wait()
+
+    header = "[full output in {}]\n".format(command_log_path)
+    stdout = header + b"".join(stdout_tail).decode(errors="replace")
+    stderr = b"".join(stderr_tail).decode(errors="replace")
+
+    return returncode, stdout, stderr
@@ -0,0 +1,4 @@
+class ChecksumMismatch(Exception):
+    """Raised when a file does not match its expected checksum."""
+
+    pass
@@ -0,0 +1,84 @@
+import io
+import os
+import threading
+
+
+class DownloadStream(io.RawIOBase):
+    """Readable stream over a file being written by ``segmented_download``.
+
+    The stream is given the segments of the download through ``update``, and
+    reads block until the bytes they ask for are written. It thus follows the
+    head segment while the other segments are downloaded ahead.
+    """
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+        self.condition = threading.Condition()
+        self.available = 0
+        self.position = 0
+        self.finished = False
+        self.error = None
+        self.fd = None
+
+    def update(self, segments):
+        """Record the bytes written by the download.
+
+        Args:
+            segments (list): the segments of the download, as ``[start, end,
+                done]`` lists.
+        """
+        available = 0
+        for start, end, done in sorted(segments):
+            available = start + done
+            if available < end:
+                break
+
+        with self.condition:
+            self.available = available
+            self.condition.notify_all()
+
+    def finish(self, error=None):
+        """Mark the download as over.
+
+        Args:
+            error (Exception): the exception that made the download fail,
+                raised by the following reads. Default to None.
+        """
+        with self.condition:
+            self.finished = True
+            self.error = error
+            self.condition.notify_all()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        # reads are made under the lock, for a restarted download not to drop
+        # the bytes being read
+        with self.condition:
+            while self.available <= self.position and not self.finished:
+                self.condition.wait()
+
+            if self.error is not None:
+                raise self.error
+            if self.available <= self.position:
+                return 0
+
+            if self.fd is None:
+                self.fd = os.open(self.file_path, os.O_RDONLY)
+            data = os.pread(
+                self.fd,
+                min(len(buffer), self.available - self.position),
+                self.position,
+            )
+
+        buffer[: len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        super().close()
@@ -0,0 +1,4 @@
+class NotEnoughSpace(Exception):
+    """Raised when a filesystem has not enough free space for a build."""
+
+    pass
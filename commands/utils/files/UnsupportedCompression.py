@@ -0,0 +1,4 @@
+class UnsupportedCompression(Exception):
+    """Raised when no backend is able to decompress a stream."""
+
+    pass
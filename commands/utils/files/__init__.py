@@ -2,12 +2,30 @@ from .files import (
     copy,
     create_directory,
     create_resources_dirs,
+    download_and_extract,
     download_archive,
     download_file,
     extract_tarfile,
+    is_same_filesystem,
     move,
+    prefetch_archive,
     remove,
+    staging_directory,
 )
+from .build_roots import (
+    build_directory,
+    check_free_space,
+    get_build_roots,
+    has_free_space,
+    set_build_roots,
+)
+from .cache import evict_cached_downloads, file_sha256
+from .decompress import decompressed_stream, detect_compression
+from .download import segmented_download
+from .session import get_session
+from .ChecksumMismatch import ChecksumMismatch
 from .LocationDoesNotExist import LocationDoesNotExist
 from .LocationExists import LocationExists
 from .NotADirectory import NotADirectory
+from .NotEnoughSpace import NotEnoughSpace
+from .UnsupportedCompression import UnsupportedCompression
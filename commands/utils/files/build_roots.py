@@ -0,0 +1,118 @@
+"""Placement of package builds on fast directories with enough free space."""
+
+import shutil
+
+from ..resources import console
+from .NotEnoughSpace import NotEnoughSpace
+
+build_space_margin = 1.2
+"""float: the factor applied to the estimated size of a build when checking the
+free space of a filesystem, for the estimate to be exceeded safely."""
+
+_build_roots = []
+
+
+def get_build_roots():
+    """Get the directories in which packages are built first.
+
+    Returns:
+        list: the build roots, by order of preference.
+    """
+    return list(_build_roots)
+
+
+def set_build_roots(build_roots):
+    """Set the directories in which packages are built first.
+
+    Args:
+        build_roots (list): the build roots, by order of preference. They are
+            meant to be fast, such as a tmpfs or a local disk, and are created
+            if needed.
+    """
+    global _build_roots
+
+    _build_roots = list(build_roots)
+
+
+def has_free_space(path, size):
+    """Check if the filesystem of an existing location has room for a build.
+
+    Args:
+        path (Path): the location.
+        size (int): the estimated size of the build, in bytes.
+
+    Returns:
+        bool: True if the free space exceeds ``size`` by ``build_space_margin``.
+    """
+    return shutil.disk_usage(path).free >= size * build_space_margin
+
+
+def check_free_space(path, size, app_name=""):
+    """Check that the filesystem of a location has room for a build.
+
+    Args:
+        path (Path): the location. It may not exist yet, in which case its
+            nearest existing parent is checked.
+        size (int): the estimated size of the build, in bytes.
+        app_name (str): the name of the built application, used in messages only.
+
+    Raises:
+        NotEnoughSpace: if the filesystem has not enough free space.
+    """
+    anchor = path
+    while not anchor.exists():
+        anchor = anchor.parent
+
+    if not has_free_space(anchor, size):
+        raise NotEnoughSpace(
+            "{} needs {} MiB in {}, {} MiB are free".format(
+                app_name or path,
+                int(size * build_space_margin) // 1024**2,
+                anchor,
+                shutil.disk_usage(anchor).free // 1024**2,
+            )
+        )
+
+
+def build_directory(package_name, package_path, size):
+    """Get the directory in which to build a package.
+
+    The first build root with enough free space is used, see
+    ``get_build_roots``. Build roots without room are skipped with a warning.
+
+    Args:
+        package_name (str): the name of the package.
+        package_path (Path): the default location of the build, used when no
+            build root has room for it.
+        size (int): the estimated size of the build, sources included, in bytes.
+
+    Returns:
+        Path: the directory in which to build the package. It may not exist yet.
+
+    Raises:
+        NotEnoughSpace: if neither a build root nor ``package_path`` has room for
+            the build.
+    """
+    for build_root in _build_roots:
+        try:
+            build_root.mkdir(parents=True, exist_ok=True)
+        except OSError as exception:
+            console.print(
+                "[bold yellow]Build root {} is not usable: {}[/]".format(
+                    build_root, exception
+                )
+            )
+            continue
+
+        if has_free_space(build_root, size):
+            return build_root.joinpath(package_name)
+
+        console.print(
+            "[bold yellow]Not enough space in {} to build {}[/]".format(
+                build_root, package_name
+            )
+        )
+
+    check_free_space(package_path, size, package_name)
+
+    return package_path
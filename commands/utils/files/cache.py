@@ -0,0 +1,146 @@
+"""Download cache functions."""
+
+import hashlib
+import os
+
+from ..resources import downloads_cache_path
+from .ChecksumMismatch import ChecksumMismatch
+
+downloads_cache_max_size = 4 * 1024**3
+"""int: the size in bytes above which least recently used downloads are evicted."""
+
+hash_chunk_size = 1024 * 1024
+"""int: the size of the blocks read when hashing a file."""
+
+
+def file_sha256(file_path):
+    """Compute the sha256 checksum of a file.
+
+    Args:
+        file_path (Path): the file to hash.
+
+    Returns:
+        str: the hexadecimal checksum of the file.
+    """
+    checksum = hashlib.sha256()
+
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(hash_chunk_size), b""):
+            checksum.update(block)
+
+    return checksum.hexdigest()
+
+
+def cache_entry_path(link, sha256=None):
+    """Get the cache entry of a download.
+
+    Args:
+        link (str): the link of the downloaded file.
+        sha256 (str): the expected checksum of the downloaded file, if known.
+
+    Returns:
+        Path: the location of the cache entry, which may not exist.
+    """
+    key = hashlib.sha256("{}\n{}".format(link, sha256 or "").encode()).hexdigest()
+    return downloads_cache_path.joinpath(key)
+
+
+def cache_partial_path(link, sha256=None):
+    """Get the location where a download is written before entering the cache.
+
+    Args:
+        link (str): the link of the downloaded file.
+        sha256 (str): the expected checksum of the downloaded file, if known.
+
+    Returns:
+        Path: the location of the partial download.
+    """
+    return cache_entry_path(link, sha256).with_suffix(".part")
+
+
+def lookup_cached_download(link, sha256=None):
+    """Look for a download in the cache.
+
+    The content of a found entry is verified against its checksum. An entry that
+    does not match is removed from the cache.
+
+    Args:
+        link (str): the link of the downloaded file.
+        sha256 (str): the expected checksum of the downloaded file, if known.
+
+    Returns:
+        Path: the location of the cached file, None if it is not cached.
+    """
+    entry_path = cache_entry_path(link, sha256)
+    checksum_path = entry_path.with_suffix(".sha256")
+
+    if not entry_path.exists() or not checksum_path.exists():
+        return None
+
+    expected_sha256 = sha256 or checksum_path.read_text().strip()
+    if file_sha256(entry_path) != expected_sha256:
+        entry_path.unlink()
+        checksum_path.unlink()
+        return None
+
+    os.utime(entry_path)
+
+    return entry_path
+
+
+def store_cached_download(link, file_path, file_checksum, sha256=None):
+    """Move a downloaded file in the cache.
+
+    Args:
+        link (str): the link of the downloaded file.
+        file_path (Path): the downloaded file. It must be in the cache
+            directory, see ``cache_partial_path``.
+        file_checksum (str): the sha256 checksum of the downloaded file.
+        sha256 (str): the expected checksum of the downloaded file, if known.
+
+    Returns:
+        Path: the location of the cached file.
+
+    Raises:
+        ChecksumMismatch: if the downloaded file does not match ``sha256``. The
+            downloaded file is removed.
+    """
+    if sha256 is not None and file_checksum != sha256:
+        file_path.unlink()
+        raise ChecksumMismatch(
+            "{} has checksum {}, expected {}".format(link, file_checksum, sha256)
+        )
+
+    entry_path = cache_entry_path(link, sha256)
+    os.replace(file_path, entry_path)
+    entry_path.with_suffix(".sha256").write_text(file_checksum)
+
+    evict_cached_downloads()
+
+    return entry_path
+
+
+def evict_cached_downloads(max_size=downloads_cache_max_size):
+    """Remove the least recently used downloads until the cache fits a size.
+
+    The most recently used download is always kept.
+
+    Args:
+        max_size (int): the maximum size of the cache in bytes.
+    """
+    entries = [
+        (entry_path.stat(), entry_path)
+        for entry_path in downloads_cache_path.iterdir()
+        if entry_path.suffix == ""
+    ]
+    entries.sort(key=lambda entry: entry[0].st_mtime)
+
+    total_size = sum(stat.st_size for stat, _ in entries)
+
+    for stat, entry_path in entries[:-1]:
+        if total_size <= max_size:
+            break
+
+        entry_path.unlink()
+        entry_path.with_suffix(".sha256").unlink(missing_ok=True)
+        total_size -= stat.st_size
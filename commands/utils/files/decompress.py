@@ -0,0 +1,140 @@
+"""Decompression backends."""
+
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import shutil
+import subprocess
+import threading
+
+from .UnsupportedCompression import UnsupportedCompression
+
+compression_magic_numbers = {
+    "gz": b"\x1f\x8b",
+    "xz": b"\xfd7zXZ\x00",
+    "zst": b"\x28\xb5\x2f\xfd",
+    "bz2": b"BZh",
+}
+"""dict: maps each compression format to the bytes starting its streams."""
+
+decompression_backends = {
+    "gz": [["pigz", "-dc"]],
+    "xz": [["xz", "-T0", "-dc"], ["pixz", "-d"]],
+    "zst": [["zstd", "-T0", "-dc"]],
+    "bz2": [["lbzip2", "-dc"], ["pbzip2", "-dc"]],
+}
+"""dict: maps each compression format to the external decompressors able to
+decompress it, by order of preference. Each one reads from its standard input
+and writes to its standard output."""
+
+stdlib_decompressors = {
+    "gz": lambda fileobj: gzip.GzipFile(fileobj=fileobj),
+    "xz": lzma.LZMAFile,
+    "bz2": bz2.BZ2File,
+}
+"""dict: maps each compression format to the standard library decompressor used
+when no external decompressor is available."""
+
+
+def detect_compression(header):
+    """Detect the compression format of a stream from its first bytes.
+
+    Args:
+        header (bytes): the first bytes of the stream.
+
+    Returns:
+        str: the compression format, see ``compression_magic_numbers``. None if
+            the stream is not compressed or its format is unknown.
+    """
+    for compression, magic_number in compression_magic_numbers.items():
+        if header.startswith(magic_number):
+            return compression
+
+    return None
+
+
+def decompression_command(compression):
+    """Find an available external decompressor for a compression format.
+
+    Args:
+        compression (str): the compression format.
+
+    Returns:
+        list: the arguments used to call the decompressor, None if none of the
+            decompressors of the format is installed.
+    """
+    for args in decompression_backends.get(compression, []):
+        if shutil.which(args[0]) is not None:
+            return args
+
+    return None
+
+
+@contextlib.contextmanager
+def decompressed_stream(fileobj):
+    """Decompress a stream with the best available backend.
+
+    The compression format is detected from the first bytes of the stream. A
+    multithreaded external decompressor is used when one is installed, fed from
+    a thread so reading, decompressing and consuming the stream overlap. The
+    standard library is used otherwise. Uncompressed streams are yielded as is.
+
+    Args:
+        fileobj (file object): the compressed stream, opened in binary mode. It
+            is read until its end.
+
+    Yields:
+        file object: the decompressed stream.
+
+    Raises:
+        UnsupportedCompression: if no backend is able to decompress the stream.
+        subprocess.CalledProcessError: if the external decompressor fails.
+    """
+    if not hasattr(fileobj, "peek"):
+        fileobj = io.BufferedReader(fileobj)
+
+    compression = detect_compression(fileobj.peek(8))
+    if compression is None:
+        yield fileobj
+        return
+
+    args = decompression_command(compression)
+    if args is None:
+        if compression not in stdlib_decompressors:
+            raise UnsupportedCompression(
+                "no decompressor installed for {} streams".format(compression)
+            )
+
+        with stdlib_decompressors[compression](fileobj) as stream:
+            yield stream
+        return
+
+    process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def feed():
+        try:
+            shutil.copyfileobj(fileobj, process.stdin, 1024 * 1024)
+        except BrokenPipeError:
+            pass
+        finally:
+            with contextlib.suppress(BrokenPipeError):
+                process.stdin.close()
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    try:
+        yield process.stdout
+
+        # drain what follows the consumed data so the feeder reaches the end
+        while process.stdout.read(1024 * 1024):
+            pass
+    finally:
+        process.stdout.close()
+        feeder.join()
+        returncode = process.wait()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, args)
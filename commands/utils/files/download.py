@@ -0,0 +1,222 @@
+"""Segmented and resumable download functions.
+
+``requests`` and ``urllib3`` are slow to import, they are imported by the
+functions using them so that commands not downloading anything start quickly.
+"""
+
+import concurrent.futures
+import json
+import os
+import threading
+import time
+
+from .session import get_session
+
+download_connections = 4
+"""int: the number of parallel connections used to download a file."""
+
+min_segment_size = 8 * 1024 * 1024
+"""int: the minimal size in bytes of a segment downloaded by a connection."""
+
+min_chunk_size = 64 * 1024
+"""int: the minimal size in bytes of the blocks read from a connection."""
+
+max_chunk_size = 8 * 1024 * 1024
+"""int: the maximal size in bytes of the blocks read from a connection."""
+
+download_retries = 3
+"""int: the number of times a segment is resumed after a connection error."""
+
+
+def segmented_download(
+    link,
+    file_path,
+    progress=None,
+    task_id=None,
+    connections=download_connections,
+    on_write=None,
+):
+    """Download a file using parallel range requests.
+
+    The file is split in segments, each downloaded by its own connection and
+    written in place. The state of the segments is saved next to the file so an
+    interrupted download is resumed by calling this function again. Servers not
+    supporting range requests are downloaded on a single connection, from the
+    start. Connections come from the shared pool of ``get_session``.
+
+    Args:
+        link (str): the link of the file to download.
+        file_path (Path): where to download the file.
+        progress (Progress): the ``rich`` progress to advance. Default to None.
+        task_id (TaskID): the task of ``progress`` to advance. Default to None.
+        connections (int): the maximal number of parallel connections.
+        on_write (callable): called with the segments of the file, as ``[start,
+            end, done]`` lists, whenever some of them is written. Default to
+            None.
+
+    Raises:
+        requests.RequestException: if a request fails more than
+            ``download_retries`` times in a row.
+        urllib3.exceptions.HTTPError: if a connection breaks more than
+            ``download_retries`` times in a row.
+    """
+    import requests
+    import urllib3
+
+    state_path = file_path.with_name("{}.state".format(file_path.name))
+
+    session = get_session()
+    head = session.head(link, allow_redirects=True, headers={"Accept-Encoding": ""})
+    size = int(head.headers.get("Content-Length", 0)) if head.ok else 0
+    ranges = head.ok and head.headers.get("Accept-Ranges") == "bytes" and size > 0
+    validator = head.headers.get("ETag") or head.headers.get("Last-Modified")
+
+    state = _load_state(state_path)
+    if (
+        not ranges
+        or not file_path.exists()
+        or state.get("link") != link
+        or state.get("size") != size
+        or state.get("validator") != validator
+    ):
+        state = {
+            "link": link,
+            "size": size,
+            "validator": validator,
+            "segments": _split(size, connections if ranges else 1),
+        }
+        with open(file_path, "wb") as file:
+            file.truncate(size)
+
+    if progress is not None:
+        progress.update(
+            task_id,
+            total=size or None,
+            completed=sum(done for _, _, done in state["segments"]),
+        )
+        progress.start_task(task_id)
+
+    lock = threading.Lock()
+    saved = [time.monotonic()]
+    fd = os.open(file_path, os.O_WRONLY)
+
+    def save_state(force=False):
+        with lock:
+            if on_write is not None:
+                on_write(state["segments"])
+            if force or time.monotonic() - saved[0] > 1:
+                _save_state(state_path, state)
+                saved[0] = time.monotonic()
+
+    if on_write is not None:
+        on_write(state["segments"])
+
+    def download_segment(segment):
+        for attempt in range(download_retries + 1):
+            try:
+                _download_segment(
+                    session,
+                    link,
+                    fd,
+                    segment,
+                    ranges,
+                    progress,
+                    task_id,
+                    save_state,
+                )
+                return
+            except (requests.RequestException, urllib3.exceptions.HTTPError):
+                if attempt == download_retries:
+                    raise
+            finally:
+                save_state(force=True)
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(state["segments"])
+        ) as executor:
+            for future in [
+                executor.submit(download_segment, segment)
+                for segment in state["segments"]
+            ]:
+                future.result()
+    finally:
+        os.close(fd)
+
+    state_path.unlink(missing_ok=True)
+
+
+def _split(size, connections):
+    count = max(1, min(connections, size // min_segment_size))
+    bounds = [size * i // count for i in range(count + 1)]
+    return [[bounds[i], bounds[i + 1], 0] for i in range(count)]
+
+
+def _load_state(state_path):
+    try:
+        return json.loads(state_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state_path, state):
+    temp_state_path = state_path.with_name("{}.tmp".format(state_path.name))
+    temp_state_path.write_text(json.dumps(state))
+    os.replace(temp_state_path, state_path)
+
+
+def _download_segment(
+    session, link, fd, segment, ranges, progress, task_id, save_state
+):
+    import requests
+
+    start, end, done = segment
+    if ranges and start + done >= end:
+        return
+
+    if not ranges and done > 0:
+        # without ranges a retry gets the file again from its start, the
+        # segment is reset before its bytes are dropped
+        segment[2] = done = 0
+        save_state(force=True)
+        os.ftruncate(fd, 0)
+        if progress is not None:
+            progress.update(task_id, completed=0)
+
+    headers = {"Accept-Encoding": ""}
+    if ranges:
+        headers["Range"] = "bytes={}-{}".format(start + done, end - 1)
+
+    with session.get(link, stream=True, headers=headers) as response:
+        response.raise_for_status()
+        if ranges and response.status_code != 206:
+            raise requests.RequestException("{} ignored range request".format(link))
+
+        if not ranges and progress is not None:
+            total = response.headers.get("Content-Length")
+            progress.update(task_id, total=int(total) if total else None)
+
+        chunk_size = 1024 * 1024
+        offset = start + done
+
+        while True:
+            read_start = time.monotonic()
+            data = response.raw.read(chunk_size)
+            if not data:
+                break
+
+            os.pwrite(fd, data, offset)
+            offset += len(data)
+            segment[2] = offset - start
+
+            # grow blocks on fast connections and shrink them on slow ones
+            elapsed = time.monotonic() - read_start
+            if elapsed < 0.25:
+                chunk_size = min(chunk_size * 2, max_chunk_size)
+            elif elapsed > 1:
+                chunk_size = max(chunk_size // 2, min_chunk_size)
+
+            save_state()
+
+            if progress is not None:
+                progress.advance(task_id, len(data))
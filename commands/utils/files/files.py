@@ -1,13 +1,31 @@
 """Files functions."""
 
+import concurrent.futures
+import errno
 import os
 import pathlib
 import shutil
-import tarfile
 
-import requests
-
-from ..resources import console, default_transient_progress, resources_dir_paths
+from ..resources import (
+    console,
+    default_transient_progress,
+    resources_dir_paths,
+    staging_path,
+)
+from ..trace import record_bytes, traced
+from .cache import (
+    cache_partial_path,
+    file_sha256,
+    lookup_cached_download,
+    store_cached_download,
+)
+from .decompress import decompressed_stream
+from .DownloadStream import DownloadStream
+from .download import segmented_download
+from .session import get_session
+
+move_batch_size = 256
+"""int: the number of entries moved by a worker at once when merging trees."""
 
 
 def create_directory(dir_path):
@@ -28,63 +46,143 @@ def create_resources_dirs():
             create_directory(dir_path)
 
 
-def download_archive(archive_link, archive_path, archive_name=""):
+@traced
+def download_archive(archive_link, archive_path, archive_name="", sha256=None):
     """Download an archive or binary file.
 
+    The archive is downloaded in the downloads cache and ``archive_path`` is
+    linked to the cached file. An archive already in the cache is not
+    downloaded again.
+
     Args:
         archive_link (str): the archive's link
         archive_path (Path): where to download the archive
         archive_name (str): the name of the archive. It is used in printed
             messages only.
+        sha256 (str): the expected checksum of the archive. Default to None, in
+            which case the archive is cached by link only.
+
+    Raises:
+        ChecksumMismatch: if the downloaded archive does not match ``sha256``.
     """
     if archive_name != "" and not archive_name.endswith(" "):
         archive_name = "{} ".format(archive_name)
 
-    with open(archive_path, "wb") as archive:
-        with default_transient_progress() as progress:
-            task_id = progress.add_task(
-                "Downloading {}archive...".format(archive_name), start=False
-            )
+    cached_path = lookup_cached_download(archive_link, sha256)
 
-            response = requests.get(
-                archive_link, stream=True, headers={"Accept-Encoding": ""}
-            )
-            total = int(response.headers.get("Content-Length"))
+    if cached_path is None:
+        cached_path = _download_to_cache(
+            archive_link, sha256, "Downloading {}archive...".format(archive_name)
+        )
+        console.print(
+            "Downloading {}archive...[bold green]Done![/]".format(archive_name)
+        )
+    else:
+        console.print(
+            "Downloading {}archive...[bold green]Cached![/]".format(archive_name)
+        )
 
-            progress.update(task_id, total=total)
-            progress.start_task(task_id)
+    _link_cached_download(cached_path, archive_path)
 
-            for data in response.iter_content(chunk_size=1024):
-                archive.write(data)
-                progress.advance(task_id, len(data))
 
-    console.print("Downloading {}archive...[bold green]Done![/]".format(archive_name))
+@traced
+def prefetch_archive(archive_link, archive_name="", sha256=None):
+    """Download an archive to the downloads cache, ahead of its use.
 
+    ``download_archive`` and ``download_and_extract`` then use the cached copy.
+    Nothing is downloaded if the archive is already cached.
 
-def download_file(file_link, file_path, file_name=""):
+    Args:
+        archive_link (str): the archive's link
+        archive_name (str): the name of the archive. It is used in printed
+            messages only.
+        sha256 (str): the expected checksum of the archive. Default to None, in
+            which case the archive is cached by link only.
+
+    Raises:
+        ChecksumMismatch: if the downloaded archive does not match ``sha256``.
+    """
+    if lookup_cached_download(archive_link, sha256) is not None:
+        return
+
+    if archive_name != "" and not archive_name.endswith(" "):
+        archive_name = "{} ".format(archive_name)
+
+    _download_to_cache(
+        archive_link, sha256, "Prefetching {}archive...".format(archive_name)
+    )
+    console.print("Prefetching {}archive...[bold green]Done![/]".format(archive_name))
+
+
+@traced
+def download_file(file_link, file_path, file_name="", sha256=None):
     """Download a file.
 
+    Files are only cached when their checksum is given, as an unpinned link may
+    change upstream.
+
     Args:
         file_link (str): the file's link
         file_path (Path): where to download the file
         file_name (str): the name of the file. It is used in printed messages only.
+        sha256 (str): the expected checksum of the file. Default to None.
+
+    Raises:
+        ChecksumMismatch: if the downloaded file does not match ``sha256``.
     """
     if file_name != "" and not file_name.endswith(" "):
         file_name = "{} ".format(file_name)
 
+    if sha256 is not None:
+        cached_path = lookup_cached_download(file_link, sha256)
+
+        if cached_path is None:
+            cached_path = _download_to_cache(
+                file_link, sha256, "Downloading {}file...".format(file_name)
+            )
+
+        shutil.copyfile(cached_path, file_path)
+        console.print("Downloading {}file...[bold green]Done![/]".format(file_name))
+        return
+
     with open(file_path, "wb") as file:
         with default_transient_progress() as progress:
             progress.add_task("Downloading {}file...".format(file_name), start=False)
 
-            response = requests.get(file_link)
+            response = get_session().get(file_link)
+            response.raise_for_status()
             file.write(response.content)
+            record_bytes(len(response.content))
 
     console.print("Downloading {}file...[bold green]Done![/]".format(file_name))
 
 
+def _download_to_cache(link, sha256, description):
+    partial_path = cache_partial_path(link, sha256)
+
+    with default_transient_progress() as progress:
+        task_id = progress.add_task(description, start=False)
+        segmented_download(link, partial_path, progress, task_id)
+
+    record_bytes(partial_path.stat().st_size)
+
+    return store_cached_download(link, partial_path, file_sha256(partial_path), sha256)
+
+
+def _link_cached_download(cached_path, target_path):
+    if target_path.exists() or target_path.is_symlink():
+        target_path.unlink()
+
+    os.symlink(cached_path, target_path)
+
+
+@traced
 def extract_tarfile(tarfile_path, tarfile_target, tarfile_name=""):
     """Extract a tarfile to the given target.
 
+    The tarfile is decompressed by the best backend available for its format,
+    see ``decompressed_stream``.
+
     Args:
         tarfile_path (Path): the location of the tarfile
         tarfile_target (Path): where to extract the tarfile
@@ -97,35 +195,156 @@ def extract_tarfile(tarfile_path, tarfile_target, tarfile_name=""):
     with default_transient_progress() as progress:
         progress.add_task("Extracting {}tarfile...".format(tarfile_name), start=False)
 
-        with tarfile.open(tarfile_path) as tar:
-            tar.extractall(tarfile_target)
+        with open(tarfile_path, "rb") as tarfile_stream:
+            _extract_stream(tarfile_stream, tarfile_target)
+
+        record_bytes(tarfile_path.stat().st_size)
 
     console.print("Extracting {}tarfile...[bold green]Done![/]".format(tarfile_name))
 
 
+def _extract_stream(fileobj, tarfile_target):
+    # imported when used, as commands not extracting anything do not need it
+    import tarfile
+
+    with decompressed_stream(fileobj) as stream:
+        with tarfile.open(fileobj=stream, mode="r|") as tar:
+            tar.extractall(tarfile_target)
+
+
+@traced
+def download_and_extract(archive_link, tarfile_target, archive_name="", sha256=None):
+    """Download a tarfile and extract it to the given target as it arrives.
+
+    The archive is downloaded in the downloads cache by ``segmented_download``,
+    and decompressed and extracted from the cache file while it is being
+    written. An archive already in the cache is extracted from there.
+
+    Args:
+        archive_link (str): the archive's link
+        tarfile_target (Path): where to extract the tarfile
+        archive_name (str): the name of the archive. It is used in printed
+            messages only.
+        sha256 (str): the expected checksum of the archive. Default to None, in
+            which case the archive is cached by link only.
+
+    Raises:
+        ChecksumMismatch: if the downloaded archive does not match ``sha256``.
+    """
+    cached_path = lookup_cached_download(archive_link, sha256)
+    if cached_path is not None:
+        extract_tarfile(cached_path, tarfile_target, archive_name)
+        return
+
+    if archive_name != "" and not archive_name.endswith(" "):
+        archive_name = "{} ".format(archive_name)
+
+    partial_path = cache_partial_path(archive_link, sha256)
+    stream = DownloadStream(partial_path)
+
+    with default_transient_progress() as progress:
+        task_id = progress.add_task(
+            "Downloading and extracting {}archive...".format(archive_name),
+            start=False,
+        )
+
+        def download():
+            try:
+                segmented_download(
+                    archive_link,
+                    partial_path,
+                    progress,
+                    task_id,
+                    on_write=stream.update,
+                )
+            except BaseException as exception:
+                stream.finish(exception)
+                raise
+            stream.finish()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(download)
+            try:
+                with stream:
+                    _extract_stream(stream, tarfile_target)
+            except Exception:
+                # a failed download fails the extraction, it is the one reported
+                future.result()
+                raise
+            future.result()
+
+    record_bytes(partial_path.stat().st_size)
+    store_cached_download(archive_link, partial_path, file_sha256(partial_path), sha256)
+
+    console.print(
+        "Downloading and extracting {}archive...[bold green]Done![/]".format(
+            archive_name
+        )
+    )
+
+
+def staging_directory(target):
+    """Get a directory on the same filesystem as a target.
+
+    Trees extracted in such a directory can be moved to the target with a single
+    ``rename``, instead of being copied across filesystems.
+
+    Args:
+        target (Path): the location to where the staged trees will be moved. It
+            may not exist yet.
+
+    Returns:
+        Path: ``staging_path`` if it is on the same filesystem as the target, a
+            hidden directory next to the target otherwise. It is created if
+            needed.
+    """
+    anchor = target
+    while not anchor.exists():
+        anchor = anchor.parent
+
+    if staging_path.exists() and is_same_filesystem(staging_path, anchor):
+        return staging_path
+
+    if anchor == target:
+        anchor = anchor.parent
+
+    target_staging_path = anchor.joinpath(".{}".format(staging_path.name))
+    target_staging_path.mkdir(exist_ok=True)
+
+    return target_staging_path
+
+
+def is_same_filesystem(first_path, second_path):
+    """Check if two existing locations are on the same filesystem.
+
+    Args:
+        first_path (Path): the first location.
+        second_path (Path): the second location.
+
+    Returns:
+        bool: True if both locations are on the same device, False otherwise.
+    """
+    return first_path.stat().st_dev == second_path.stat().st_dev
+
+
+@traced
 def move(source, target, source_name="", force=False):
     """Move source to target.
 
+    Whole trees are moved with a single ``rename`` when source and target are on
+    the same filesystem. When merging into an existing target, each source
+    directory missing in the target is also moved with one ``rename``; only the
+    directories present on both sides are walked, and their entries are moved in
+    parallel batches. Entries are renamed, so that a directory created meanwhile
+    in the target, by a concurrent install, is merged too instead of receiving
+    the source entry.
+
     Args:
         source (Path): the source to move.
         target (Path): where to move the source to.
         force (boolean): wether the move should overwrite files in destination.
         source_name (str): the name of the sourse, used in printed messages only.
     """
-
-    def move_force(source, target):
-        for dirpath, dirnames, filenames in os.walk(source):
-            src_dir = pathlib.Path(dirpath)
-            dest_dir = pathlib.Path(dirpath.replace(str(source), str(target), 1))
-
-            if not dest_dir.exists():
-                create_directory(dest_dir)
-
-            for file in filenames:
-                src = src_dir.joinpath(file)
-                dst = dest_dir.joinpath(file)
-                shutil.move(src, dst)
-
     if source_name != "" and not source_name.startswith(" "):
         source_name = " {}".format(source_name)
 
@@ -135,11 +354,81 @@ def move(source, target, source_name="", force=False):
         if not force:
             shutil.move(str(source), target)
         else:
-            move_force(source, target)
+            _merge(source, target)
 
     console.print("Moving{}...[bold green]Done![/]".format(source_name))
 
 
+def _merge(source, target):
+    if not target.exists():
+        _move_entry(str(source), target)
+        return
+
+    # collect the entries to move, descending only in directories on both sides
+    moves = []
+    merged_dirs = [(source, target)]
+    index = 0
+
+    while index < len(merged_dirs):
+        src_dir, dst_dir = merged_dirs[index]
+        index += 1
+
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                dst = dst_dir.joinpath(entry.name)
+                if (
+                    entry.is_dir(follow_symlinks=False)
+                    and dst.is_dir()
+                    and not dst.is_symlink()
+                ):
+                    merged_dirs.append((pathlib.Path(entry.path), dst))
+                else:
+                    moves.append((entry.path, dst))
+
+    def move_batch(batch):
+        for src, dst in batch:
+            _move_entry(src, dst)
+
+    batches = [
+        moves[start : start + move_batch_size]
+        for start in range(0, len(moves), move_batch_size)
+    ]
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        for _ in executor.map(move_batch, batches):
+            pass
+
+    # the merged directories are now empty, deepest first
+    for src_dir, _ in reversed(merged_dirs):
+        src_dir.rmdir()
+
+
+def _move_entry(src, dst):
+    # other installs may create dst meanwhile, which shutil.move would then move
+    # src into, while a rename fails and lets the directories be merged
+    try:
+        os.rename(src, dst)
+        return
+    except OSError as exception:
+        if exception.errno not in (
+            errno.EEXIST,
+            errno.ENOTEMPTY,
+            errno.EISDIR,
+            errno.EXDEV,
+        ):
+            raise
+        error = exception
+
+    src_is_dir = os.path.isdir(src) and not os.path.islink(src)
+    dst_is_dir = os.path.isdir(dst) and not os.path.islink(dst)
+    if src_is_dir and dst_is_dir:
+        _merge(pathlib.Path(src), pathlib.Path(dst))
+    elif error.errno == errno.EXDEV and not dst_is_dir:
+        shutil.move(src, dst)
+    else:
+        raise error
+
+
+@traced
 def remove(source, source_name=""):
     """Remove a source.
 
@@ -161,6 +450,7 @@ def remove(source, source_name=""):
     console.print("Removing{}...[bold green]Done![/]".format(source_name))
 
 
+@traced
 def copy(source, target, source_name=""):
     """Copy source to target.
 
@@ -0,0 +1,35 @@
+"""Shared HTTP session functions."""
+
+import threading
+
+session_pool_size = 16
+"""int: the number of connections kept alive for each host."""
+
+http_session = None
+http_session_lock = threading.Lock()
+
+
+def get_session():
+    """Get the HTTP session shared by every download of the process.
+
+    Connections are pooled by host and kept alive between downloads, so
+    downloads from the same mirror do not open a new connection each.
+
+    Returns:
+        requests.Session: the shared session.
+    """
+    global http_session
+
+    with http_session_lock:
+        if http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            adapter = HTTPAdapter(
+                pool_connections=session_pool_size, pool_maxsize=session_pool_size
+            )
+            http_session = requests.Session()
+            http_session.mount("http://", adapter)
+            http_session.mount("https://", adapter)
+
+    return http_session
@@ -0,0 +1,35 @@
+class SyncedRepository:
+    """A repository kept up to date by ``sync_repositories``.
+
+    Args:
+        repo_link (str): link to repository origin
+        repo_path (Path): the location of the repository
+        repo_name (str): name of the repository used in print
+        depth (int): the number of commits of history to clone. Default to None,
+            in which case the whole history is cloned.
+        blob_filter (str): the filter of a partial clone. Default to None, in
+            which case every object is cloned.
+        single_branch (bool): wether to clone the history of the default branch
+            only. Default to False.
+        discard_changes (bool): wether the local changes are removed when the
+            repository is synced. Default to False, in which case the sync only
+            fast forwards the repository.
+    """
+
+    def __init__(
+        self,
+        repo_link,
+        repo_path,
+        repo_name,
+        depth=None,
+        blob_filter=None,
+        single_branch=False,
+        discard_changes=False,
+    ):
+        self.repo_link = repo_link
+        self.repo_path = repo_path
+        self.repo_name = repo_name
+        self.depth = depth
+        self.blob_filter = blob_filter
+        self.single_branch = single_branch
+        self.discard_changes = discard_changes
@@ -1,3 +1,13 @@
 from .CloneProgress import CloneProgress
-from .git import clone_repository, remove_local_changes, update_repository
+from .git import (
+    clone_repository,
+    get_revision,
+    is_repository_up_to_date,
+    prefetch_repository,
+    remove_local_changes,
+    update_repository,
+)
+from .mirrors import bundle_path, mirror_path, update_mirror
 from .NotAGitRepo import NotAGitRepo
+from .sync import sync_concurrency, sync_repositories
+from .SyncedRepository import SyncedRepository
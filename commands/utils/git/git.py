@@ -1,23 +1,49 @@
 """Wrapper for git actions."""
 
+import os
+
 import git
 
 from ..files import LocationDoesNotExist, LocationExists
 from ..resources import console, default_transient_progress
+from ..trace import traced
 from .CloneProgress import CloneProgress
+from .mirrors import mirror_path, update_mirror
 from .NotAGitRepo import NotAGitRepo
 
+shallow_deepen_steps = [64, 1024]
+"""list: the numbers of commits successively fetched to deepen a shallow clone
+when a pull fails, before fetching its whole history."""
+
 
-def clone_repository(repo_link, repo_path, repo_name=""):
+@traced
+def clone_repository(
+    repo_link,
+    repo_path,
+    repo_name="",
+    depth=None,
+    blob_filter=None,
+    single_branch=False,
+):
     """Clone a repository in the repository directory.
 
     Clone the given repository in the given location. If the given location
     already exists, an error is raised.
 
+    When mirrors are enabled, see ``git_mirrors_path``, the mirror of the
+    repository is updated first and the clone borrows its objects.
+
     Args:
         repo_link (str): link to repository origin
         repo_path (Path): the location to where clone the repo
         app_name (str): name of the repository used in print. Default to empty
+        depth (int): the number of commits of history to clone. Default to None,
+            in which case the whole history is cloned.
+        blob_filter (str): the filter of a partial clone, for instance
+            ``"blob:none"`` to fetch file contents only when checked out.
+            Default to None, in which case every object is cloned.
+        single_branch (bool): wether to clone the history of the default branch
+            only. Default to False.
 
     Raises:
         LocationExists: if ``repo_path`` already exists.
@@ -34,21 +60,47 @@ def clone_repository(repo_link, repo_path, repo_name=""):
         if repo_path.exists():
             raise LocationExists("{} already exists".format(repo_path))
 
+        options = {}
+        if depth is not None:
+            options["depth"] = depth
+        if blob_filter is not None:
+            options["filter"] = blob_filter
+        if single_branch:
+            options["single_branch"] = True
+
+        repo_mirror_path = update_mirror(repo_link, repo_name)
+        if repo_mirror_path is not None:
+            options["multi_options"] = [
+                "--reference-if-able={}".format(repo_mirror_path)
+            ]
+
         git.Repo.clone_from(
-            repo_link, repo_path, progress=CloneProgress(progress, task_id)
+            repo_link, repo_path, progress=CloneProgress(progress, task_id), **options
         )
 
     console.print("Cloning {}repository...[bold green]Done![/]".format(repo_name))
 
 
-def update_repository(repo_path, repo_name=""):
+@traced
+def update_repository(repo_path, repo_name="", check_remote=True):
     """Update the given repository.
 
     Execute a ``git pull`` on the given repo. If the repository can not be opened
     an error is raised. If the repository does not exist, an error is also raised.
 
+    When a pull fails on a shallow clone because the history it needs is missing,
+    the clone is deepened step by step, and unshallowed as a last resort, until
+    the pull succeeds.
+
+    The remote branch is first looked up with ``git ls-remote``, nothing is
+    pulled if it points to the local ``HEAD``.
+
     Args:
         repo_path (Path): the path to the repository to update
+        repo_name (str): name of the repository used in print. Default to empty
+        check_remote (bool): wether to look the remote branch up before
+            pulling. Default to True. It is skipped by callers that already
+            called ``is_repository_up_to_date``.
 
     Raises:
         LocationDoesNotExist: when the repository does not exist
@@ -69,14 +121,105 @@ def update_repository(repo_path, repo_name=""):
             raise NotAGitRepo("{} is not a git repository".format(repo_path))
 
         origin = repo.remotes.origin
-        origin.pull()
+        if check_remote and _is_up_to_date(repo, origin):
+            console.print(
+                "Updating {}repository...[bold green]Up to date![/]".format(repo_name)
+            )
+            return
+
+        # the pull then finds the new objects in the shared mirror
+        if _uses_mirror(repo, origin):
+            update_mirror(origin.url, repo_name)
+
+        _pull(repo, origin)
 
     console.print("Updating {}repository...[bold green]Done![/]".format(repo_name))
 
 
+@traced
+def is_repository_up_to_date(repo_path, repo_name=""):
+    """Check if a repository has its remote branch checked out.
+
+    The remote branch is looked up with ``git ls-remote``, nothing is fetched.
+
+    Args:
+        repo_path (Path): the path to the repository
+        repo_name (str): name of the repository used in print. Default to empty
+
+    Returns:
+        bool: True if the remote branch points to the local ``HEAD``.
+
+    Raises:
+        LocationDoesNotExist: when the repository does not exist
+        NotAGitRepo: when the repository can not be opened
+    """
+    if repo_name != "" and not repo_name.endswith(" "):
+        repo_name = "{} ".format(repo_name)
+
+    with default_transient_progress() as progress:
+        progress.add_task("Checking {}repository...".format(repo_name), start=False)
+
+        if not repo_path.exists():
+            raise LocationDoesNotExist("{} does not exist".format(repo_path))
+
+        try:
+            repo = git.Repo(repo_path)
+        except:
+            raise NotAGitRepo("{} is not a git repository".format(repo_path))
+
+        up_to_date = _is_up_to_date(repo, repo.remotes.origin)
+
+    if up_to_date:
+        console.print(
+            "Checking {}repository...[bold green]Up to date![/]".format(repo_name)
+        )
+
+    return up_to_date
+
+
+@traced
+def prefetch_repository(repo_link, repo_path, repo_name="", **clone_options):
+    """Clone a repository, or fetch its remote changes without merging them.
+
+    A later ``update_repository`` then has nothing left to download.
+
+    Args:
+        repo_link (str): link to repository origin
+        repo_path (Path): the location of the repository
+        repo_name (str): name of the repository used in print. Default to empty
+        **clone_options: the options of ``clone_repository``, used if the
+            repository is not cloned yet.
+
+    Raises:
+        NotAGitRepo: when the repository can not be opened
+    """
+    if not repo_path.exists():
+        clone_repository(repo_link, repo_path, repo_name, **clone_options)
+        return
+
+    if repo_name != "" and not repo_name.endswith(" "):
+        repo_name = "{} ".format(repo_name)
+
+    with default_transient_progress() as progress:
+        progress.add_task("Fetching {}repository...".format(repo_name), start=False)
+
+        try:
+            repo = git.Repo(repo_path)
+        except:
+            raise NotAGitRepo("{} is not a git repository".format(repo_path))
+
+        repo.remotes.origin.fetch()
+
+    console.print("Fetching {}repository...[bold green]Done![/]".format(repo_name))
+
+
 def remove_local_changes(repo_path, repo_name=""):
     """Remove all local changes in a repository.
 
+    Only the files that differ from ``HEAD``, in the index or in the working
+    tree, are restored. The others keep their timestamps, so that they are not
+    rebuilt.
+
     Args:
         repo_path (Path): the path to the repository to clean.
         repo_name (str): the name of the repository, used in printed messages only.
@@ -99,6 +242,103 @@ def remove_local_changes(repo_path, repo_name=""):
         except:
             raise NotAGitRepo("{} is not a git repository".format(repo_path))
 
-        repo.git.reset("--hard")
+        dirty_paths = _dirty_paths(repo)
+        if dirty_paths:
+            repo.git.restore(
+                "--source=HEAD",
+                "--staged",
+                "--worktree",
+                "--",
+                *dirty_paths,
+                env={"GIT_LITERAL_PATHSPECS": "1"}
+            )
 
     console.print("Removing {}local changes...[bold green]Done![/]".format(repo_name))
+
+
+def _is_up_to_date(repo, origin):
+    try:
+        tracking_branch = repo.active_branch.tracking_branch()
+    except TypeError:
+        # detached HEAD
+        return False
+
+    if tracking_branch is None:
+        return False
+
+    try:
+        remote_refs = repo.git.ls_remote(
+            origin.name, "refs/heads/{}".format(tracking_branch.remote_head)
+        )
+    except git.GitCommandError:
+        return False
+
+    return remote_refs.split()[:1] == [repo.head.commit.hexsha]
+
+
+def _uses_mirror(repo, origin):
+    repo_mirror_path = mirror_path(origin.url)
+    if repo_mirror_path is None:
+        return False
+
+    alternates_path = os.path.join(repo.common_dir, "objects", "info", "alternates")
+    try:
+        with open(alternates_path) as alternates:
+            alternates_paths = alternates.read().split()
+    except FileNotFoundError:
+        return False
+
+    return str(repo_mirror_path.joinpath("objects")) in alternates_paths
+
+
+def _dirty_paths(repo):
+    paths = set()
+    for diff_args in [["HEAD"], ["--cached", "HEAD"]]:
+        output = repo.git.diff(*diff_args, "--name-only", "--no-renames", "-z")
+        paths.update(path for path in output.split("\0") if path)
+
+    return sorted(paths)
+
+
+def _pull(repo, origin):
+    try:
+        origin.pull()
+        return
+    except git.GitCommandError:
+        if repo.git.rev_parse("--is-shallow-repository") != "true":
+            raise
+
+    for deepen in shallow_deepen_steps:
+        origin.fetch(deepen=deepen)
+        try:
+            origin.pull()
+            return
+        except git.GitCommandError:
+            pass
+
+    origin.fetch(unshallow=True)
+    origin.pull()
+
+
+def get_revision(repo_path):
+    """Get the commit checked out in a repository.
+
+    Args:
+        repo_path (Path): the path to the repository.
+
+    Returns:
+        str: the hash of the ``HEAD`` commit.
+
+    Raises:
+        LocationDoesNotExist: when the repository does not exist
+        NotAGitRepo: when the repository can not be opened
+    """
+    if not repo_path.exists():
+        raise LocationDoesNotExist("{} does not exist".format(repo_path))
+
+    try:
+        repo = git.Repo(repo_path)
+    except:
+        raise NotAGitRepo("{} is not a git repository".format(repo_path))
+
+    return repo.head.commit.hexsha
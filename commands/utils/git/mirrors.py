@@ -0,0 +1,189 @@
+"""Shared mirrors of the cloned repositories.
+
+Clones borrow the objects of the mirror of their repository through git
+alternates, so that every checkout of a host, whatever its user, downloads and
+stores each object once.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+
+import git
+
+from ..resources import console, default_transient_progress, git_mirrors_path
+from ..trace import traced
+from .CloneProgress import CloneProgress
+
+mirror_refspecs = ["+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"]
+"""list: the refspecs fetched by the mirrors. Only branches and tags are
+mirrored, other refs such as the pull requests of forges being of no use to the
+checkouts."""
+
+
+def _repository_name(repo_link):
+    name = repo_link.rstrip("/").rpartition("/")[2]
+    return name[: -len(".git")] if name.endswith(".git") else name
+
+
+def mirror_path(repo_link):
+    """Get the location of the mirror of a repository.
+
+    Args:
+        repo_link (str): link to repository origin
+
+    Returns:
+        Path: the mirror in ``git_mirrors_path``, None if mirrors are disabled.
+    """
+    if git_mirrors_path is None:
+        return None
+
+    digest = hashlib.sha256(repo_link.encode()).hexdigest()[:12]
+    return git_mirrors_path.joinpath(
+        "{}-{}.git".format(_repository_name(repo_link), digest)
+    )
+
+
+def bundle_path(repo_link):
+    """Get the location of the bundle seeding the mirror of a repository.
+
+    A bundle is created from a mirror with ``git bundle create <bundle> --all``,
+    then copied to the mirrors directory of a new host so that its mirror is not
+    cloned from the network.
+
+    Args:
+        repo_link (str): link to repository origin
+
+    Returns:
+        Path: the bundle in ``git_mirrors_path``, named after the repository,
+        None if mirrors are disabled.
+    """
+    if git_mirrors_path is None:
+        return None
+
+    return git_mirrors_path.joinpath("{}.bundle".format(_repository_name(repo_link)))
+
+
+@contextlib.contextmanager
+def _locked_mirror(repo_mirror_path):
+    lock_path = repo_mirror_path.with_name("{}.lock".format(repo_mirror_path.name))
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+@traced
+def update_mirror(repo_link, repo_name=""):
+    """Create or fetch the mirror of a repository.
+
+    A missing mirror is cloned from its bundle, see ``bundle_path``, when there
+    is one, or from ``repo_link`` otherwise. The mirror is then fetched from
+    ``repo_link``. A failed fetch only prints a warning, the mirror being used as
+    it is.
+
+    Args:
+        repo_link (str): link to repository origin
+        repo_name (str): name of the repository used in print. Default to empty
+
+    Returns:
+        Path: the mirror of the repository, None if mirrors are disabled or if
+        the mirror could not be created.
+    """
+    repo_mirror_path = mirror_path(repo_link)
+    if repo_mirror_path is None:
+        return None
+
+    if repo_name != "" and not repo_name.endswith(" "):
+        repo_name = "{} ".format(repo_name)
+
+    git_mirrors_path.mkdir(parents=True, exist_ok=True)
+    repo_bundle_path = bundle_path(repo_link)
+
+    with _locked_mirror(repo_mirror_path), default_transient_progress() as progress:
+        task_id = progress.add_task(
+            "Mirroring {}repository...".format(repo_name), start=False
+        )
+
+        try:
+            fetch = True
+            if not repo_mirror_path.exists():
+                seeded = repo_bundle_path.exists()
+                _clone_mirror(
+                    str(repo_bundle_path) if seeded else repo_link,
+                    repo_mirror_path,
+                    CloneProgress(progress, task_id),
+                )
+
+                # a mirror cloned from the network has nothing left to fetch
+                fetch = seeded
+                if seeded:
+                    git.Repo(repo_mirror_path).remotes.origin.set_url(repo_link)
+
+            if fetch:
+                _set_refspecs(git.Repo(repo_mirror_path))
+                git.Repo(repo_mirror_path).remotes.origin.fetch(
+                    progress=CloneProgress(progress, task_id), prune=True
+                )
+        except git.GitCommandError as exception:
+            console.print(
+                "[bold yellow]Mirroring {}repository failed: {}[/]".format(
+                    repo_name, exception
+                )
+            )
+            return repo_mirror_path if repo_mirror_path.exists() else None
+
+    console.print("Mirroring {}repository...[bold green]Done![/]".format(repo_name))
+
+    return repo_mirror_path
+
+
+def _clone_mirror(source, repo_mirror_path, clone_progress):
+    # cloned aside, so that an interrupted clone is not taken for a mirror
+    temp_mirror_path = repo_mirror_path.with_name(
+        "{}.{}".format(repo_mirror_path.name, os.getpid())
+    )
+
+    try:
+        # mirrors are shared by the users of a group
+        repo = git.Repo.init(temp_mirror_path, bare=True, shared="group")
+        with repo.config_writer() as config:
+            # checkouts borrowing objects break if they are pruned
+            config.set_value("gc", "pruneExpire", "never")
+
+        origin = repo.create_remote("origin", source)
+        _set_refspecs(repo)
+        origin.fetch(progress=clone_progress)
+
+        os.replace(temp_mirror_path, repo_mirror_path)
+    finally:
+        shutil.rmtree(temp_mirror_path, ignore_errors=True)
+
+
+def _set_refspecs(repo):
+    refspecs = repo.git.config("--get-all", "remote.origin.fetch").splitlines()
+    if refspecs == mirror_refspecs:
+        return
+
+    repo.git.config("--unset-all", "remote.origin.fetch")
+    for refspec in mirror_refspecs:
+        repo.git.config("--add", "remote.origin.fetch", refspec)
+
+    # drop the refs fetched by previous refspecs, at once as there may be many
+    stale_refs = [
+        ref
+        for ref in repo.git.for_each_ref("--format=%(refname)").splitlines()
+        if not ref.startswith(("refs/heads/", "refs/tags/"))
+    ]
+    if stale_refs:
+        with tempfile.TemporaryFile() as commands:
+            commands.write(
+                "".join("delete {}\n".format(ref) for ref in stale_refs).encode()
+            )
+            commands.seek(0)
+            repo.git.update_ref("--stdin", istream=commands)
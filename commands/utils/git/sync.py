@@ -0,0 +1,156 @@
+"""Concurrent sync of git repositories, on asyncio subprocesses."""
+
+import asyncio
+import collections
+import os
+import re
+
+import git
+
+from ..resources import console, default_transient_progress
+from ..trace import traced
+from .CloneProgress import CloneProgress
+from .mirrors import mirror_path
+
+sync_concurrency = 4
+"""int: the default number of repositories synced at once."""
+
+sync_error_lines = 20
+"""int: the number of last lines of git output kept to report a failed sync."""
+
+git_output_separator = re.compile(rb"[\r\n]")
+"""re.Pattern: splits the progress git writes on stderr, ended by carriage
+returns while an operation runs and by a new line once it is done."""
+
+git_progress_pattern = re.compile(r"\d+% \((\d+)/(\d+)\)")
+"""re.Pattern: matches the counts of the git progress lines, like
+``Receiving objects:  45% (450/1000), 1.20 MiB | 2.00 MiB/s``."""
+
+
+@traced
+def sync_repositories(repositories, max_concurrency=sync_concurrency):
+    """Clone or update repositories at once.
+
+    Missing repositories are cloned, borrowing the objects of their mirror when
+    there is one. Others are fetched then moved to their upstream branch in a
+    single sync: a hard reset for the ones discarding their local changes, a
+    fast forward merge for the others. Each repository gets its own task in the
+    progress, advanced from the git output.
+
+    Args:
+        repositories (list): the ``SyncedRepository`` to sync.
+        max_concurrency (int): the maximal number of repositories synced at
+            once. Default to ``sync_concurrency``.
+
+    Returns:
+        dict: maps the name of each repository to the ``git.GitCommandError``
+        that made its sync fail, or to None if it succeeded.
+    """
+    with default_transient_progress() as progress:
+        return asyncio.run(_sync_all(repositories, max_concurrency, progress))
+
+
+async def _sync_all(repositories, max_concurrency, progress):
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def sync(repository):
+        async with semaphore:
+            try:
+                await _sync(repository, progress)
+            except git.GitCommandError as exception:
+                return exception
+
+        console.print(
+            "Syncing {} repository...[bold green]Done![/]".format(repository.repo_name)
+        )
+        return None
+
+    results = await asyncio.gather(*[sync(repository) for repository in repositories])
+
+    return {
+        repository.repo_name: result
+        for repository, result in zip(repositories, results)
+    }
+
+
+async def _sync(repository, progress):
+    task_id = progress.add_task(
+        "Syncing {} repository...".format(repository.repo_name), start=False
+    )
+    clone_progress = CloneProgress(progress, task_id)
+
+    try:
+        if not repository.repo_path.exists():
+            args = ["clone", "--progress"]
+            if repository.depth is not None:
+                args.append("--depth={}".format(repository.depth))
+            if repository.blob_filter is not None:
+                args.append("--filter={}".format(repository.blob_filter))
+            if repository.single_branch:
+                args.append("--single-branch")
+
+            repo_mirror_path = mirror_path(repository.repo_link)
+            if repo_mirror_path is not None and repo_mirror_path.exists():
+                args.append("--reference-if-able={}".format(repo_mirror_path))
+            args += [repository.repo_link, str(repository.repo_path)]
+
+            await _git(args, None, clone_progress)
+            return
+
+        await _git(
+            ["fetch", "--progress", "origin"], repository.repo_path, clone_progress
+        )
+
+        if repository.discard_changes:
+            await _git(["reset", "--hard", "@{upstream}"], repository.repo_path)
+        else:
+            await _git(["merge", "--ff-only", "@{upstream}"], repository.repo_path)
+    finally:
+        progress.remove_task(task_id)
+
+
+async def _git(args, cwd, clone_progress=None):
+    command = ["git"] + args
+
+    # a prompt would block every other sync, credentials must already be known
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        cwd=cwd,
+        env=env,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    lines = collections.deque(maxlen=sync_error_lines)
+    pending = b""
+    while True:
+        data = await process.stderr.read(4096)
+        if not data:
+            break
+
+        *complete, pending = git_output_separator.split(pending + data)
+        for line in complete:
+            if line:
+                _handle_line(line.decode(errors="replace"), lines, clone_progress)
+
+    if pending:
+        _handle_line(pending.decode(errors="replace"), lines, clone_progress)
+
+    returncode = await process.wait()
+    if returncode != 0:
+        raise git.GitCommandError(command, returncode, "\n".join(lines))
+
+
+def _handle_line(line, lines, clone_progress):
+    lines.append(line)
+    if clone_progress is None:
+        return
+
+    match = git_progress_pattern.search(line)
+    if match is not None:
+        clone_progress.update(
+            git.RemoteProgress.BEGIN, int(match.group(1)), int(match.group(2)), line
+        )
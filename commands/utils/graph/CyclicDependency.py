@@ -0,0 +1,4 @@
+class CyclicDependency(Exception):
+    """Raised when a dependency graph contains a cycle."""
+
+    pass
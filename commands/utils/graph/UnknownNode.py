@@ -0,0 +1,4 @@
+class UnknownNode(Exception):
+    """Raised when a node is not declared in a dependency graph."""
+
+    pass
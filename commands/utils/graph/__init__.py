@@ -0,0 +1,3 @@
+from .CyclicDependency import CyclicDependency
+from .graph import dependency_closure, run_graph, topological_sort
+from .UnknownNode import UnknownNode
@@ -0,0 +1,127 @@
+"""Dependency graph functions."""
+
+import concurrent.futures
+
+from .CyclicDependency import CyclicDependency
+from .UnknownNode import UnknownNode
+
+
+def dependency_closure(graph, targets):
+    """Get the targets and all their transitive dependencies.
+
+    Args:
+        graph (dict): the dependency graph, mapping each node to the list of
+            nodes it depends on.
+        targets (list): the nodes to resolve.
+
+    Returns:
+        set: the targets and their dependencies, each node appearing once.
+
+    Raises:
+        UnknownNode: if a target or a dependency is not declared in the graph.
+    """
+    closure = set()
+    stack = list(targets)
+
+    while stack:
+        node = stack.pop()
+        if node in closure:
+            continue
+
+        if node not in graph:
+            raise UnknownNode("{} is not declared in the graph".format(node))
+
+        closure.add(node)
+        stack.extend(graph[node])
+
+    return closure
+
+
+def topological_sort(graph, nodes):
+    """Sort nodes so that every node comes after its dependencies.
+
+    Args:
+        graph (dict): the dependency graph, mapping each node to the list of
+            nodes it depends on.
+        nodes (set): the nodes to sort. It must be closed under dependencies, see
+            ``dependency_closure``.
+
+    Returns:
+        list: the sorted nodes. Independent nodes are sorted by name.
+
+    Raises:
+        CyclicDependency: if the nodes contain a dependency cycle.
+    """
+    remaining = {node: set(graph[node]) & nodes for node in nodes}
+    order = []
+
+    while remaining:
+        ready = sorted(node for node, deps in remaining.items() if not deps)
+        if not ready:
+            raise CyclicDependency(
+                "cycle between {}".format(", ".join(sorted(remaining)))
+            )
+
+        for node in ready:
+            del remaining[node]
+            order.append(node)
+
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+    return order
+
+
+def run_graph(graph, targets, run, max_workers=None):
+    """Run a function on every node of a graph, dependencies first.
+
+    Nodes whose dependencies are all done are run concurrently on a thread pool.
+    A node is skipped when one of its dependencies failed.
+
+    Args:
+        graph (dict): the dependency graph, mapping each node to the list of
+            nodes it depends on.
+        targets (list): the nodes to run, along with their dependencies.
+        run (callable): the function called with a node. It must return True
+            when the node succeeded, False otherwise.
+        max_workers (int): the maximum number of nodes run at once. Default to
+            the number of nodes.
+
+    Returns:
+        dict: maps each node to True if it succeeded, False if it failed and
+            None if it was skipped.
+
+    Raises:
+        UnknownNode: if a target or a dependency is not declared in the graph.
+        CyclicDependency: if the graph contains a dependency cycle.
+    """
+    nodes = dependency_closure(graph, targets)
+    order = topological_sort(graph, nodes)
+    remaining = {node: set(graph[node]) for node in order}
+    results = {}
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers or max(1, len(order))
+    ) as executor:
+        running = {}
+
+        while remaining or running:
+            for node in [node for node in order if node in remaining]:
+                deps = remaining[node]
+                if any(results.get(dep) is not True for dep in deps & results.keys()):
+                    del remaining[node]
+                    results[node] = None
+                elif not deps - results.keys():
+                    del remaining[node]
+                    running[executor.submit(run, node)] = node
+
+            if not running:
+                continue
+
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                results[running.pop(future)] = bool(future.result())
+
+    return results
@@ -0,0 +1,65 @@
+import re
+
+cmake_progress_pattern = re.compile(rb"^\[\s*(\d+)%\]")
+"""Pattern: the progress printed by CMake generated makefiles, ``[ 45%]``."""
+
+ninja_progress_pattern = re.compile(rb"^\[(\d+)/(\d+)\]")
+"""Pattern: the progress printed by ninja, ``[123/456]``."""
+
+compile_line_pattern = re.compile(
+    rb"^\s*(CC|CXX)\s+\S+\.l?o\s*$|libtool: compile:|\s-c\s.*\.(c|cc|cpp|cxx)\b"
+)
+"""Pattern: the lines printed by autotools builds for each compiled file."""
+
+
+class BuildProgress:
+    """Used to update a build task progress from a ``rich`` ``Progress``.
+
+    An instance is called with every line printed by the build. The completion
+    is read from CMake and ninja progress lines. Other builds are followed by
+    counting their compile lines, against the count of the previous build log
+    if there is one.
+    """
+
+    def __init__(self, progress, task_id, description, log_path=None):
+        self.progress = progress
+        self.task_id = task_id
+        self.description = description
+        self.started = False
+        self.compiled = 0
+        self.expected = None
+
+        if log_path is not None and log_path.exists():
+            with open(log_path, "rb") as log:
+                self.expected = sum(
+                    1 for line in log if compile_line_pattern.search(line)
+                )
+            self.expected = self.expected or None
+
+    def __call__(self, line):
+        match = cmake_progress_pattern.match(line)
+        if match is not None:
+            self.update(int(match.group(1)), 100)
+            return
+
+        match = ninja_progress_pattern.match(line)
+        if match is not None:
+            self.update(int(match.group(1)), int(match.group(2)))
+            return
+
+        if compile_line_pattern.search(line) is not None:
+            self.compiled += 1
+            if self.expected is None:
+                self.progress.update(
+                    self.task_id,
+                    description="{} {} files".format(self.description, self.compiled),
+                )
+            else:
+                self.update(self.compiled, max(self.expected, self.compiled + 1))
+
+    def update(self, completed, total):
+        if not self.started:
+            self.started = True
+            self.progress.start_task(self.task_id)
+
+        self.progress.update(self.task_id, total=total, completed=completed)
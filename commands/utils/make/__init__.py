@@ -1,5 +1,19 @@
 from .autoreconf import autoreconf
 from .bootstrap import bootstrap
-from .configure import Configure, configure
+from .compiler_cache import (
+    build_environment,
+    compiler_cache_stats,
+    find_compiler_cache,
+    print_compiler_cache_stats,
+)
+from .configure import Configure, compiler_identity, configure
+from .jobs import default_jobs, get_jobs, get_load_average, set_jobs
 from .make import make, make_install
+from .profiles import (
+    build_profiles,
+    get_profile,
+    profile_cmake_args,
+    profile_flags,
+    set_profile,
+)
 from .cmake import cmake
@@ -1,9 +1,10 @@
-import subprocess
-
+from ..commands import run_command
 from ..files import LocationDoesNotExist, NotADirectory
 from ..resources import console, default_transient_progress
+from ..trace import traced
 
 
+@traced
 def autoreconf(dir_path, args, app_name=""):
     """Invoke autoreconf in the given directory
 
@@ -35,9 +36,11 @@ def autoreconf(dir_path, args, app_name=""):
             raise NotADirectory("{} is not a directory".format(dir_path))
 
         args = ["autoreconf"] + args
-        result = subprocess.run(args, cwd=dir_path, capture_output=True, text=True)
+        returncode, stdout, stderr = run_command(
+            args, dir_path, None, "autoreconf{}".format(app_name)
+        )
 
-    if result.returncode == 0:
+    if returncode == 0:
         console.print("Reconfiguring{}...[bold green]Done![/]".format(app_name))
 
-    return result.returncode, result.stdout, result.stderr
+    return returncode, stdout, stderr
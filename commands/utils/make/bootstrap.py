@@ -1,16 +1,21 @@
-import subprocess
-
+from ..commands import log_path, run_command
 from ..files import LocationDoesNotExist, NotADirectory
 from ..resources import console, default_transient_progress
+from ..trace import traced
+from .BuildProgress import BuildProgress
+from .compiler_cache import build_environment
+from .jobs import get_jobs
 
 
+@traced
 def bootstrap(dir_path, args, app_name=""):
     """Invoke bootstrap in the given directory
 
     Args:
         dir_path (Path): the directory in which invoke bootstrap
         args (list): the arguments to pass to bootstrap. It must be a list of string
-            containing all arguments that must be passed to bootstrap.
+            containing all arguments that must be passed to bootstrap. The
+            ``--parallel`` argument is prepended from the jobs settings.
 
     Returns:
         int: the return code of bootstrap. It it is different than zero then something
@@ -26,7 +31,8 @@ def bootstrap(dir_path, args, app_name=""):
         app_name = " {}".format(app_name)
 
     with default_transient_progress() as progress:
-        progress.add_task("Bootstraping{}...".format(app_name), start=False)
+        description = "Bootstraping{}...".format(app_name)
+        task_id = progress.add_task(description, start=False)
 
         if not dir_path.exists():
             raise LocationDoesNotExist("{} does not exist".format(dir_path))
@@ -34,10 +40,17 @@ def bootstrap(dir_path, args, app_name=""):
         if not dir_path.is_dir():
             raise NotADirectory("{} is not a directory".format(dir_path))
 
-        args = ["./bootstrap"] + args
-        result = subprocess.run(args, cwd=dir_path, capture_output=True, text=True)
-
-    if result.returncode == 0:
+        args = ["./bootstrap", "--parallel={}".format(get_jobs())] + args
+        log_name = "bootstrap{}".format(app_name)
+        returncode, stdout, stderr = run_command(
+            args,
+            dir_path,
+            build_environment("cmake"),
+            log_name,
+            BuildProgress(progress, task_id, description, log_path(log_name)),
+        )
+
+    if returncode == 0:
         console.print("Bootstraping{}...[bold green]Done![/]".format(app_name))
 
-    return result.returncode, result.stdout, result.stderr
+    return returncode, stdout, stderr
@@ -1,16 +1,24 @@
-import subprocess
-
+from ..commands import log_path, run_command
 from ..files import LocationDoesNotExist, NotADirectory
 from ..resources import console, default_transient_progress
+from ..trace import traced
+from .BuildProgress import BuildProgress
+from .compiler_cache import build_environment
+from .jobs import get_jobs
+from .profiles import profile_cmake_args
 
 
+@traced
 def cmake(dir_path, args, app_name=""):
     """Invoke cmake in the given directory.
 
     Args:
         dir_path (Path): the directory in which invoke cmake.
         args (list): the arguments to pass to cmake. It must be a list of string
-            containing all arguments that must be passed to cmake.
+            containing all arguments that must be passed to cmake. When building
+            with ``--build``, the number of parallel jobs is appended. When
+            configuring, the arguments of the build profile are appended, see
+            ``profile_cmake_args``.
 
     Returns:
         int: the return code of cmake. If it is different than zero then something
@@ -26,7 +34,8 @@ def cmake(dir_path, args, app_name=""):
         app_name = " {}".format(app_name)
 
     with default_transient_progress() as progress:
-        progress.add_task("Cmaking{}...".format(app_name), start=False)
+        description = "Cmaking{}...".format(app_name)
+        task_id = progress.add_task(description, start=False)
 
         if not dir_path.exists():
             raise LocationDoesNotExist("{} does not exist".format(dir_path))
@@ -34,10 +43,24 @@ def cmake(dir_path, args, app_name=""):
         if not dir_path.is_dir():
             raise NotADirectory("{} is not a directory".format(dir_path))
 
+        env = build_environment("cmake")
+        if "--build" in args:
+            args = args + ["--parallel", str(get_jobs())]
+        else:
+            args = args + profile_cmake_args(env)
+
+        log_name = "cmake build" if "--build" in args else "cmake"
+        log_name += app_name
         args = ["cmake"] + args
-        result = subprocess.run(args, cwd=dir_path, capture_output=True, text=True)
+        returncode, stdout, stderr = run_command(
+            args,
+            dir_path,
+            env,
+            log_name,
+            BuildProgress(progress, task_id, description, log_path(log_name)),
+        )
 
-    if result.returncode == 0:
+    if returncode == 0:
         console.print("Cmaking{}...[bold green]Done![/]".format(app_name))
 
-    return result.returncode, result.stdout, result.stderr
+    return returncode, stdout, stderr
@@ -0,0 +1,158 @@
+"""Compiler cache functions."""
+
+import json
+import os
+import shutil
+import subprocess
+
+from ..resources import compiler_cache_path, console
+from .profiles import build_profiles, get_profile
+
+compiler_cache_launchers = ["ccache", "sccache"]
+"""list: the supported compiler caches, by order of preference."""
+
+compiler_cache_max_size = "10G"
+"""str: the maximum size of the compiler cache."""
+
+_ccache_hit_keys = {
+    "direct_cache_hit",
+    "preprocessed_cache_hit",
+    "cache_hit_direct",
+    "cache_hit_preprocessed",
+}
+_ccache_miss_keys = {"cache_miss"}
+
+
+def find_compiler_cache():
+    """Find an installed compiler cache.
+
+    Returns:
+        str: the name of the first compiler cache of ``compiler_cache_launchers``
+            that is installed, None if there is none.
+    """
+    for launcher in compiler_cache_launchers:
+        if shutil.which(launcher) is not None:
+            return launcher
+
+    return None
+
+
+def build_environment(build_system):
+    """Get the environment of a build step, using the compiler cache if any.
+
+    Autotools builds get the compiler cache prepended to ``CC`` and ``CXX``, as
+    their compilers are fixed when configuring. CMake builds get it as compiler
+    launcher, which also covers builds driven by make.
+
+    The flags of the build profile, see ``get_profile``, are appended to
+    ``CFLAGS``, ``CXXFLAGS`` and ``LDFLAGS``. OpenSSL builds get them as
+    ``Configure`` arguments instead, as flags from the environment replace its
+    own.
+
+    Args:
+        build_system (str): either ``"autotools"``, ``"cmake"`` or ``"openssl"``.
+
+    Returns:
+        dict: the environment to run the build step with.
+    """
+    env = dict(os.environ)
+
+    profile = build_profiles[get_profile()]
+    if build_system != "openssl":
+        for name, flags in [
+            ("CFLAGS", profile["flags"]),
+            ("CXXFLAGS", profile["flags"]),
+            ("LDFLAGS", profile["ldflags"]),
+        ]:
+            if flags:
+                env[name] = " ".join(filter(None, [env.get(name, ""), flags]))
+
+    launcher = find_compiler_cache()
+    if launcher is None:
+        return env
+
+    if launcher == "ccache":
+        env.setdefault("CCACHE_DIR", str(compiler_cache_path))
+        env.setdefault("CCACHE_MAXSIZE", compiler_cache_max_size)
+    else:
+        env.setdefault("SCCACHE_DIR", str(compiler_cache_path))
+        env.setdefault("SCCACHE_CACHE_SIZE", compiler_cache_max_size)
+
+    if build_system != "cmake":
+        env["CC"] = "{} {}".format(launcher, env.get("CC", "cc"))
+        env["CXX"] = "{} {}".format(launcher, env.get("CXX", "c++"))
+    else:
+        env["CMAKE_C_COMPILER_LAUNCHER"] = launcher
+        env["CMAKE_CXX_COMPILER_LAUNCHER"] = launcher
+
+    return env
+
+
+def compiler_cache_stats():
+    """Get the hit and miss counters of the compiler cache.
+
+    Returns:
+        tuple: the number of cache hits and misses, None if no compiler cache is
+            installed or its counters can not be read.
+    """
+    launcher = find_compiler_cache()
+    if launcher is None:
+        return None
+
+    env = build_environment("cmake")
+
+    if launcher == "ccache":
+        result = subprocess.run(
+            ["ccache", "--print-stats"], capture_output=True, text=True, env=env
+        )
+        if result.returncode != 0:
+            return None
+
+        counters = {}
+        for line in result.stdout.splitlines():
+            key, _, value = line.partition("\t")
+            if value.strip().isdigit():
+                counters[key] = int(value)
+
+        hits = sum(counters.get(key, 0) for key in _ccache_hit_keys)
+        misses = sum(counters.get(key, 0) for key in _ccache_miss_keys)
+        return hits, misses
+
+    result = subprocess.run(
+        ["sccache", "--show-stats", "--stats-format", "json"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        return None
+
+    try:
+        stats = json.loads(result.stdout)["stats"]
+        hits = sum(stats["cache_hits"]["counts"].values())
+        misses = sum(stats["cache_misses"]["counts"].values())
+    except (ValueError, KeyError):
+        return None
+
+    return hits, misses
+
+
+def print_compiler_cache_stats(stats_before, app_name=""):
+    """Print the compiler cache hits and misses since the given counters.
+
+    Args:
+        stats_before (tuple): the counters returned by ``compiler_cache_stats``
+            before building.
+        app_name (str): the name of the built application, used in printed
+            messages only.
+    """
+    stats_after = compiler_cache_stats()
+    if stats_before is None or stats_after is None:
+        return
+
+    if app_name != "" and not app_name.startswith(" "):
+        app_name = " {}".format(app_name)
+
+    hits = stats_after[0] - stats_before[0]
+    misses = stats_after[1] - stats_before[1]
+    console.print("Compiler cache{}: {} hits, {} misses".format(app_name, hits, misses))
@@ -1,16 +1,135 @@
+import hashlib
+import os
+import platform
+import re
+import shlex
+import shutil
 import subprocess
+import tempfile
 
+from ..commands import run_command
 from ..files import LocationDoesNotExist, NotADirectory
-from ..resources import console, default_transient_progress
+from ..resources import configure_cache_path, console, default_transient_progress
+from ..trace import traced
+from .compiler_cache import build_environment
+from .profiles import profile_flags
 
+compiler_environment_variables = [
+    "CC",
+    "CXX",
+    "CPP",
+    "CFLAGS",
+    "CXXFLAGS",
+    "CPPFLAGS",
+    "LDFLAGS",
+    "LIBS",
+    "PATH",
+    "PKG_CONFIG_PATH",
+]
+"""list: the environment variables that change the results of configure probes."""
 
-def configure(dir_path, args, app_name=""):
+native_flag = "-march=native"
+"""str: the flag building for the processor of the host, which makes the builds
+depend on it."""
+
+shared_cache_variables = re.compile(
+    r"^ac_cv_(header|func|type|sizeof|alignof|member|lib|search|have_decl|c|sys)_"
+)
+"""Pattern: the configure cache variables shared across packages. Only generic
+probes of headers, functions, types and libraries are shared, as packages may
+cache results depending on their own options under other names."""
+
+
+def compiler_identity(env=None):
+    """Describe the compilers and environment used to build.
+
+    Args:
+        env (dict): the build environment. Default to the autotools environment
+            returned by ``build_environment``.
+
+    Returns:
+        str: a digest changing whenever the machine, the compilers versions or
+            the compilation environment change. When building with
+            ``native_flag``, it also changes with the processor of the host.
+    """
+    if env is None:
+        env = build_environment("autotools")
+
+    identity = [platform.machine()]
+    identity += [
+        "{}={}".format(name, env.get(name, ""))
+        for name in compiler_environment_variables
+    ]
+
+    for compiler in [env.get("CC", "cc"), env.get("CXX", "c++")]:
+        try:
+            result = subprocess.run(
+                shlex.split(compiler) + ["--version"],
+                capture_output=True,
+                text=True,
+                env=env,
+            )
+            identity.append(result.stdout)
+        except OSError:
+            identity.append("")
+
+    if any(native_flag in env.get(name, "") for name in compiler_environment_variables):
+        identity.append(_native_target(env))
+
+    return hashlib.sha256("\n".join(identity).encode()).hexdigest()
+
+
+def _native_target(env):
+    # the target options the compiler resolves for the host processor
+    try:
+        result = subprocess.run(
+            shlex.split(env.get("CC", "cc")) + [native_flag, "-Q", "--help=target"],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        if result.returncode == 0 and "-march=" in result.stdout:
+            return result.stdout
+    except OSError:
+        pass
+
+    # compilers not listing their target options, like clang, get the model and
+    # features of the first processor instead
+    lines = []
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                if not line.strip():
+                    break
+                if line.startswith(("model name", "flags", "Features", "CPU part")):
+                    lines.append(line)
+    except OSError:
+        pass
+
+    return "".join(lines)
+
+
+@traced
+def configure(dir_path, args, app_name="", cache=False, source_path=None):
     """Invoke configure in the given directory
 
+    With ``cache``, configure probes are shared with the other cached configure
+    runs made with the same compilers and environment, see ``compiler_identity``.
+    The shared cache file is copied in ``dir_path`` before configuring and its
+    generic probes are merged back on success, so concurrent runs never write to
+    it directly. A run failing with the shared cache is retried once without it,
+    and the cache is dropped.
+
     Args:
         dir_path (Path): the directory in which invoke configure
         args (list): the arguments to pass to configure. It must be a list of string
             containing all arguments that must be passed to configure.
+        app_name (str): the name of the configured application, used in printed
+            messages only.
+        cache (bool): wether to use the shared configure cache. Default to False.
+        source_path (Path): the directory containing the configure script, for
+            out-of-tree builds in ``dir_path``. Default to None, in which case the
+            script of ``dir_path`` is used.
 
     Returns:
         int: the return code of configure. It it is different than zero then something
@@ -34,22 +153,78 @@ def configure(dir_path, args, app_name=""):
         if not dir_path.is_dir():
             raise NotADirectory("{} is not a directory".format(dir_path))
 
-        args = ["./configure"] + args
-        result = subprocess.run(args, cwd=dir_path, capture_output=True, text=True)
+        env = build_environment("autotools")
+        if source_path is None:
+            args = ["./configure"] + args
+        else:
+            args = [str(source_path.joinpath("configure"))] + args
+
+        if cache:
+            shared_cache_path = configure_cache_path.joinpath(
+                "{}.cache".format(compiler_identity(env))
+            )
+            local_cache_path = dir_path.joinpath("config.cache")
+            if shared_cache_path.exists():
+                shutil.copyfile(shared_cache_path, local_cache_path)
+
+            returncode, stdout, stderr = run_command(
+                args + ["--cache-file={}".format(local_cache_path.name)],
+                dir_path,
+                env,
+                "configure{}".format(app_name),
+            )
 
-    if result.returncode == 0:
+            if returncode == 0:
+                _save_shared_cache(local_cache_path, shared_cache_path)
+            else:
+                shared_cache_path.unlink(missing_ok=True)
+                local_cache_path.unlink(missing_ok=True)
+
+        if not cache or returncode != 0:
+            returncode, stdout, stderr = run_command(
+                args, dir_path, env, "configure{}".format(app_name)
+            )
+
+    if returncode == 0:
         console.print("Configuring{}...[bold green]Done![/]".format(app_name))
 
-    return result.returncode, result.stdout, result.stderr
+    return returncode, stdout, stderr
+
+
+def _save_shared_cache(local_cache_path, shared_cache_path):
+    entries = {}
+    for cache_path in [shared_cache_path, local_cache_path]:
+        if not cache_path.exists():
+            continue
 
+        for line in cache_path.read_text().splitlines():
+            name = line.partition("=")[0]
+            if shared_cache_variables.match(name):
+                entries[name] = line
 
-def Configure(dir_path, args, app_name=""):
+    # packages configured in parallel threads save the cache at once
+    fd, temp_cache_path = tempfile.mkstemp(
+        prefix="{}.".format(shared_cache_path.name), dir=shared_cache_path.parent
+    )
+    with os.fdopen(fd, "w") as temp_cache:
+        temp_cache.write("".join("{}\n".format(line) for line in entries.values()))
+    os.replace(temp_cache_path, shared_cache_path)
+
+
+@traced
+def Configure(dir_path, args, app_name="", source_path=None):
     """Invoke Configure in the given directory
 
     Args:
         dir_path (Path): the directory in which invoke Configure
         args (list): the arguments to pass to Configure. It must be a list of string
-            containing all arguments that must be passed to configure.
+            containing all arguments that must be passed to configure. The flags
+            of the build profile are appended.
+        app_name (str): the name of the configured application, used in printed
+            messages only.
+        source_path (Path): the directory containing the Configure script, for
+            out-of-tree builds in ``dir_path``. Default to None, in which case the
+            script of ``dir_path`` is used.
 
     Returns:
         int: the return code of Configure. It it is different than zero then something
@@ -73,10 +248,18 @@ def Configure(dir_path, args, app_name=""):
         if not dir_path.is_dir():
             raise NotADirectory("{} is not a directory".format(dir_path))
 
-        args = ["./Configure"] + args
-        result = subprocess.run(args, cwd=dir_path, capture_output=True, text=True)
+        if source_path is None:
+            args = ["./Configure"] + args + profile_flags()
+        else:
+            args = [str(source_path.joinpath("Configure"))] + args + profile_flags()
+        returncode, stdout, stderr = run_command(
+            args,
+            dir_path,
+            build_environment("openssl"),
+            "Configure{}".format(app_name),
+        )
 
-    if result.returncode == 0:
+    if returncode == 0:
         console.print("Configuring{}...[bold green]Done![/]".format(app_name))
 
-    return result.returncode, result.stdout, result.stderr
+    return returncode, stdout, stderr
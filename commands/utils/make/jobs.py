@@ -0,0 +1,54 @@
+"""Parallelism settings shared by the build wrappers."""
+
+import os
+
+
+def default_jobs():
+    """Get the number of CPUs usable by the current process.
+
+    Returns:
+        int: the number of usable CPUs, at least 1.
+    """
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+_jobs = default_jobs()
+_load_average = float(_jobs)
+
+
+def get_jobs():
+    """Get the number of parallel jobs used by the build wrappers.
+
+    Returns:
+        int: the number of parallel jobs.
+    """
+    return _jobs
+
+
+def get_load_average():
+    """Get the load average above which no new build job is started.
+
+    Returns:
+        float: the maximum load average.
+    """
+    return _load_average
+
+
+def set_jobs(jobs, load_average=None):
+    """Set the number of parallel jobs used by the build wrappers.
+
+    Args:
+        jobs (int): the number of parallel jobs. It must be positive.
+        load_average (float): the load average above which no new job is
+            started. Default to the number of jobs.
+    """
+    global _jobs, _load_average
+
+    if jobs < 1:
+        raise ValueError("jobs must be positive, got {}".format(jobs))
+
+    _jobs = jobs
+    _load_average = float(jobs) if load_average is None else load_average
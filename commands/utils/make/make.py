@@ -1,16 +1,30 @@
-import subprocess
-
+from ..commands import log_path, run_command
 from ..files import LocationDoesNotExist, NotADirectory
 from ..resources import console, default_transient_progress
+from ..trace import traced
+from .BuildProgress import BuildProgress
+from .compiler_cache import build_environment
+from .jobs import get_jobs, get_load_average
+
 
+def parallel_args():
+    """Get the make arguments enabling parallel jobs.
 
+    Returns:
+        list: the ``-j`` and ``-l`` arguments built from the jobs settings.
+    """
+    return ["-j{}".format(get_jobs()), "-l{}".format(get_load_average())]
+
+
+@traced
 def make(dir_path, args, app_name=""):
     """Invoke make in the given directory.
 
     Args:
         dir_path (Path): the directory in which invoke make.
         args (list): the arguments to pass to make. It must be a list of string
-            containing all arguments that must be passed to make.
+            containing all arguments that must be passed to make. The ``-j`` and
+            ``-l`` arguments are prepended from the jobs settings.
 
     Returns:
         int: the return code of make. If it is different than zero then something
@@ -26,7 +40,8 @@ def make(dir_path, args, app_name=""):
         app_name = " {}".format(app_name)
 
     with default_transient_progress() as progress:
-        progress.add_task("Making{}...".format(app_name), start=False)
+        description = "Making{}...".format(app_name)
+        task_id = progress.add_task(description, start=False)
 
         if not dir_path.exists():
             raise LocationDoesNotExist("{} does not exist".format(dir_path))
@@ -34,22 +49,31 @@ def make(dir_path, args, app_name=""):
         if not dir_path.is_dir():
             raise NotADirectory("{} is not a directory".format(dir_path))
 
-        args = ["make"] + args
-        result = subprocess.run(args, cwd=dir_path, capture_output=True, text=True)
-
-    if result.returncode == 0:
+        args = ["make"] + parallel_args() + args
+        log_name = "make{}".format(app_name)
+        returncode, stdout, stderr = run_command(
+            args,
+            dir_path,
+            build_environment("cmake"),
+            log_name,
+            BuildProgress(progress, task_id, description, log_path(log_name)),
+        )
+
+    if returncode == 0:
         console.print("Making{}...[bold green]Done![/]".format(app_name))
 
-    return result.returncode, result.stdout, result.stderr
+    return returncode, stdout, stderr
 
 
+@traced
 def make_install(dir_path, args, app_name=""):
     """Invoke make install in the given directory.
 
     Args:
         dir_path (Path): the directory in which invoke make install.
         args (list): the arguments to pass to make. It must be a list of string
-            containing all arguments that must be passed to make install.
+            containing all arguments that must be passed to make install. The
+            ``-j`` and ``-l`` arguments are prepended from the jobs settings.
 
     Returns:
         int: the return code of make install. If it is different than zero then something
@@ -73,10 +97,15 @@ def make_install(dir_path, args, app_name=""):
         if not dir_path.is_dir():
             raise NotADirectory("{} is not a directory".format(dir_path))
 
-        args = ["make", "install"] + args
-        result = subprocess.run(args, cwd=dir_path, capture_output=True, text=True)
+        args = ["make", "install"] + parallel_args() + args
+        returncode, stdout, stderr = run_command(
+            args,
+            dir_path,
+            build_environment("cmake"),
+            "make install{}".format(app_name),
+        )
 
-    if result.returncode == 0:
+    if returncode == 0:
         console.print("Installing{}...[bold green]Done![/]".format(app_name))
 
-    return result.returncode, result.stdout, result.stderr
+    return returncode, stdout, stderr
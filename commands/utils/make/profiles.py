@@ -0,0 +1,82 @@
+"""Build profiles shared by the build wrappers."""
+
+import shlex
+
+build_profiles = {
+    "default": {"flags": "", "ldflags": "", "cmake_build_type": None},
+    "release": {"flags": "-O2", "ldflags": "", "cmake_build_type": "Release"},
+    "max": {
+        "flags": "-O3 -march=native -flto",
+        # link time optimizations are made with the compile flags
+        "ldflags": "-O3 -march=native -flto",
+        "cmake_build_type": "Release",
+    },
+}
+"""dict: maps each profile name to its compile flags, link flags and cmake
+build type. The ``default`` profile keeps the flags chosen by each package and
+the environment."""
+
+_profile = "default"
+
+
+def get_profile():
+    """Get the name of the build profile used by the build wrappers.
+
+    Returns:
+        str: the name of the profile, a key of ``build_profiles``.
+    """
+    return _profile
+
+
+def set_profile(profile):
+    """Set the build profile used by the build wrappers.
+
+    Args:
+        profile (str): the name of the profile. It must be a key of
+            ``build_profiles``.
+    """
+    global _profile
+
+    if profile not in build_profiles:
+        raise ValueError(
+            "profile must be one of {}, got {}".format(
+                ", ".join(build_profiles), profile
+            )
+        )
+
+    _profile = profile
+
+
+def profile_flags():
+    """Get the compile flags of the build profile.
+
+    Returns:
+        list: the compile flags, as separate arguments.
+    """
+    return shlex.split(build_profiles[_profile]["flags"])
+
+
+def profile_cmake_args(env):
+    """Get the cmake arguments applying the build profile.
+
+    The flags are given on the command line, and not only through the
+    environment, so that they replace the ones cached by a previous configure.
+
+    Args:
+        env (dict): the build environment, see ``build_environment``.
+
+    Returns:
+        list: the cmake arguments.
+    """
+    args = [
+        "-DCMAKE_C_FLAGS={}".format(env.get("CFLAGS", "")),
+        "-DCMAKE_CXX_FLAGS={}".format(env.get("CXXFLAGS", "")),
+        "-DCMAKE_EXE_LINKER_FLAGS={}".format(env.get("LDFLAGS", "")),
+        "-DCMAKE_SHARED_LINKER_FLAGS={}".format(env.get("LDFLAGS", "")),
+    ]
+
+    cmake_build_type = build_profiles[_profile]["cmake_build_type"]
+    if cmake_build_type is not None:
+        args.append("-DCMAKE_BUILD_TYPE={}".format(cmake_build_type))
+
+    return args
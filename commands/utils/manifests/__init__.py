@@ -0,0 +1,11 @@
+from .manifests import (
+    build_manifest,
+    check_installed_files,
+    find_conflicts,
+    install_tree,
+    read_index,
+    read_manifest,
+    remove_installed_files,
+    remove_manifest,
+    write_manifest,
+)
@@ -0,0 +1,302 @@
+"""Installed files manifests functions."""
+
+import concurrent.futures
+import contextlib
+import fcntl
+import json
+import os
+import stat
+
+from ..files import file_sha256, move
+from ..print import print_msg_titled
+from ..resources import manifests_path
+from ..trace import traced
+
+manifests_index_path = manifests_path.joinpath("index.json")
+"""Path: the index mapping every installed file to the package owning it."""
+
+manifests_lock_path = manifests_path.joinpath("index.lock")
+"""Path: the lock taken by processes reading then writing the index."""
+
+conflicts_shown = 10
+"""int: the number of conflicting files listed in conflict warnings."""
+
+
+def _manifest_path(package_name):
+    return manifests_path.joinpath("{}.json".format(package_name))
+
+
+@contextlib.contextmanager
+def _locked_index():
+    with open(manifests_lock_path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield read_index()
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _write_index(index):
+    temp_index_path = manifests_index_path.with_name(
+        "{}.{}".format(manifests_index_path.name, os.getpid())
+    )
+    temp_index_path.write_text(json.dumps(index, separators=(",", ":")))
+    os.replace(temp_index_path, manifests_index_path)
+
+
+def read_index():
+    """Read the index of the installed files.
+
+    Returns:
+        dict: maps the path of every installed file to the package owning it.
+    """
+    try:
+        return json.loads(manifests_index_path.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def read_manifest(package_name):
+    """Read the manifest of an installed package.
+
+    Args:
+        package_name (str): the name of the package.
+
+    Returns:
+        dict: the manifest of the package, see ``build_manifest``, or None if
+            the package is not installed.
+    """
+    try:
+        return json.loads(_manifest_path(package_name).read_text())
+    except FileNotFoundError:
+        return None
+
+
+def build_manifest(package_name, staged_path, prefix, trees=()):
+    """Describe the files of a tree staged to be installed in a prefix.
+
+    Args:
+        package_name (str): the name of the package.
+        staged_path (Path): the staged tree.
+        prefix (Path): where the tree is installed.
+        trees (list): the other staged trees of the package, installed outside
+            of ``prefix``, as pairs of staged tree and location. Default to
+            none.
+
+    Returns:
+        dict: the manifest, giving the prefix of the package, the locations of
+            its other trees and, for each file by installed path, its size, mode
+            and sha256 checksum. Symbolic links are given with their target
+            instead of a checksum.
+    """
+    files = {}
+    hashed_paths = []
+
+    for tree_staged_path, tree_path in [(staged_path, prefix)] + list(trees):
+        for dir_path, dir_names, file_names in os.walk(tree_staged_path):
+            # symbolic links to directories are listed as directories
+            for name in dir_names + file_names:
+                path = os.path.join(dir_path, name)
+                status = os.lstat(path)
+                if stat.S_ISDIR(status.st_mode):
+                    continue
+
+                installed_path = str(
+                    tree_path.joinpath(os.path.relpath(path, tree_staged_path))
+                )
+                entry = {"size": status.st_size, "mode": stat.S_IMODE(status.st_mode)}
+                if stat.S_ISLNK(status.st_mode):
+                    entry["link"] = os.readlink(path)
+                else:
+                    hashed_paths.append((installed_path, path))
+                files[installed_path] = entry
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        checksums = executor.map(lambda paths: file_sha256(paths[1]), hashed_paths)
+        for (installed_path, _), checksum in zip(hashed_paths, checksums):
+            files[installed_path]["sha256"] = checksum
+
+    return {
+        "package": package_name,
+        "prefix": str(prefix),
+        "trees": [str(tree_path) for _, tree_path in trees],
+        "files": files,
+    }
+
+
+def find_conflicts(manifest):
+    """Find the files of a manifest installed by other packages.
+
+    Args:
+        manifest (dict): the manifest, see ``build_manifest``.
+
+    Returns:
+        dict: maps each conflicting path to the package owning it.
+    """
+    index = read_index()
+
+    return {
+        path: index[path]
+        for path in manifest["files"]
+        if index.get(path, manifest["package"]) != manifest["package"]
+    }
+
+
+def write_manifest(manifest):
+    """Record the manifest of an installed package and index its files.
+
+    The files of a previous install of the package are dropped from the index.
+
+    Args:
+        manifest (dict): the manifest, see ``build_manifest``.
+    """
+    package_name = manifest["package"]
+
+    with _locked_index() as index:
+        index = {path: owner for path, owner in index.items() if owner != package_name}
+        index.update((path, package_name) for path in manifest["files"])
+
+        _manifest_path(package_name).write_text(json.dumps(manifest))
+        _write_index(index)
+
+
+def remove_manifest(package_name):
+    """Forget the manifest of a package and drop its files from the index.
+
+    Args:
+        package_name (str): the name of the package.
+    """
+    with _locked_index() as index:
+        index = {path: owner for path, owner in index.items() if owner != package_name}
+
+        _manifest_path(package_name).unlink(missing_ok=True)
+        _write_index(index)
+
+
+@traced
+def install_tree(package_name, staged_path, prefix, trees=()):
+    """Install a staged tree in a prefix, recording the manifest of its package.
+
+    A warning is printed for the staged files already installed by other
+    packages, which are overwritten.
+
+    Args:
+        package_name (str): the name of the package.
+        staged_path (Path): the staged tree, moved into ``prefix``.
+        prefix (Path): where the tree is installed.
+        trees (list): the other staged trees of the package, installed outside
+            of ``prefix``, as pairs of staged tree and location. Default to
+            none.
+    """
+    manifest = build_manifest(package_name, staged_path, prefix, trees)
+
+    conflicts = find_conflicts(manifest)
+    if conflicts:
+        lines = [
+            "{} (from {})".format(path, owner)
+            for path, owner in sorted(conflicts.items())[:conflicts_shown]
+        ]
+        if len(conflicts) > conflicts_shown:
+            lines.append("and {} more".format(len(conflicts) - conflicts_shown))
+        print_msg_titled(
+            "[bold yellow]{} overwrites files of other packages[/]".format(
+                package_name
+            ),
+            "\n".join(lines),
+        )
+
+    move(staged_path, prefix, "{} files".format(package_name), force=True)
+    for tree_staged_path, tree_path in trees:
+        tree_path.parent.mkdir(parents=True, exist_ok=True)
+        move(tree_staged_path, tree_path, "{} files".format(package_name), force=True)
+    write_manifest(manifest)
+
+
+@traced
+def remove_installed_files(package_name):
+    """Remove the files installed by a package and forget its manifest.
+
+    Files now owned by another package are kept, as are directories which are
+    not empty once the files are removed. Emptied directories are removed up to
+    the prefix of the package and the locations of its other trees.
+
+    Args:
+        package_name (str): the name of the package.
+
+    Returns:
+        int: the number of removed files.
+    """
+    manifest = read_manifest(package_name)
+    if manifest is None:
+        return 0
+
+    roots = [manifest["prefix"]] + manifest.get("trees", [])
+    index = read_index()
+    removed_count = 0
+    dir_paths = set()
+
+    for path in manifest["files"]:
+        if index.get(path) != package_name:
+            continue
+
+        try:
+            os.unlink(path)
+            removed_count += 1
+        except FileNotFoundError:
+            pass
+
+        dir_path = os.path.dirname(path)
+        while (
+            any(dir_path.startswith(root + os.sep) for root in roots)
+            and dir_path not in dir_paths
+        ):
+            dir_paths.add(dir_path)
+            dir_path = os.path.dirname(dir_path)
+
+    # deepest directories first, so that emptied parents are removed too
+    for dir_path in sorted(dir_paths, key=len, reverse=True):
+        try:
+            os.rmdir(dir_path)
+        except OSError:
+            pass
+
+    remove_manifest(package_name)
+
+    return removed_count
+
+
+def check_installed_files(manifest):
+    """Compare the installed files of a package with its manifest.
+
+    Only sizes, modes and link targets are compared, no file is read.
+
+    Args:
+        manifest (dict): the manifest, see ``build_manifest``.
+
+    Returns:
+        list: the missing files.
+        list: the files whose size, mode or link target changed.
+    """
+    missing = []
+    modified = []
+
+    for path, entry in manifest["files"].items():
+        try:
+            status = os.lstat(path)
+        except FileNotFoundError:
+            missing.append(path)
+            continue
+
+        if "link" in entry:
+            changed = (
+                not stat.S_ISLNK(status.st_mode) or os.readlink(path) != entry["link"]
+            )
+        else:
+            changed = (
+                status.st_size != entry["size"]
+                or stat.S_IMODE(status.st_mode) != entry["mode"]
+            )
+        if changed:
+            modified.append(path)
+
+    return missing, modified
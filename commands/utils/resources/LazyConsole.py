@@ -0,0 +1,32 @@
+import threading
+
+
+class LazyConsole:
+    """Stand-in for a ``rich`` console, created the first time it is used.
+
+    Importing ``rich.console`` is slow, and commands only printing their help
+    never print through the console. Attributes are looked up on the console.
+    """
+
+    def __init__(self, **options):
+        self._options = options
+        self._console = None
+        self._lock = threading.Lock()
+
+    def get_console(self):
+        """Get the ``rich`` console, creating it if needed.
+
+        Returns:
+            Console: the console.
+        """
+        if self._console is None:
+            with self._lock:
+                if self._console is None:
+                    from rich.console import Console
+
+                    self._console = Console(**self._options)
+
+        return self._console
+
+    def __getattr__(self, name):
+        return getattr(self.get_console(), name)
@@ -0,0 +1,52 @@
+import threading
+
+
+class SharedProgress:
+    """Context manager sharing a single live ``rich`` ``Progress`` between users.
+
+    ``rich`` allows one live display at a time, so steps running concurrently in
+    threads can not each start their own progress. Every ``SharedProgress``
+    entered while another one is active adds its tasks to the same live
+    progress, and removes them when exited. The live progress is stopped when
+    the last user exits.
+    """
+
+    _lock = threading.Lock()
+    _progress = None
+    _users = 0
+
+    def __init__(self, progress_factory):
+        self.progress_factory = progress_factory
+        self.task_ids = []
+
+    def __enter__(self):
+        with SharedProgress._lock:
+            if SharedProgress._progress is None:
+                SharedProgress._progress = self.progress_factory()
+                SharedProgress._progress.start()
+            SharedProgress._users += 1
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with SharedProgress._lock:
+            for task_id in self.task_ids:
+                SharedProgress._progress.remove_task(task_id)
+            self.task_ids = []
+
+            SharedProgress._users -= 1
+            if SharedProgress._users == 0:
+                SharedProgress._progress.stop()
+                SharedProgress._progress = None
+
+    def add_task(self, *args, **kwargs):
+        task_id = SharedProgress._progress.add_task(*args, **kwargs)
+        self.task_ids.append(task_id)
+        return task_id
+
+    def remove_task(self, task_id):
+        self.task_ids.remove(task_id)
+        SharedProgress._progress.remove_task(task_id)
+
+    def __getattr__(self, name):
+        return getattr(SharedProgress._progress, name)
@@ -0,0 +1,20 @@
+from rich.progress import ProgressColumn
+from rich.text import Text
+
+
+class StartedTaskColumn(ProgressColumn):
+    """Column of a ``rich`` ``Progress`` rendered for started tasks only.
+
+    Steps whose progress is unknown are added as not started tasks, for which
+    completion and remaining time mean nothing.
+    """
+
+    def __init__(self, column):
+        super().__init__()
+        self.column = column
+
+    def render(self, task):
+        if not task.started:
+            return Text("")
+
+        return self.column.render(task)
@@ -1,13 +1,23 @@
 from .console import console
 from .paths import (
+    artifacts_path,
+    cache_path,
+    compiler_cache_path,
     config_files_repo_path,
     config_path,
     configs_path,
+    configure_cache_path,
+    data_path,
+    downloads_cache_path,
+    git_mirrors_path,
     home_path,
     local_path,
+    logs_path,
+    manifests_path,
     packages_path,
     repositories_path,
     resources_dir_paths,
-    temp_path,
+    staging_path,
+    stamps_path,
 )
 from .rich import default_transient_progress
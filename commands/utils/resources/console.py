@@ -1,4 +1,5 @@
-from rich.console import Console
+from .LazyConsole import LazyConsole
 
-console = Console()
-"""Console: the rich console used to print during execution."""
+console = LazyConsole()
+"""LazyConsole: the rich console used to print during execution, created when
+first used."""
@@ -1,3 +1,4 @@
+import os
 import pathlib
 
 config_files_repo_path = pathlib.Path(__file__).parent.parent.parent.parent
@@ -18,16 +19,68 @@ config_path = home_path.joinpath(".config")
 configs_path = config_files_repo_path.joinpath("configs")
 """Path: the path to the directory containing the configs of applications."""
 
-temp_path = pathlib.Path("/tmp")
-"""Path: the path to the temporary directory."""
-
 packages_path = home_path.joinpath("Packages")
 """Path: the path to the directory in which package sources are stored."""
 
+data_path = home_path.joinpath(".config_files")
+"""Path: the path to the directory in which installation data are stored."""
+
+cache_path = data_path.joinpath("cache")
+"""Path: the path to the directory in which reusable data are cached."""
+
+artifacts_path = pathlib.Path(
+    os.environ.get("CONFIG_FILES_ARTIFACTS", cache_path.joinpath("artifacts"))
+).expanduser()
+"""Path: the path to the directory in which prebuilt packages are stored. It can
+be set with the ``CONFIG_FILES_ARTIFACTS`` environment variable, to share the
+artifacts between hosts."""
+
+git_mirrors_path = (
+    pathlib.Path(os.environ["CONFIG_FILES_GIT_MIRRORS"]).expanduser()
+    if "CONFIG_FILES_GIT_MIRRORS" in os.environ
+    else None
+)
+"""Path: the path to the directory in which mirrors of the cloned repositories
+are shared, set with the ``CONFIG_FILES_GIT_MIRRORS`` environment variable. None
+if it is not set, in which case repositories are cloned without mirror."""
+
+downloads_cache_path = cache_path.joinpath("downloads")
+"""Path: the path to the directory in which downloaded files are cached."""
+
+compiler_cache_path = cache_path.joinpath("compiler")
+"""Path: the path to the directory in which compiled objects are cached."""
+
+configure_cache_path = cache_path.joinpath("configure")
+"""Path: the path to the directory in which configure probes are cached."""
+
+manifests_path = data_path.joinpath("manifests")
+"""Path: the path to the directory in which the files of installed packages are
+listed."""
+
+logs_path = data_path.joinpath("logs")
+"""Path: the path to the directory in which the outputs of build steps are logged."""
+
+staging_path = data_path.joinpath("staging")
+"""Path: the path to the directory in which archives are extracted before being
+moved, when it is on the same filesystem as their destination."""
+
+stamps_path = data_path.joinpath("stamps")
+"""Path: the path to the directory in which build stamps are stored."""
+
 resources_dir_paths = [
     repositories_path,
     packages_path,
     local_path,
     config_path,
+    data_path,
+    cache_path,
+    artifacts_path,
+    downloads_cache_path,
+    compiler_cache_path,
+    configure_cache_path,
+    logs_path,
+    manifests_path,
+    staging_path,
+    stamps_path,
 ]
 """list: list of directories used in the installation scripts."""
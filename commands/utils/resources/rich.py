@@ -1,12 +1,33 @@
-from rich.progress import BarColumn, Progress
-
 from .console import console
+from .SharedProgress import SharedProgress
 
 
 def default_transient_progress():
-    return Progress(
-        "[progress.dexcription]{task.description}",
-        BarColumn(),
-        console=console,
-        transient=True,
+    """Get the progress displayed while a step runs.
+
+    Steps running at the same time, in threads, share the same live progress.
+    Started tasks show their completion and remaining time.
+
+    Returns:
+        SharedProgress: the context manager of the progress.
+    """
+    # imported when used, as commands only printing messages do not need it
+    from rich.progress import (
+        BarColumn,
+        Progress,
+        TaskProgressColumn,
+        TimeRemainingColumn,
+    )
+
+    from .StartedTaskColumn import StartedTaskColumn
+
+    return SharedProgress(
+        lambda: Progress(
+            "[progress.dexcription]{task.description}",
+            BarColumn(),
+            StartedTaskColumn(TaskProgressColumn()),
+            StartedTaskColumn(TimeRemainingColumn()),
+            console=console.get_console(),
+            transient=True,
+        )
     )
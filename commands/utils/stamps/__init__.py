@@ -0,0 +1 @@
+from .stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
@@ -0,0 +1,74 @@
+"""Build stamps functions."""
+
+import json
+
+from ..make import get_profile
+from ..resources import stamps_path
+
+
+def build_stamp(revision, prefix, **steps_args):
+    """Create the build stamp of a package.
+
+    Packages built with steps also record the build profile, see
+    ``get_profile``, so that they are rebuilt when it changes. The default
+    profile is left out, for the stamps of builds made before profiles existed
+    to stay valid.
+
+    Args:
+        revision (str): the commit or archive the package is built from.
+        prefix (Path): where the package is installed.
+        **steps_args (list): the arguments given to each build step, by step
+            name.
+
+    Returns:
+        dict: the build stamp.
+    """
+    stamp = {
+        "revision": revision,
+        "prefix": str(prefix),
+        "args": {step: list(args) for step, args in steps_args.items()},
+    }
+    if steps_args and get_profile() != "default":
+        stamp["profile"] = get_profile()
+
+    return stamp
+
+
+def _stamp_path(package_name):
+    return stamps_path.joinpath("{}.json".format(package_name))
+
+
+def is_up_to_date(package_name, stamp):
+    """Check if a package was last built with the given stamp.
+
+    Args:
+        package_name (str): the name of the package.
+        stamp (dict): the build stamp of the package, see ``build_stamp``.
+
+    Returns:
+        bool: True if the stamp of the last successful build is the same, False
+            otherwise.
+    """
+    try:
+        return json.loads(_stamp_path(package_name).read_text()) == stamp
+    except (OSError, ValueError):
+        return False
+
+
+def write_stamp(package_name, stamp):
+    """Record the stamp of a successful build.
+
+    Args:
+        package_name (str): the name of the package.
+        stamp (dict): the build stamp of the package, see ``build_stamp``.
+    """
+    _stamp_path(package_name).write_text(json.dumps(stamp, indent=4))
+
+
+def remove_stamp(package_name):
+    """Forget the last successful build of a package.
+
+    Args:
+        package_name (str): the name of the package.
+    """
+    _stamp_path(package_name).unlink(missing_ok=True)
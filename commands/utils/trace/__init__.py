@@ -0,0 +1,9 @@
+from .trace import (
+    get_trace_path,
+    merge_trace,
+    record_bytes,
+    start_trace,
+    trace_events,
+    traced,
+    write_trace,
+)
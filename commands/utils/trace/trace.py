@@ -0,0 +1,170 @@
+import atexit
+import functools
+import inspect
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+trace_events = []
+"""list: the trace events recorded by this process, in Chrome trace-event format."""
+
+trace_lock = threading.Lock()
+trace_spans = threading.local()
+
+trace_file_path = None
+
+
+def start_trace(file_path):
+    """Start recording the traced steps of this process.
+
+    The recorded events are written to the given file when the process exits,
+    in the Chrome trace-event format read by ``chrome://tracing`` and Perfetto.
+
+    Args:
+        file_path (Path): where to write the trace.
+    """
+    global trace_file_path
+
+    if trace_file_path is None:
+        atexit.register(write_trace)
+
+    trace_file_path = file_path
+    trace_events.append(
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "args": {"name": " ".join(os.path.basename(arg) for arg in sys.argv)},
+        }
+    )
+
+
+def get_trace_path():
+    """Get the file the trace of this process is written to.
+
+    Returns:
+        Path: the trace file, or None if the process is not traced.
+    """
+    return trace_file_path
+
+
+def traced(function):
+    """Decorate a step so that each of its calls is recorded in the trace.
+
+    A call is recorded with its start, duration, arguments, the bytes reported
+    through ``record_bytes`` and the CPU time used by the subprocesses it waited
+    for. As this CPU time is counted for the whole process, it also includes the
+    subprocesses of steps running at the same time in other threads.
+
+    Args:
+        function (callable): the step to trace.
+
+    Returns:
+        callable: the traced step.
+    """
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def traced_function(*args, **kwargs):
+        if trace_file_path is None:
+            return function(*args, **kwargs)
+
+        spans = _get_spans()
+        span = {"bytes": 0}
+        spans.append(span)
+
+        start = time.time_ns()
+        start_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            end_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            end = time.time_ns()
+
+            spans.pop()
+            if spans:
+                spans[-1]["bytes"] += span["bytes"]
+
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            event_args = {name: _describe(value) for name, value in arguments.items()}
+            event_args["bytes"] = span["bytes"]
+            event_args["children_cpu_seconds"] = round(
+                end_usage.ru_utime
+                + end_usage.ru_stime
+                - start_usage.ru_utime
+                - start_usage.ru_stime,
+                3,
+            )
+
+            with trace_lock:
+                trace_events.append(
+                    {
+                        "name": function.__name__,
+                        "cat": function.__module__.rpartition(".")[2],
+                        "ph": "X",
+                        "ts": start // 1000,
+                        "dur": (end - start) // 1000,
+                        "pid": os.getpid(),
+                        "tid": threading.get_native_id(),
+                        "args": event_args,
+                    }
+                )
+
+    return traced_function
+
+
+def record_bytes(count):
+    """Report bytes transferred by the traced step running in this thread.
+
+    Args:
+        count (int): the number of bytes transferred.
+    """
+    spans = _get_spans()
+    if spans:
+        spans[-1]["bytes"] += count
+
+
+def merge_trace(file_path):
+    """Add the events of another process trace to the trace of this process.
+
+    Args:
+        file_path (Path): the trace written by the other process. Nothing is
+            merged if it does not exist.
+    """
+    if not file_path.exists():
+        return
+
+    events = json.loads(file_path.read_text())["traceEvents"]
+    with trace_lock:
+        trace_events.extend(events)
+
+
+def write_trace():
+    """Write the recorded events to the trace file."""
+    if trace_file_path is None:
+        return
+
+    with trace_lock:
+        content = json.dumps({"traceEvents": trace_events})
+
+    trace_file_path.write_text(content)
+
+
+def _get_spans():
+    if not hasattr(trace_spans, "stack"):
+        trace_spans.stack = []
+
+    return trace_spans.stack
+
+
+def _describe(value):
+    if isinstance(value, (bool, int, float)) or value is None:
+        return value
+
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+
+    return str(value)
@@ -1,13 +1,36 @@
 import click
 
-from .utils.files import LocationExists, copy, create_directory
+from .utils.artifacts import (
+    artifact_key,
+    destdir_path,
+    restore_artifact,
+    store_artifact,
+)
+from .utils.files import (
+    LocationExists,
+    NotEnoughSpace,
+    build_directory,
+    copy,
+    create_directory,
+)
 from .utils.git import (
     NotAGitRepo,
+    SyncedRepository,
     clone_repository,
+    get_revision,
+    is_repository_up_to_date,
+    prefetch_repository,
     remove_local_changes,
     update_repository,
 )
-from .utils.make import autoreconf, configure, make, make_install
+from .utils.make import (
+    autoreconf,
+    compiler_cache_stats,
+    configure,
+    make,
+    make_install,
+    print_compiler_cache_stats,
+)
 from .utils.print import print_msg_titled, print_stdoutputs
 from .utils.resources import (
     config_path,
@@ -16,15 +39,40 @@ from .utils.resources import (
     local_path,
     repositories_path,
 )
+from .utils.stamps import build_stamp, is_up_to_date, remove_stamp, write_stamp
 from .ncurses import install as ncurses_install
 
 vifm_name = "vifm"
 vifm_homepage = "https://vifm.info/"
 vifm_repo_link = "https://github.com/vifm/vifm.git"
 vifm_repo_path = repositories_path.joinpath("vifm")
+vifm_clone_options = {"depth": 1, "single_branch": True}
 vifm_install_path = local_path
 vifm_vimfrc_path = configs_path.joinpath("vifm/vifmrc")
 vifm_config_path = config_path.joinpath("vifm")
+vifm_autoreconf_args = ["-f", "-i"]
+vifm_configure_args = [
+    "--prefix={}".format(vifm_install_path),
+    "--with-curses={}".format(local_path),
+]
+vifm_make_args = ["CMAKE_INSTALL_PREFIX={}".format(vifm_install_path)]
+vifm_build_size = 100 * 1024 * 1024
+
+
+def prefetch():
+    """clone or fetch the vifm repository ahead of its install."""
+    prefetch_repository(vifm_repo_link, vifm_repo_path, vifm_name, **vifm_clone_options)
+
+
+def repository():
+    """get the vifm repository, kept up to date by the sync command."""
+    return SyncedRepository(
+        vifm_repo_link,
+        vifm_repo_path,
+        vifm_name,
+        discard_changes=True,
+        **vifm_clone_options
+    )
 
 
 @click.group()
@@ -44,8 +92,14 @@ def info():
 
 @vifm.command()
 @click.option("--with-dependencies", is_flag=True, help="Install with dependencies")
+@click.option(
+    "--force",
+    is_flag=True,
+    envvar="CONFIG_FILES_FORCE",
+    help="Rebuild even if nothing changed",
+)
 @click.pass_context
-def install(ctx, with_dependencies):
+def install(ctx, with_dependencies, force):
     """install vifm locally."""
     # handle dependencies
     if with_dependencies:
@@ -53,68 +107,130 @@ def install(ctx, with_dependencies):
 
     # clone repository
     try:
-        clone_repository(vifm_repo_link, vifm_repo_path, vifm_name)
+        clone_repository(
+            vifm_repo_link, vifm_repo_path, vifm_name, **vifm_clone_options
+        )
     except LocationExists as exception:
         pass
 
-    # remove local changes
+    # remove local changes and update local repository, unless the remote branch
+    # is checked out already
     try:
-        remove_local_changes(vifm_repo_path, vifm_name)
+        if force or not is_repository_up_to_date(vifm_repo_path, vifm_name):
+            remove_local_changes(vifm_repo_path, vifm_name)
+            update_repository(vifm_repo_path, vifm_name, check_remote=force)
     except NotAGitRepo as exception:
         print_msg_titled(
             "Error while updating {} repository".format(vifm_name), str(exception)
         )
 
-    # update local repository
-    try:
-        update_repository(vifm_repo_path, vifm_name)
-    except NotAGitRepo as exception:
-        print_msg_titled(
-            "Error while updating {} repository".format(vifm_name), str(exception)
+    # build unless unchanged
+    vifm_stamp = build_stamp(
+        get_revision(vifm_repo_path),
+        vifm_install_path,
+        autoreconf=vifm_autoreconf_args,
+        configure=vifm_configure_args,
+        make=vifm_make_args,
+    )
+    vifm_artifact_key = artifact_key(vifm_stamp)
+    if not force and is_up_to_date(vifm_name, vifm_stamp):
+        console.print("[bold green]{} is up to date[/]".format(vifm_name))
+    elif not force and restore_artifact(
+        vifm_name, vifm_artifact_key, vifm_install_path
+    ):
+        # installed from prebuilt artifact
+        write_stamp(vifm_name, vifm_stamp)
+    else:
+        remove_stamp(vifm_name)
+
+        vifm_compiler_cache_stats = compiler_cache_stats()
+
+        # autoreconf
+        returncode, stdout, stderr = autoreconf(
+            vifm_repo_path, vifm_autoreconf_args, vifm_name
         )
-
-    # autoreconf
-    returncode, stdout, stderr = autoreconf(vifm_repo_path, ["-f", "-i"], vifm_name)
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while reconfiguring {}[/]".format(vifm_name),
-            stdout,
-            stderr,
+        if returncode != 0:
+            print_stdoutputs(
+                "[bold red]Error while reconfiguring {}[/]".format(vifm_name),
+                stdout,
+                stderr,
+            )
+            exit(1)
+
+        # build on the fastest location with enough space
+        try:
+            vifm_work_path = build_directory(vifm_name, vifm_repo_path, vifm_build_size)
+        except NotEnoughSpace as exception:
+            print_msg_titled(
+                "[bold red]Error while placing {} build[/]".format(vifm_name),
+                str(exception),
+            )
+            exit(1)
+
+        vifm_source_path = None
+        if vifm_work_path != vifm_repo_path:
+            vifm_source_path = vifm_repo_path
+            vifm_work_path.mkdir(parents=True, exist_ok=True)
+
+            # a source tree configured by an in-tree build cannot be built out of
+            # tree
+            if vifm_repo_path.joinpath("config.status").exists():
+                returncode, stdout, stderr = make(
+                    vifm_repo_path, ["distclean"], vifm_name
+                )
+                if returncode != 0:
+                    print_stdoutputs(
+                        "[bold red]Error while cleaning {}[/]".format(vifm_name),
+                        stdout,
+                        stderr,
+                    )
+                    exit(1)
+
+        # configure
+        returncode, stdout, stderr = configure(
+            vifm_work_path,
+            vifm_configure_args,
+            vifm_name,
+            cache=True,
+            source_path=vifm_source_path,
         )
-        exit(1)
-
-    # configure
-    returncode, stdout, stderr = configure(
-        vifm_repo_path,
-        [
-            "--prefix={}".format(vifm_install_path),
-            "--with-curses={}".format(local_path),
-        ],
-        vifm_name,
-    )
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while configuring {}[/]".format(vifm_name), stdout, stderr
+        if returncode != 0:
+            print_stdoutputs(
+                "[bold red]Error while configuring {}[/]".format(vifm_name),
+                stdout,
+                stderr,
+            )
+            exit(1)
+
+        # make
+        returncode, stdout, stderr = make(vifm_work_path, vifm_make_args, vifm_name)
+        if returncode != 0:
+            print_stdoutputs(
+                "[bold red]Error while compiling {}[/]".format(vifm_name),
+                stdout,
+                stderr,
+            )
+            exit(1)
+
+        # make install, staged to be packed as artifact
+        vifm_destdir_path = destdir_path(vifm_name, vifm_install_path)
+        returncode, stdout, stderr = make_install(
+            vifm_work_path, ["DESTDIR={}".format(vifm_destdir_path)], vifm_name
         )
-        exit(1)
-
-    # make
-    returncode, stdout, stderr = make(
-        vifm_repo_path, ["CMAKE_INSTALL_PREFIX={}".format(vifm_install_path)], vifm_name
-    )
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while compiling {}[/]".format(vifm_name), stdout, stderr
+        if returncode != 0:
+            print_stdoutputs(
+                "[bold red]Error while installing {}[/]".format(vifm_name),
+                stdout,
+                stderr,
+            )
+            exit(1)
+
+        store_artifact(
+            vifm_name, vifm_artifact_key, vifm_destdir_path, vifm_install_path
         )
-        exit(1)
 
-    # make install
-    returncode, stdout, stderr = make_install(vifm_repo_path, [], vifm_name)
-    if returncode != 0:
-        print_stdoutputs(
-            "[bold red]Error while installing {}[/]".format(vifm_name), stdout, stderr
-        )
-        exit(1)
+        print_compiler_cache_stats(vifm_compiler_cache_stats, vifm_name)
+        write_stamp(vifm_name, vifm_stamp)
 
     # install vifm.init
     if not vifm_config_path.exists():
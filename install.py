@@ -1,39 +1,62 @@
+import pathlib
+
 import click
 
-from commands import (
-    autoconf,
-    automake,
-    bash,
-    cmake,
-    libtool,
-    llvm,
-    ncurses,
-    neovim,
-    node,
-    openssl,
-    vifm,
-    ninja,
-)
-from commands.utils.files import create_resources_dirs
+from commands import commands_groups
+from commands.utils.cli import LazyGroup
+from commands.utils.files import create_resources_dirs, set_build_roots
+from commands.utils.make import build_profiles, default_jobs, set_jobs, set_profile
+from commands.utils.trace import start_trace
 
 
-@click.group()
-def cli():
-    pass
+@click.group(cls=LazyGroup, lazy_commands=commands_groups)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=default_jobs(),
+    show_default=True,
+    help="Number of parallel build jobs",
+)
+@click.option(
+    "--load-average",
+    "-l",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    show_default="jobs",
+    help="Do not start new build jobs above this load",
+)
+@click.option(
+    "--profile",
+    type=click.Choice(list(build_profiles)),
+    default="default",
+    show_default=True,
+    envvar="CONFIG_FILES_PROFILE",
+    help="Flags and optimizations the packages are built with",
+)
+@click.option(
+    "--build-root",
+    "build_roots",
+    multiple=True,
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    envvar="CONFIG_FILES_BUILD_ROOT",
+    help="Fast directory to build packages in, before their default location. "
+    "Repeat it to give fallbacks",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path),
+    default=None,
+    help="Write a Chrome trace of the install steps to this file",
+)
+def cli(jobs, load_average, profile, build_roots, trace):
+    set_jobs(jobs, load_average)
+    set_profile(profile)
+    set_build_roots(path.absolute() for path in build_roots)
+    if trace is not None:
+        start_trace(trace.absolute())
 
 
 if __name__ == "__main__":
     create_resources_dirs()
-    cli.add_command(neovim)
-    cli.add_command(libtool)
-    cli.add_command(autoconf)
-    cli.add_command(automake)
-    cli.add_command(vifm)
-    cli.add_command(ncurses)
-    cli.add_command(bash)
-    cli.add_command(node)
-    cli.add_command(cmake)
-    cli.add_command(openssl)
-    cli.add_command(llvm)
-    cli.add_command(ninja)
     cli()
@@ -0,0 +1,130 @@
+"""Behavior of the segmented downloads against the local range server."""
+
+import concurrent.futures
+import os
+
+import pytest
+import requests
+import urllib3
+
+from benchmarks.server import RangeRequestHandler, serve_directory
+from commands.utils.files.download import min_segment_size, segmented_download
+from commands.utils.files.DownloadStream import DownloadStream
+
+drop_size = 1024 * 1024
+"""int: the number of bytes sent before an interrupted response is cut."""
+
+
+class InterruptingHandler(RangeRequestHandler):
+    """Cut the ``interruptions`` next responses after ``drop_size`` bytes."""
+
+    interruptions = 0
+    sent = 0
+
+    def copyfile(self, source, outputfile):
+        cls = type(self)
+        if cls.interruptions > 0:
+            cls.interruptions -= 1
+            data = source.read(min(drop_size, self.remaining))
+            outputfile.write(data)
+            cls.sent += len(data)
+            self.close_connection = True
+            return
+
+        cls.sent += self.remaining
+        super().copyfile(source, outputfile)
+
+
+class NoRangeHandler(InterruptingHandler):
+    """Ignore ``Range`` requests and do not advertise them."""
+
+    def send_head(self):
+        del self.headers["Range"]
+        return super().send_head()
+
+    def send_header(self, keyword, value):
+        if keyword != "Accept-Ranges":
+            super().send_header(keyword, value)
+
+
+@pytest.fixture
+def served_file(tmp_path):
+    served_path = tmp_path.joinpath("served")
+    served_path.mkdir()
+    content = os.urandom(2 * min_segment_size + 12345)
+    served_path.joinpath("archive.tar.gz").write_bytes(content)
+    return served_path, content
+
+
+def _serve(served_path, handler_class, interruptions):
+    handler_class.interruptions = interruptions
+    handler_class.sent = 0
+    return serve_directory(served_path, handler_class)
+
+
+def test_retries_interrupted_segments(served_file, tmp_path):
+    served_path, content = served_file
+    file_path = tmp_path.joinpath("archive.tar.gz")
+
+    with _serve(served_path, InterruptingHandler, 2) as url:
+        segmented_download("{}/archive.tar.gz".format(url), file_path)
+
+    assert file_path.read_bytes() == content
+    assert not file_path.with_name("archive.tar.gz.state").exists()
+
+
+def test_resumes_interrupted_download(served_file, tmp_path):
+    served_path, content = served_file
+    file_path = tmp_path.joinpath("archive.tar.gz")
+    state_path = file_path.with_name("archive.tar.gz.state")
+
+    with _serve(served_path, InterruptingHandler, 100) as url:
+        link = "{}/archive.tar.gz".format(url)
+        with pytest.raises((requests.RequestException, urllib3.exceptions.HTTPError)):
+            segmented_download(link, file_path)
+        assert state_path.exists()
+
+        InterruptingHandler.interruptions = 0
+        InterruptingHandler.sent = 0
+        segmented_download(link, file_path)
+
+    assert file_path.read_bytes() == content
+    assert not state_path.exists()
+    # only the bytes missing after the interruptions are downloaded again
+    assert InterruptingHandler.sent < len(content)
+
+
+def test_restarts_download_without_ranges(served_file, tmp_path):
+    served_path, content = served_file
+    file_path = tmp_path.joinpath("archive.tar.gz")
+
+    with _serve(served_path, NoRangeHandler, 2) as url:
+        segmented_download("{}/archive.tar.gz".format(url), file_path)
+
+    assert file_path.read_bytes() == content
+    assert NoRangeHandler.sent == 2 * drop_size + len(content)
+
+
+@pytest.mark.parametrize("handler_class", [InterruptingHandler, NoRangeHandler])
+def test_streams_download_while_written(served_file, tmp_path, handler_class):
+    served_path, content = served_file
+    file_path = tmp_path.joinpath("archive.tar.gz")
+    stream = DownloadStream(file_path)
+
+    def download(link):
+        try:
+            segmented_download(link, file_path, on_write=stream.update)
+        except BaseException as exception:
+            stream.finish(exception)
+            raise
+        stream.finish()
+
+    with _serve(served_path, handler_class, 2) as url:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(download, "{}/archive.tar.gz".format(url))
+            with stream:
+                streamed = stream.read()
+            future.result()
+
+    assert streamed == content
+    assert file_path.read_bytes() == content
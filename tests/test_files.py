@@ -0,0 +1,48 @@
+"""Behavior of the files moves."""
+
+import concurrent.futures
+
+from commands.utils.files import move
+
+packages = 8
+"""int: the number of packages merged at once in the same prefix."""
+
+
+def _stage(staged_path, package):
+    for dir_name in ["share/aclocal", "share/info", "share/man/man1"]:
+        dir_path = staged_path.joinpath(dir_name)
+        dir_path.mkdir(parents=True)
+        dir_path.joinpath("{}.file".format(package)).write_text(package)
+
+
+def test_merges_trees_concurrently(tmp_path):
+    prefix_path = tmp_path.joinpath("prefix")
+    prefix_path.mkdir()
+
+    for attempt in range(20):
+        target_path = prefix_path.joinpath(str(attempt))
+        target_path.mkdir()
+
+        staged_paths = []
+        for package in range(packages):
+            staged_path = tmp_path.joinpath("staged", str(attempt), str(package))
+            _stage(staged_path, str(package))
+            staged_paths.append(staged_path)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=packages) as executor:
+            for _ in executor.map(
+                lambda staged_path: move(staged_path, target_path, force=True),
+                staged_paths,
+            ):
+                pass
+
+        installed = sorted(
+            str(path.relative_to(target_path))
+            for path in target_path.rglob("*")
+            if path.is_file()
+        )
+        assert installed == sorted(
+            "{}/{}.file".format(dir_name, package)
+            for dir_name in ["share/aclocal", "share/info", "share/man/man1"]
+            for package in range(packages)
+        )